@@ -2,7 +2,6 @@
 AirLogger backend application package.
 """
 from flask import Flask
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
@@ -10,8 +9,9 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Global database session
+# Global database sessions: Session writes, ReadSession only reads
 Session = None
+ReadSession = None
 
 
 def create_app(testing=False):
@@ -26,17 +26,90 @@ def create_app(testing=False):
     else:
         app.config['DATABASE_URL'] = os.getenv('DATABASE_URL', 'sqlite:///./airlogger.db')
     
-    # Initialize database
+    # Response cache limits
+    app.config['RESPONSE_CACHE_MAX_ENTRIES'] = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 256))
+    app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Columnar cache of recent flights for /api/flights (0 days disables it)
+    app.config['FLIGHT_CACHE_DAYS'] = int(os.getenv('FLIGHT_CACHE_DAYS', 30))
+    app.config['FLIGHT_CACHE_MAX_TAILS'] = int(os.getenv('FLIGHT_CACHE_MAX_TAILS', 64))
+    
+    # In-memory prefix sums for /api/summary
+    app.config['SUMMARY_INDEX_ENABLED'] = os.getenv('SUMMARY_INDEX_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Background refresh jobs
+    app.config['REFRESH_JOB_WORKERS'] = int(os.getenv('REFRESH_JOB_WORKERS', 2))
+    app.config['REFRESH_JOB_MAX_PENDING'] = int(os.getenv('REFRESH_JOB_MAX_PENDING', 16))
+    
+    # Initialize database: one serialized writer plus a read-only pool
+    from app.database import create_engines
     from app.models import Base
-    engine = create_engine(app.config['DATABASE_URL'])
-    Base.metadata.create_all(engine)
+    from app.migrations import run_migrations
+    engines = create_engines(app.config['DATABASE_URL'])
+    Base.metadata.create_all(engines.writer)
+    run_migrations(engines.writer)
+    app.extensions['db_engines'] = engines
+    
+    # Create session factories
+    global Session, ReadSession
+    Session = sessionmaker(bind=engines.writer)
+    ReadSession = sessionmaker(bind=engines.reader)
     
-    # Create session factory
-    global Session
-    Session = sessionmaker(bind=engine)
+    # Backfill rollups for databases created before they existed, fail
+    # refresh jobs that a previous process left unfinished and resume the
+    # AeroAPI rate limiter where it stopped
+    from app.services.jobs import recover_interrupted_jobs
+    from app.services.quota import restore_rate_limiter
+    from app.services.rollups import ensure_rollups
+    session = Session()
+    try:
+        ensure_rollups(session)
+        recover_interrupted_jobs(session)
+        restore_rate_limiter(session)
+    finally:
+        session.close()
+    
+    # Process-local caches
+    from app.services.flight_cache import RecentFlightsCache
+    from app.services.response_cache import ResponseCache
+    from app.services.settings_cache import SettingsCache
+    from app.services.summary_index import SummaryIndex
+    app.extensions['settings_cache'] = SettingsCache()
+    app.extensions['response_cache'] = ResponseCache(
+        max_entries=app.config['RESPONSE_CACHE_MAX_ENTRIES'],
+        max_bytes=app.config['RESPONSE_CACHE_MAX_BYTES']
+    )
+    app.extensions['summary_index'] = SummaryIndex() if app.config['SUMMARY_INDEX_ENABLED'] else None
+    app.extensions['flight_cache'] = RecentFlightsCache(
+        days=app.config['FLIGHT_CACHE_DAYS'],
+        max_tails=app.config['FLIGHT_CACHE_MAX_TAILS']
+    ) if app.config['FLIGHT_CACHE_DAYS'] > 0 else None
+    
+    # Refreshes of the same tail share one in-flight fetch, whether they
+    # arrive synchronously or as background jobs
+    from app.services.jobs import RefreshJobRunner
+    from app.services.singleflight import SingleFlight
+    app.extensions['refresh_singleflight'] = SingleFlight()
+    app.extensions['refresh_jobs'] = RefreshJobRunner(
+        Session,
+        response_cache=app.extensions['response_cache'],
+        max_workers=app.config['REFRESH_JOB_WORKERS'],
+        max_pending=app.config['REFRESH_JOB_MAX_PENDING'],
+        singleflight=app.extensions['refresh_singleflight'],
+        summary_index=app.extensions['summary_index'],
+        flight_cache=app.extensions['flight_cache']
+    )
+    
+    # Request, SQL and FlightAware timings for /api/metrics
+    from app.services.metrics import register_metrics
+    register_metrics(app, engines)
     
     # Register blueprints
     from app.api import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+    
     return app
\ No newline at end of file
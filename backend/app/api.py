@@ -1,13 +1,28 @@
 """
 API endpoints for AirLogger backend.
 """
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, g, make_response, stream_with_context, url_for
 from datetime import datetime, timezone, timedelta
+from functools import wraps
+import hashlib
+import json
 import logging
+import math
 from sqlalchemy.exc import SQLAlchemyError
-from app import Session
-from app.models import FlightRecord, FinancialSettings
-from app.services.flightaware import FlightAwareClient
+import app as airlogger
+from app.models import Aircraft, DataVersion, FinancialSettings, RefreshJob, serialize_flight
+from app.services.fleet import active_tail_numbers, run_fleet_refresh
+from app.services.flightaware import FlightAwareClient, FlightAwareError
+from app.services.flights import decode_cursor, encode_cursor, select_flights
+from app.services.ingest import FLIGHTS_VERSION
+from app.services.jobs import JobQueueFull
+from app.services.metrics import gauge, metrics
+from app.services.quota import api_usage, get_rate_limiter, usage_by_day
+from app.services.refresh import apply_ingest_result, refresh_once
+from app.services.response_cache import CachedResponse
+from app.services.rollups import aggregate_rollups, rollup_series
+from app.services.settings_cache import SETTINGS_VERSION
+from app.services.summary import SERIES_BUCKETS, FlightTotals, bucket_count, bucket_label, bucket_periods, build_summary
 
 logger = logging.getLogger(__name__)
 
@@ -16,68 +31,296 @@ api_bp = Blueprint('api', __name__)
 
 # Default values
 DEFAULT_TAIL_NUMBER = "N593EH"
+MAX_PAGE_SIZE = 1000
+MAX_SERIES_BUCKETS = 5000
 
+# Streamed /flights responses: format -> mimetype, and rows fetched per batch
+STREAM_FORMATS = {"json": "application/json", "ndjson": "application/x-ndjson"}
+STREAM_BATCH_SIZE = 500
 
-def get_db_session():
-    """Get database session."""
-    return Session()
 
+def get_db_session(readonly=False):
+    """
+    Get database session.
+    
+    Read-only sessions come from a separate pool that does not wait for
+    writes in progress; use them for requests that never write.
+    """
+    # Looked up per call: create_app rebinds the factories for each app
+    return airlogger.ReadSession() if readonly else airlogger.Session()
 
-@api_bp.route('/refresh_data', methods=['POST'])
-def refresh_data():
+
+def get_settings(session):
+    """Get financial settings through the process-local cache."""
+    return current_app.extensions['settings_cache'].get(session)
+
+
+def conditional_get(view):
     """
-    Trigger a refresh of flight data from FlightAware.
-    Fetches last 90 days of data for the default tail number.
+    Add strong ETags to a GET endpoint and answer If-None-Match with 304.
+    
+    The ETag hashes every DataVersion counter together with the request path
+    and query parameters, so it changes whenever ingest stores flights or
+    settings are updated. A matching request is answered after a single
+    data_versions lookup, without running the view.
     """
-    session = get_db_session()
-    try:
-        # Calculate date range (last 90 days)
-        end_date = datetime.now(timezone.utc)
-        start_date = end_date - timedelta(days=90)
-        
-        logger.info(f"Starting data refresh for {DEFAULT_TAIL_NUMBER}")
-        
-        # Initialize FlightAware client
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        session = get_db_session(readonly=True)
         try:
-            client = FlightAwareClient()
-        except ValueError as e:
-            logger.error(f"Failed to initialize FlightAware client: {e}")
-            return jsonify({"error": "FlightAware API configuration error"}), 500
-        
-        # Fetch data from FlightAware
-        raw_flights = client.fetch_aircraft_history(DEFAULT_TAIL_NUMBER, start_date, end_date)
+            versions = DataVersion.current_all(session)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error reading data versions: {e}")
+            return view(*args, **kwargs)
+        finally:
+            session.close()
+        g.data_versions = versions
         
-        if not raw_flights:
-            return jsonify({"message": "No new data fetched from FlightAware or API error."}), 200
+        params = sorted(request.args.items(multi=True))
+        key = json.dumps([sorted(versions.items()), request.path, params], separators=(',', ':'))
+        etag = hashlib.sha256(key.encode()).hexdigest()[:32]
         
-        # Process flight data
-        processed_flights = client.process_flight_data(raw_flights)
+        if request.if_none_match.contains(etag) or request.if_none_match.star_tag:
+            response = Response(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
         
-        # Store in database (avoiding duplicates)
-        new_count = 0
-        for flight in processed_flights:
-            existing = session.query(FlightRecord).filter_by(id=flight.id).first()
-            if not existing:
-                session.add(flight)
-                new_count += 1
-            else:
-                logger.debug(f"Flight {flight.id} already exists, skipping")
+        response.set_etag(etag)
+        # Let clients keep the body but revalidate on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    return wrapper
+
+
+def cached_response(view):
+    """
+    Serve repeated range queries from the process-local response cache.
+    
+    Must be applied inside conditional_get, which provides the DataVersion
+    counters the cache is validated against. Streamed responses and requests
+    without a valid date range are passed straight to the view.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        versions = g.get('data_versions')
+        date_range = _parse_cacheable_range(request.args)
+        if versions is None or date_range is None or 'stream' in request.args:
+            return view(*args, **kwargs)
         
-        session.commit()
+        cache = current_app.extensions['response_cache']
+        flights_version = versions.get(FLIGHTS_VERSION, 0)
+        settings_version = versions.get(SETTINGS_VERSION, 0)
+        cache.sync(flights_version, settings_version)
         
-        message = f"Data refreshed successfully. Stored {new_count} new flights."
-        logger.info(message)
-        return jsonify({"message": message}), 200
+        tail_number = request.args.get('tail_number', DEFAULT_TAIL_NUMBER)
+        key = (request.path, tail_number, tuple(sorted(request.args.items(multi=True))), settings_version)
+        entry = cache.get(key)
+        if entry is not None:
+            return Response(entry.body, status=200, mimetype=entry.mimetype)
         
+        response = make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            cache.put(key, CachedResponse(
+                body=response.get_data(),
+                mimetype=response.mimetype,
+                tail_number=tail_number,
+                start_date=date_range[0],
+                end_date=date_range[1],
+                flights_version=flights_version
+            ))
+        return response
+    
+    return wrapper
+
+
+def _parse_cacheable_range(args):
+    """Parse start_date/end_date like the range endpoints do; None if invalid."""
+    try:
+        start_date = datetime.strptime(args['start_date'], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        end_date = datetime.strptime(args['end_date'], "%Y-%m-%d").replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+    except (KeyError, ValueError):
+        return None
+    return start_date, end_date
+
+
+@api_bp.route('/refresh_data', methods=['POST'])
+def refresh_data():
+    """
+    Trigger a refresh of flight data from FlightAware.
+    Fetches flights since the last sync for the default tail number.
+    Query parameters:
+    - full (optional, "true" to re-fetch the last 90 days regardless of sync state)
+    - async (optional, "true" to run as a background job and return 202;
+      a "Prefer: respond-async" header does the same)
+    - fleet (optional, "true" to refresh every registered aircraft instead)
+    """
+    full = request.args.get('full', 'false').lower() in ('1', 'true', 'yes')
+    run_async = (request.args.get('async', 'false').lower() in ('1', 'true', 'yes')
+                 or 'respond-async' in request.headers.get('Prefer', ''))
+    
+    if request.args.get('fleet', 'false').lower() in ('1', 'true', 'yes'):
+        return refresh_fleet(full)
+    if run_async:
+        return submit_refresh_job(full)
+    
+    logger.info(f"Starting data refresh for {DEFAULT_TAIL_NUMBER}")
+    
+    # Initialize FlightAware client
+    try:
+        client = FlightAwareClient()
+    except ValueError as e:
+        logger.error(f"Failed to initialize FlightAware client: {e}")
+        return jsonify({"error": "FlightAware API configuration error"}), 500
+    
+    # Fetch, process and store new flights, sharing any identical refresh
+    # already running in this process
+    try:
+        result, shared = refresh_once(
+            current_app.extensions['refresh_singleflight'], get_db_session, client,
+            DEFAULT_TAIL_NUMBER, full=full, response_cache=current_app.extensions['response_cache'],
+            summary_index=current_app.extensions['summary_index'],
+            flight_cache=current_app.extensions['flight_cache']
+        )
+    except FlightAwareError as e:
+        return jsonify({"error": "FlightAware request failed", "details": str(e)}), 502
     except Exception as e:
-        session.rollback()
         logger.error(f"Error during data refresh: {e}", exc_info=True)
         return jsonify({"error": "Failed to refresh data", "details": str(e)}), 500
+    
+    if result.throttled:
+        message = f"FlightAware was queried recently. Try again in {math.ceil(result.retry_after)} seconds."
+    elif not result.fetched:
+        message = "No new data fetched from FlightAware or API error."
+    else:
+        message = f"Data refreshed successfully. Stored {result.inserted} new flights."
+    logger.info(message)
+    response = jsonify({
+        "message": message,
+        "flights_added": result.inserted,
+        "flights_skipped": result.skipped,
+        "shared": shared,
+        "throttled": result.throttled,
+        "window": {
+            "start": result.start_date.isoformat(),
+            "end": result.end_date.isoformat(),
+            "full": result.full
+        }
+    })
+    if result.throttled:
+        response.headers['Retry-After'] = str(math.ceil(result.retry_after))
+    return response, 200
+
+
+def refresh_fleet(full):
+    """Refresh all active registered aircraft (or the default one) in one pass."""
+    try:
+        client = FlightAwareClient()
+    except ValueError as e:
+        logger.error(f"Failed to initialize FlightAware client: {e}")
+        return jsonify({"error": "FlightAware API configuration error"}), 500
+    
+    response_cache = current_app.extensions['response_cache']
+    summary_index = current_app.extensions['summary_index']
+    flight_cache = current_app.extensions['flight_cache']
+    
+    def refresh():
+        session = get_db_session()
+        try:
+            tail_numbers = active_tail_numbers(session) or [DEFAULT_TAIL_NUMBER]
+            fleet = run_fleet_refresh(session, client, tail_numbers, full=full)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        for result in fleet.results:
+            apply_ingest_result(result.ingest, response_cache, flight_cache, summary_index)
+        return fleet
+    
+    try:
+        fleet, shared = current_app.extensions['refresh_singleflight'].do(("fleet", full), refresh)
+    except Exception as e:
+        logger.error(f"Error during fleet refresh: {e}", exc_info=True)
+        return jsonify({"error": "Failed to refresh data", "details": str(e)}), 500
+    
+    aircraft = [{
+        "tail_number": result.tail_number,
+        "flights_fetched": result.fetched,
+        "flights_added": result.inserted,
+        "flights_skipped": result.skipped,
+        "throttled": result.throttled,
+        "error": fleet.errors.get(result.tail_number),
+        "window": {
+            "start": result.start_date.isoformat(),
+            "end": result.end_date.isoformat(),
+            "full": result.full
+        }
+    } for result in fleet.results]
+    
+    if fleet.errors and len(fleet.errors) == len(fleet.results):
+        return jsonify({"error": "FlightAware request failed", "aircraft": aircraft}), 502
+    
+    message = f"Refreshed {len(fleet.results)} aircraft. Stored {fleet.inserted} new flights."
+    if fleet.errors:
+        message += f" {len(fleet.errors)} aircraft failed."
+    logger.info(message)
+    return jsonify({
+        "message": message,
+        "flights_added": fleet.inserted,
+        "flights_skipped": fleet.skipped,
+        "shared": shared,
+        "aircraft": aircraft
+    }), 200
+
+
+def submit_refresh_job(full):
+    """Queue a background refresh and answer 202 with the job."""
+    try:
+        client = FlightAwareClient()
+    except ValueError as e:
+        logger.error(f"Failed to initialize FlightAware client: {e}")
+        return jsonify({"error": "FlightAware API configuration error"}), 500
+    
+    try:
+        job = current_app.extensions['refresh_jobs'].submit(client, DEFAULT_TAIL_NUMBER, full=full)
+    except JobQueueFull as e:
+        logger.warning(f"Rejected refresh job: {e}")
+        response = jsonify({"error": "Too many refresh jobs pending", "details": str(e)})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    except SQLAlchemyError as e:
+        logger.error(f"Database error queuing refresh job: {e}")
+        return jsonify({"error": "Failed to queue refresh", "details": str(e)}), 500
+    
+    response = jsonify({"message": "Refresh queued.", "job": job})
+    response.headers['Location'] = url_for('api.get_refresh_job', job_id=job['id'])
+    response.headers['Preference-Applied'] = 'respond-async'
+    return response, 202
+
+
+@api_bp.route('/refresh_jobs/<job_id>', methods=['GET'])
+def get_refresh_job(job_id):
+    """Report the state, timings and counts of a background refresh job."""
+    session = get_db_session(readonly=True)
+    try:
+        job = session.get(RefreshJob, job_id)
+        if job is None:
+            return jsonify({"error": "Refresh job not found"}), 404
+        return jsonify(job.to_dict()), 200
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Database error reading refresh job: {e}")
+        return jsonify({"error": "Failed to read refresh job", "details": str(e)}), 500
     finally:
         session.close()
 
 
 @api_bp.route('/flights', methods=['GET'])
+@conditional_get
+@cached_response
 def get_flights():
     """
     Retrieve flight records for a specified date range.
@@ -85,11 +328,16 @@ def get_flights():
     - tail_number (optional, defaults to N593EH)
     - start_date (required, YYYY-MM-DD)
     - end_date (required, YYYY-MM-DD)
+    - limit (optional, page size; response becomes {"flights", "next_cursor"})
+    - cursor (optional, next_cursor from the previous page)
+    - stream (optional, "json" or "ndjson" to stream the whole range)
     """
     # Parse query parameters
     tail_number = request.args.get('tail_number', DEFAULT_TAIL_NUMBER)
     start_date_str = request.args.get('start_date')
     end_date_str = request.args.get('end_date')
+    cursor = request.args.get('cursor')
+    stream = request.args.get('stream')
     
     # Validate required parameters
     if not (start_date_str and end_date_str):
@@ -103,31 +351,87 @@ def get_flights():
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
     
-    session = get_db_session()
+    # Parse pagination
+    limit = request.args.get('limit', type=int)
+    if 'limit' in request.args and (limit is None or not 1 <= limit <= MAX_PAGE_SIZE):
+        return jsonify({"error": f"limit must be an integer between 1 and {MAX_PAGE_SIZE}"}), 400
+    if stream and stream not in STREAM_FORMATS:
+        return jsonify({"error": "stream must be 'json' or 'ndjson'"}), 400
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+    
+    query = select_flights(tail_number, start_date, end_date, after=after)
+    
+    session = get_db_session(readonly=True)
+    streaming = False
     try:
         # Get financial settings for revenue calculation
-        settings = FinancialSettings.get_or_create_default(session)
+        settings = get_settings(session)
+        revenue_per_hour = settings.revenue_per_hour
+        
+        if stream:
+            # Session is closed by the generator once the stream finishes
+            streaming = True
+            return _stream_flights(session, query, revenue_per_hour, stream)
         
-        # Query flights
-        flights = session.query(FlightRecord).filter(
-            FlightRecord.tail_number == tail_number,
-            FlightRecord.departure_time_utc >= start_date,
-            FlightRecord.departure_time_utc <= end_date
-        ).order_by(FlightRecord.departure_time_utc).all()
+        # Ranges inside the recent window are read from the columnar cache
+        rows = None
+        flight_cache = current_app.extensions['flight_cache']
+        flights_version = g.get('data_versions', {}).get(FLIGHTS_VERSION)
+        if flight_cache is not None and flights_version is not None:
+            rows = flight_cache.select(session, flights_version, tail_number, start_date, end_date, after=after,
+                                       limit=limit + 1 if limit is not None else None)
         
-        # Convert to dictionaries with revenue calculation
-        flight_list = [flight.to_dict(revenue_per_hour=settings.revenue_per_hour) for flight in flights]
+        if limit is None:
+            if rows is None:
+                rows = session.execute(query).all()
+            return jsonify([serialize_flight(row, revenue_per_hour) for row in rows]), 200
         
-        return jsonify(flight_list), 200
+        # Fetch one extra row to learn whether another page exists
+        if rows is None:
+            rows = session.execute(query.limit(limit + 1)).all()
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return jsonify({
+            "flights": [serialize_flight(row, revenue_per_hour) for row in rows[:limit]],
+            "next_cursor": next_cursor
+        }), 200
         
     except SQLAlchemyError as e:
         logger.error(f"Database error in get_flights: {e}")
         return jsonify({"error": "Database error"}), 500
     finally:
-        session.close()
+        if not streaming:
+            session.close()
+
+
+def _stream_flights(session, query, revenue_per_hour, stream_format):
+    """Stream a flight query as a JSON array or NDJSON without buffering the range."""
+    def generate():
+        try:
+            result = session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+            if stream_format == 'ndjson':
+                for row in result:
+                    yield current_app.json.dumps(serialize_flight(row, revenue_per_hour)) + "\n"
+                return
+            
+            yield "["
+            first = True
+            for row in result:
+                item = current_app.json.dumps(serialize_flight(row, revenue_per_hour))
+                yield item if first else "," + item
+                first = False
+            yield "]"
+        finally:
+            session.close()
+    
+    return Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[stream_format])
 
 
 @api_bp.route('/summary', methods=['GET'])
+@conditional_get
+@cached_response
 def get_summary():
     """
     Calculate and return summary statistics for a date range.
@@ -152,87 +456,99 @@ def get_summary():
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
     
-    session = get_db_session()
+    session = get_db_session(readonly=True)
     try:
         # Get financial settings
-        settings = FinancialSettings.get_or_create_default(session)
-        
-        # Query flights
-        flights = session.query(FlightRecord).filter(
-            FlightRecord.tail_number == tail_number,
-            FlightRecord.departure_time_utc >= start_date,
-            FlightRecord.departure_time_utc <= end_date
-        ).all()
-        
-        # Calculate totals with Hobbs time (add 15 minutes per flight)
-        total_hobbs_minutes = sum(f.flight_duration_minutes + 15 for f in flights)
-        
-        # Calculate billable hours (round up each flight to nearest 0.1 hour)
-        total_billable_hours = 0.0
-        for flight in flights:
-            hobbs_minutes = flight.flight_duration_minutes + 15
-            hobbs_hours = hobbs_minutes / 60.0
-            # Round up to nearest 0.1 hour (6 minutes)
-            billable_hours = round(hobbs_hours * 10 + 0.49) / 10
-            total_billable_hours += billable_hours
-        
-        # Financial calculations based on billable hours
-        total_revenue = round(total_billable_hours * settings.revenue_per_hour, 2)
-        total_variable_costs = round(total_billable_hours * settings.variable_cost_per_hour, 2)
-        
-        # Fixed costs proportional to period
-        days_in_period = (end_date - start_date).days + 1
-        avg_days_in_month = 30.44  # Average days per month
-        total_fixed_costs = round((settings.monthly_fixed_costs / avg_days_in_month) * days_in_period, 2)
+        settings = get_settings(session)
         
-        net_profit = round(total_revenue - total_variable_costs - total_fixed_costs, 2)
+        # Aggregate flight time from the in-memory prefix sums when they are
+        # current, otherwise from daily rollups, then apply financial math
+        summary_index = current_app.extensions['summary_index']
+        totals = None
+        if summary_index is not None:
+            totals = summary_index.totals(session, tail_number, start_date, end_date)
+        if totals is None:
+            totals = aggregate_rollups(session, tail_number, start_date, end_date)
+        summary = build_summary(settings, start_date, end_date, totals)
         
-        # Breakeven calculations
-        # Breakeven revenue = Fixed costs + (Variable cost per hour * Hours needed)
-        # Since revenue per hour > variable cost per hour, we can calculate hours needed
-        profit_margin_per_hour = settings.revenue_per_hour - settings.variable_cost_per_hour
+        return jsonify(summary), 200
         
-        if profit_margin_per_hour > 0:
-            # Hours needed to cover fixed costs
-            breakeven_hours = total_fixed_costs / profit_margin_per_hour
-            # Round up to nearest 0.1 hour for billing purposes
-            breakeven_billable_hours = round(breakeven_hours * 10 + 0.49) / 10
-            breakeven_revenue = round(breakeven_billable_hours * settings.revenue_per_hour, 2)
-            
-            # Additional hours needed from current position
-            additional_hours_needed = max(0, breakeven_billable_hours - total_billable_hours)
-            additional_revenue_needed = round(max(0, breakeven_revenue - total_revenue), 2)
-        else:
-            # Cannot break even if variable costs >= revenue
-            breakeven_billable_hours = None
-            breakeven_revenue = None
-            additional_hours_needed = None
-            additional_revenue_needed = None
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_summary: {e}")
+        return jsonify({"error": "Database error"}), 500
+    finally:
+        session.close()
+
+
+@api_bp.route('/summary/series', methods=['GET'])
+@conditional_get
+@cached_response
+def get_summary_series():
+    """
+    Summary statistics per day, ISO week or month of a date range.
+    Query parameters:
+    - tail_number (optional, defaults to N593EH)
+    - start_date (required, YYYY-MM-DD)
+    - end_date (required, YYYY-MM-DD)
+    - bucket (optional, "day", "week" or "month"; defaults to month)
+    
+    Every bucket is the /api/summary payload for its days, with the first
+    and last clipped to the range, all computed from one grouped rollup
+    query. "total" summarizes the whole range.
+    """
+    # Parse query parameters
+    tail_number = request.args.get('tail_number', DEFAULT_TAIL_NUMBER)
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    bucket = request.args.get('bucket', 'month')
+    
+    # Validate required parameters
+    if not (start_date_str and end_date_str):
+        return jsonify({"error": "start_date and end_date are required"}), 400
+    if bucket not in SERIES_BUCKETS:
+        return jsonify({"error": f"bucket must be one of: {', '.join(SERIES_BUCKETS)}"}), 400
+    
+    # Parse dates
+    try:
+        start_date = datetime.strptime(start_date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+        end_date = datetime.strptime(end_date_str, "%Y-%m-%d").replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    
+    # Counted from the dates so oversized ranges are refused before any
+    # periods are built
+    if bucket_count(start_date, end_date, bucket) > MAX_SERIES_BUCKETS:
+        return jsonify({"error": f"Range spans more than {MAX_SERIES_BUCKETS} buckets"}), 400
+    try:
+        periods = bucket_periods(start_date, end_date, bucket)
+    except OverflowError:
+        return jsonify({"error": "Range must end before the last bucket of year 9999"}), 400
+    
+    session = get_db_session(readonly=True)
+    try:
+        settings = get_settings(session)
+        totals_by_bucket = rollup_series(session, tail_number, start_date, end_date, bucket)
         
-        summary = {
-            "period": "Custom",
-            "startDate": start_date.isoformat(),
-            "endDate": end_date.isoformat(),
-            "totalFlightMinutes": sum(f.flight_duration_minutes for f in flights),
-            "totalHobbsMinutes": total_hobbs_minutes,
-            "totalBillableHours": round(total_billable_hours, 2),
-            "totalRevenue": total_revenue,
-            "totalFixedCosts": total_fixed_costs,
-            "totalVariableCosts": total_variable_costs,
-            "netProfit": net_profit,
-            "breakeven": {
-                "revenueNeeded": breakeven_revenue,
-                "hoursNeeded": breakeven_billable_hours,
-                "additionalRevenueNeeded": additional_revenue_needed,
-                "additionalHoursNeeded": round(additional_hours_needed, 2) if additional_hours_needed is not None else None,
-                "profitMarginPerHour": round(profit_margin_per_hour, 2)
-            }
-        }
+        series = []
+        total = FlightTotals()
+        for key, period_start, period_end in periods:
+            totals = totals_by_bucket.get(key, FlightTotals())
+            total.flight_count += totals.flight_count
+            total.flight_minutes += totals.flight_minutes
+            total.billable_tenths += totals.billable_tenths
+            summary = build_summary(settings, period_start, period_end, totals)
+            summary["period"] = bucket_label(key, bucket)
+            series.append(summary)
         
-        return jsonify(summary), 200
+        return jsonify({
+            "tailNumber": tail_number,
+            "bucket": bucket,
+            "series": series,
+            "total": build_summary(settings, start_date, end_date, total)
+        }), 200
         
     except SQLAlchemyError as e:
-        logger.error(f"Database error in get_summary: {e}")
+        logger.error(f"Database error in get_summary_series: {e}")
         return jsonify({"error": "Database error"}), 500
     finally:
         session.close()
@@ -241,9 +557,9 @@ def get_summary():
 @api_bp.route('/financial-settings', methods=['GET'])
 def get_financial_settings():
     """Retrieve current financial settings."""
-    session = get_db_session()
+    session = get_db_session(readonly=True)
     try:
-        settings = FinancialSettings.get_or_create_default(session)
+        settings = get_settings(session)
         return jsonify(settings.to_dict()), 200
     except SQLAlchemyError as e:
         logger.error(f"Database error in get_financial_settings: {e}")
@@ -282,8 +598,11 @@ def update_financial_settings():
         settings.monthly_fixed_costs = float(data['monthly_fixed_costs'])
         settings.variable_cost_per_hour = float(data['variable_cost_per_hour'])
         
+        # Bump the version so every worker's settings cache reloads
+        version = DataVersion.bump(session, SETTINGS_VERSION)
         session.commit()
         
+        settings = current_app.extensions['settings_cache'].store(settings, version)
         return jsonify(settings.to_dict()), 200
         
     except SQLAlchemyError as e:
@@ -291,4 +610,161 @@ def update_financial_settings():
         logger.error(f"Database error in update_financial_settings: {e}")
         return jsonify({"error": "Database error"}), 500
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+@api_bp.route('/aircraft', methods=['GET'])
+def get_aircraft():
+    """List registered aircraft."""
+    session = get_db_session(readonly=True)
+    try:
+        aircraft = session.query(Aircraft).order_by(Aircraft.tail_number).all()
+        return jsonify([a.to_dict() for a in aircraft]), 200
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_aircraft: {e}")
+        return jsonify({"error": "Database error"}), 500
+    finally:
+        session.close()
+
+
+@api_bp.route('/aircraft', methods=['POST'])
+def register_aircraft():
+    """
+    Register an aircraft for fleet refreshes, or reactivate it.
+    Body: {"tail_number": "N593EH", "active": true}
+    """
+    if not request.is_json:
+        return jsonify({"error": "Content-Type must be application/json"}), 400
+    
+    data = request.get_json()
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body must be a JSON object"}), 400
+    tail_number = data.get('tail_number')
+    if not isinstance(tail_number, str) or not tail_number.strip():
+        return jsonify({"error": "Missing required field: tail_number"}), 400
+    tail_number = tail_number.strip().upper()
+    
+    session = get_db_session()
+    try:
+        aircraft = session.get(Aircraft, tail_number)
+        created = aircraft is None
+        if created:
+            aircraft = Aircraft(tail_number=tail_number)
+            session.add(aircraft)
+        aircraft.active = bool(data.get('active', True))
+        session.commit()
+        return jsonify(aircraft.to_dict()), 201 if created else 200
+        
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Database error in register_aircraft: {e}")
+        return jsonify({"error": "Database error"}), 500
+    finally:
+        session.close()
+
+
+@api_bp.route('/aircraft/<tail_number>', methods=['DELETE'])
+def remove_aircraft(tail_number):
+    """Unregister an aircraft. Its stored flights are kept."""
+    session = get_db_session()
+    try:
+        aircraft = session.get(Aircraft, tail_number.upper())
+        if aircraft is None:
+            return jsonify({"error": "Aircraft not found"}), 404
+        session.delete(aircraft)
+        session.commit()
+        return '', 204
+        
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error(f"Database error in remove_aircraft: {e}")
+        return jsonify({"error": "Database error"}), 500
+    finally:
+        session.close()
+
+
+@api_bp.route('/usage', methods=['GET'])
+def get_usage():
+    """
+    Report FlightAware AeroAPI calls and estimated spend per UTC day.
+    Query parameters:
+    - start_date (optional, YYYY-MM-DD, defaults to 30 days before end_date)
+    - end_date (optional, YYYY-MM-DD, defaults to today)
+    """
+    try:
+        end_day = (datetime.strptime(request.args['end_date'], "%Y-%m-%d").date()
+                   if 'end_date' in request.args else datetime.now(timezone.utc).date())
+        start_day = (datetime.strptime(request.args['start_date'], "%Y-%m-%d").date()
+                     if 'start_date' in request.args else end_day - timedelta(days=30))
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    
+    session = get_db_session(readonly=True)
+    try:
+        # Include calls made since the last refresh committed, without
+        # writing them from a GET
+        days = usage_by_day(session, start_day, end_day, pending=api_usage.snapshot())
+        
+        limiter = get_rate_limiter()
+        return jsonify({
+            "start_date": start_day.isoformat(),
+            "end_date": end_day.isoformat(),
+            "days": days,
+            "total_calls": sum(day["calls"] for day in days),
+            "total_cost": round(sum(day["cost"] for day in days), 4),
+            "rate_limit": None if limiter is None else {
+                "per_minute": limiter.rate * 60,
+                "burst": limiter.capacity,
+                "tokens": round(limiter.snapshot()[0], 3),
+                "waited_seconds": round(limiter.waited_seconds, 3)
+            }
+        }), 200
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Database error in get_usage: {e}")
+        return jsonify({"error": "Database error"}), 500
+    finally:
+        session.close()
+
+
+@api_bp.route('/admin/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Report hit, miss and eviction statistics for in-process caches."""
+    summary_index = current_app.extensions['summary_index']
+    flight_cache = current_app.extensions['flight_cache']
+    return jsonify({
+        "response_cache": current_app.extensions['response_cache'].stats(),
+        "settings_cache": {"version": current_app.extensions['settings_cache'].version},
+        "summary_index": summary_index.stats() if summary_index is not None else None,
+        "flight_cache": flight_cache.stats() if flight_cache is not None else None
+    }), 200
+
+
+@api_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Request, SQL, FlightAware and cache metrics in Prometheus text format."""
+    cache_stats = current_app.extensions['response_cache'].stats()
+    extra = (
+        gauge("airlogger_response_cache_entries", "Cached flights/summary responses.", cache_stats["entries"])
+        + gauge("airlogger_response_cache_bytes", "Bytes held by the response cache.", cache_stats["bytes"])
+        + gauge("airlogger_response_cache_hits", "Response cache hits since start.", cache_stats["hits"])
+        + gauge("airlogger_response_cache_misses", "Response cache misses since start.", cache_stats["misses"])
+        + _flight_cache_gauges(current_app.extensions['flight_cache'])
+        + gauge("airlogger_refreshes_in_flight", "FlightAware refreshes currently running.",
+                current_app.extensions['refresh_singleflight'].in_flight())
+    )
+    return Response(metrics.render(extra), mimetype="text/plain; version=0.0.4")
+
+
+def _flight_cache_gauges(flight_cache):
+    """Exposition lines for the recent-flights cache (none when it is disabled)."""
+    if flight_cache is None:
+        return []
+    stats = flight_cache.stats()
+    return (
+        gauge("airlogger_flight_cache_flights", "Recent flights held in the columnar cache.", stats["flights"])
+        + gauge("airlogger_flight_cache_bytes", "Approximate bytes held by the columnar flight cache.", stats["bytes"])
+        + gauge("airlogger_flight_cache_hits", "Flight range queries answered from memory since start.", stats["hits"])
+        + gauge("airlogger_flight_cache_misses", "Flight range queries that loaded a tail since start.", stats["misses"])
+    )
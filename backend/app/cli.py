@@ -0,0 +1,45 @@
+"""
+Flask CLI commands for AirLogger maintenance.
+
+Run from the backend directory, e.g. ``flask --app app rebuild-rollups``.
+"""
+import click
+
+
+def register_commands(app):
+    """Register maintenance commands on the Flask app."""
+    
+    @app.cli.command('rebuild-rollups')
+    def rebuild_rollups_command():
+        """Rebuild daily flight rollups from the flights table."""
+        import app as airlogger
+        from app.models import DataVersion
+        from app.services.ingest import FLIGHTS_VERSION
+        from app.services.rollups import rebuild_rollups
+        
+        session = airlogger.Session()
+        try:
+            count = rebuild_rollups(session)
+            # Running workers drop their cached responses and summary index
+            DataVersion.bump(session, FLIGHTS_VERSION)
+            session.commit()
+            click.echo(f"Rebuilt {count} daily flight rollups.")
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    
+    @app.cli.command('prune-flightaware-cache')
+    @click.option('--max-age', type=float, default=None,
+                  help='Delete entries older than this many seconds (default FLIGHTAWARE_CACHE_TTL).')
+    def prune_flightaware_cache_command(max_age):
+        """Delete expired entries from the FlightAware response cache."""
+        import os
+        from app.services.flightaware_cache import FlightAwareCache
+        
+        directory = os.getenv("FLIGHTAWARE_CACHE_DIR")
+        if not directory:
+            raise click.UsageError("FLIGHTAWARE_CACHE_DIR is not set.")
+        cache = FlightAwareCache(directory, ttl_seconds=float(os.getenv("FLIGHTAWARE_CACHE_TTL", 900)))
+        click.echo(f"Removed {cache.prune(max_age)} cached FlightAware responses.")
@@ -0,0 +1,94 @@
+"""
+Database engines for AirLogger.
+"""
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Engines:
+    """The engine that writes and the engine GET requests read through."""
+    writer: Engine
+    reader: Engine
+
+    @property
+    def split(self) -> bool:
+        """True if reads use their own connection pool."""
+        return self.reader is not self.writer
+
+    def dispose(self) -> None:
+        self.writer.dispose()
+        if self.split:
+            self.reader.dispose()
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """
+    PRAGMAs applied to every SQLite connection.
+
+    Configured by SQLITE_SYNCHRONOUS (default NORMAL, which is durable
+    across application crashes in WAL mode), SQLITE_BUSY_TIMEOUT_MS
+    (default 5000) and SQLITE_MMAP_SIZE (bytes, default 256 MiB; 0 disables).
+    """
+    return {
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper(),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    }
+
+
+def _on_connect(engine: Engine, pragmas: Dict[str, Any]) -> None:
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def create_engines(database_url: str) -> Engines:
+    """
+    Create the writer and reader engines for a database URL.
+
+    For an SQLite file the writer switches the database to WAL, so readers
+    see the last committed state while a refresh is writing instead of
+    waiting for it. The writer pool holds a single connection, which
+    serializes writes within the process; other writers queue for it for
+    up to DATABASE_WRITE_TIMEOUT seconds (default 30), and writers in other
+    processes wait on SQLite's busy timeout. Readers get their own pool of
+    DATABASE_READ_POOL_SIZE connections (default 8) opened with
+    query_only, so a read session can never take the write lock.
+
+    In-memory databases and other backends use one engine for both roles.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        engine = create_engine(database_url)
+        return Engines(writer=engine, reader=engine)
+
+    pragmas = sqlite_pragmas()
+    writer = create_engine(
+        database_url,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=float(os.getenv("DATABASE_WRITE_TIMEOUT", 30))
+    )
+    _on_connect(writer, {"journal_mode": "WAL", **pragmas})
+
+    read_pool_size = int(os.getenv("DATABASE_READ_POOL_SIZE", 8))
+    reader = create_engine(database_url, pool_size=read_pool_size, max_overflow=read_pool_size)
+    _on_connect(reader, {**pragmas, "query_only": "ON"})
+
+    with writer.connect() as connection:
+        mode = connection.exec_driver_sql("PRAGMA journal_mode").scalar()
+    if str(mode).lower() != "wal":
+        logger.warning(f"SQLite journal_mode is {mode}, not WAL; reads will block during writes")
+    return Engines(writer=writer, reader=reader)
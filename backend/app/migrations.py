@@ -0,0 +1,75 @@
+"""
+Versioned schema migrations for existing AirLogger databases.
+
+Base.metadata.create_all creates missing tables but never changes existing
+ones, so changes to tables that already hold data are listed here and
+applied in order at startup. Each migration must be idempotent (IF NOT
+EXISTS / IF EXISTS): fresh databases already have the current schema from
+create_all, and several workers may start at once.
+"""
+import logging
+from dataclasses import dataclass
+from typing import List, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models import SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change, applied in a single transaction."""
+    version: int
+    name: str
+    statements: Tuple[str, ...]
+
+
+# Append only; never edit or renumber a migration that has shipped
+MIGRATIONS: List[Migration] = [
+    Migration(1, "flights_tail_departure_index", (
+        "CREATE INDEX IF NOT EXISTS ix_flights_tail_departure "
+        "ON flights (tail_number, departure_time_utc, id, flight_duration_minutes)",
+        # A prefix of the composite index, so it only cost writes
+        "DROP INDEX IF EXISTS ix_flights_tail_number",
+    )),
+]
+
+
+def applied_versions(connection) -> List[int]:
+    """Versions already recorded in schema_migrations, ascending."""
+    return list(connection.scalars(select(SchemaMigration.version).order_by(SchemaMigration.version)))
+
+
+def run_migrations(engine, migrations: List[Migration] = MIGRATIONS) -> List[int]:
+    """
+    Apply migrations that this database has not recorded yet.
+
+    schema_migrations must exist (create_all creates it).
+
+    Returns:
+        Versions applied by this call
+    """
+    with engine.connect() as connection:
+        done = set(applied_versions(connection))
+
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        with engine.begin() as connection:
+            # pysqlite commits DDL outside any transaction unless one was
+            # begun explicitly; IMMEDIATE also makes other workers wait
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            if migration.version in applied_versions(connection):
+                continue
+            for statement in migration.statements:
+                connection.exec_driver_sql(statement)
+            connection.execute(
+                sqlite_insert(SchemaMigration)
+                .values(version=migration.version, name=migration.name)
+                .on_conflict_do_nothing(index_elements=[SchemaMigration.version])
+            )
+        logger.info(f"Applied schema migration {migration.version}: {migration.name}")
+        applied.append(migration.version)
+    return applied
@@ -1,8 +1,10 @@
 """
 Database models for AirLogger.
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, create_engine
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, Text, Index, create_engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import configure_mappers
 from sqlalchemy.sql import func
 from datetime import datetime
 
@@ -12,9 +14,15 @@ Base = declarative_base()
 class FlightRecord(Base):
     """Model for storing individual flight records."""
     __tablename__ = 'flights'
+    __table_args__ = (
+        # Every flight query is one tail and a departure range; id and
+        # duration make the index cover summaries and keyset page order.
+        # Existing databases get it from migration 1 (app/migrations.py).
+        Index('ix_flights_tail_departure', 'tail_number', 'departure_time_utc', 'id', 'flight_duration_minutes'),
+    )
     
     id = Column(String, primary_key=True)  # FlightAware flight ID
-    tail_number = Column(String, nullable=False, index=True)
+    tail_number = Column(String, nullable=False)
     departure_airport = Column(String, nullable=False)
     arrival_airport = Column(String, nullable=False)
     departure_time_utc = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -22,29 +30,189 @@ class FlightRecord(Base):
     flight_duration_minutes = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
+    @classmethod
+    def build(cls, **values):
+        """
+        Create a new, transient FlightRecord without per-attribute ORM events.
+        
+        Equivalent to FlightRecord(**values) for records that are going to be
+        inserted (session.add or store_flights), at a fraction of the cost;
+        values are not validated against the mapped columns.
+        """
+        # new_instance() skips the mapper configuration a constructor call
+        # would trigger, so do it here when building before any query
+        if not cls.__mapper__.configured:
+            configure_mappers()
+        flight = cls._sa_class_manager.new_instance()
+        flight.__dict__.update(values)
+        return flight
+    
     def to_dict(self, revenue_per_hour=150.0):
         """Convert FlightRecord to dictionary for JSON response."""
-        # Add 15 minutes for ground engine time (Hobbs)
-        hobbs_minutes = self.flight_duration_minutes + 15
-        
-        # Calculate hours and round up to nearest 0.1 hour (6 minutes)
-        hobbs_hours = hobbs_minutes / 60.0
-        # Round up to nearest 0.1 hour
-        billable_hours = round(hobbs_hours * 10 + 0.49) / 10  # Add 0.49 to round up
+        return serialize_flight(self, revenue_per_hour=revenue_per_hour)
+
+
+def serialize_flight(flight, revenue_per_hour=150.0):
+    """
+    Convert a flight to a dictionary for JSON response.
+    
+    Accepts a FlightRecord or any row exposing the same column attributes,
+    so column-only query results can be serialized without ORM hydration.
+    """
+    # Add 15 minutes for ground engine time (Hobbs)
+    hobbs_minutes = flight.flight_duration_minutes + 15
+    
+    # Calculate hours and round up to nearest 0.1 hour (6 minutes)
+    hobbs_hours = hobbs_minutes / 60.0
+    # Round up to nearest 0.1 hour
+    billable_hours = round(hobbs_hours * 10 + 0.49) / 10  # Add 0.49 to round up
+    
+    estimated_revenue = round(billable_hours * revenue_per_hour, 2)
+    
+    return {
+        "id": flight.id,
+        "tailNumber": flight.tail_number,
+        "departureAirport": flight.departure_airport,
+        "arrivalAirport": flight.arrival_airport,
+        "departureTime": flight.departure_time_utc.isoformat(),
+        "arrivalTime": flight.arrival_time_utc.isoformat(),
+        "flightDurationMinutes": flight.flight_duration_minutes,
+        "hobbsMinutes": hobbs_minutes,
+        "billableHours": billable_hours,
+        "estimatedRevenue": estimated_revenue
+    }
+
+
+class DailyFlightRollup(Base):
+    """
+    Per-aircraft flight totals for one UTC day.
+    
+    Maintained incrementally by the ingest service in the same transaction
+    that inserts the flights, so summaries can read one row per day instead
+    of scanning the flights table.
+    """
+    __tablename__ = 'daily_flight_rollups'
+    
+    tail_number = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)  # UTC departure date
+    flight_count = Column(Integer, nullable=False, default=0)
+    flight_minutes = Column(Integer, nullable=False, default=0)
+    hobbs_minutes = Column(Integer, nullable=False, default=0)
+    billable_tenths = Column(Integer, nullable=False, default=0)
+
+
+class ApiUsage(Base):
+    """FlightAware AeroAPI calls and estimated cost per UTC day and endpoint."""
+    __tablename__ = 'api_usage'
+    
+    day = Column(Date, primary_key=True)
+    endpoint = Column(String, primary_key=True)  # Path template, e.g. /flights/{ident}
+    calls = Column(Integer, nullable=False, default=0)  # HTTP requests sent, including retries
+    billable_calls = Column(Integer, nullable=False, default=0)  # Successful (200) responses
+    cache_hits = Column(Integer, nullable=False, default=0)  # Served from the disk cache instead
+    cost = Column(Float, nullable=False, default=0.0)  # Estimated USD
+
+
+class RateLimitState(Base):
+    """Saved token bucket level, so rate limits hold across restarts."""
+    __tablename__ = 'rate_limit_state'
+    
+    name = Column(String, primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)  # Unix time the level was sampled
+
+
+class Aircraft(Base):
+    """Aircraft registered for fleet-wide refreshes."""
+    __tablename__ = 'aircraft'
+    
+    tail_number = Column(String, primary_key=True)
+    active = Column(Boolean, nullable=False, default=True)
+    added_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def to_dict(self):
+        """Convert Aircraft to dictionary."""
+        return {
+            "tail_number": self.tail_number,
+            "active": self.active,
+            "added_at": self.added_at.isoformat() if self.added_at else None
+        }
+
+
+class SyncState(Base):
+    """Per-aircraft high-water mark of the last successful FlightAware sync."""
+    __tablename__ = 'sync_state'
+    
+    tail_number = Column(String, primary_key=True)
+    last_departure_time_utc = Column(DateTime(timezone=True))  # Latest departure ingested
+    last_fa_flight_id = Column(String)  # FlightAware ID of that flight
+    last_synced_at = Column(DateTime(timezone=True))
+    
+    def to_dict(self):
+        """Convert SyncState to dictionary."""
+        return {
+            "tail_number": self.tail_number,
+            "last_departure_time_utc": self.last_departure_time_utc.isoformat() if self.last_departure_time_utc else None,
+            "last_fa_flight_id": self.last_fa_flight_id,
+            "last_synced_at": self.last_synced_at.isoformat() if self.last_synced_at else None
+        }
+
+
+class FetchLock(Base):
+    """Last FlightAware fetch per aircraft, shared by every worker process to space out refreshes."""
+    __tablename__ = 'fetch_locks'
+    
+    tail_number = Column(String, primary_key=True)
+    last_fetch_at = Column(DateTime(timezone=True))
+
+
+class RefreshJob(Base):
+    """Background FlightAware refresh submitted through the API."""
+    __tablename__ = 'refresh_jobs'
+    
+    id = Column(String, primary_key=True)  # Random hex job ID
+    tail_number = Column(String, nullable=False)
+    full = Column(Boolean, nullable=False, default=False)
+    status = Column(String, nullable=False, index=True)  # queued, running, succeeded, failed
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    window_start = Column(DateTime(timezone=True))
+    window_end = Column(DateTime(timezone=True))
+    flights_fetched = Column(Integer)
+    flights_added = Column(Integer)
+    flights_skipped = Column(Integer)
+    error = Column(Text)
+    
+    def to_dict(self):
+        """Convert RefreshJob to dictionary."""
+        def iso(value):
+            return value.isoformat() if value else None
         
-        estimated_revenue = round(billable_hours * revenue_per_hour, 2)
+        def seconds(start, end):
+            if not (start and end):
+                return None
+            # SQLite hands times back naive; all of them are UTC
+            return round((end.replace(tzinfo=None) - start.replace(tzinfo=None)).total_seconds(), 3)
         
         return {
             "id": self.id,
-            "tailNumber": self.tail_number,
-            "departureAirport": self.departure_airport,
-            "arrivalAirport": self.arrival_airport,
-            "departureTime": self.departure_time_utc.isoformat(),
-            "arrivalTime": self.arrival_time_utc.isoformat(),
-            "flightDurationMinutes": self.flight_duration_minutes,
-            "hobbsMinutes": hobbs_minutes,
-            "billableHours": billable_hours,
-            "estimatedRevenue": estimated_revenue
+            "tail_number": self.tail_number,
+            "full": self.full,
+            "status": self.status,
+            "created_at": iso(self.created_at),
+            "started_at": iso(self.started_at),
+            "finished_at": iso(self.finished_at),
+            "queued_seconds": seconds(self.created_at, self.started_at),
+            "run_seconds": seconds(self.started_at, self.finished_at),
+            "window": {
+                "start": iso(self.window_start),
+                "end": iso(self.window_end)
+            },
+            "flights_fetched": self.flights_fetched,
+            "flights_added": self.flights_added,
+            "flights_skipped": self.flights_skipped,
+            "error": self.error
         }
 
 
@@ -58,6 +226,13 @@ class FinancialSettings(Base):
     variable_cost_per_hour = Column(Float, nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
+    # Values used until settings are saved for the first time
+    DEFAULTS = {
+        "revenue_per_hour": 150.0,
+        "monthly_fixed_costs": 500.0,
+        "variable_cost_per_hour": 75.0
+    }
+    
     def to_dict(self):
         """Convert FinancialSettings to dictionary."""
         return {
@@ -73,11 +248,52 @@ class FinancialSettings(Base):
         """Get existing settings or create default ones."""
         settings = session.query(cls).first()
         if not settings:
-            settings = cls(
-                revenue_per_hour=150.0,
-                monthly_fixed_costs=500.0,
-                variable_cost_per_hour=75.0
-            )
+            settings = cls(**cls.DEFAULTS)
             session.add(settings)
             session.commit()
-        return settings
\ No newline at end of file
+        return settings
+
+
+class DataVersion(Base):
+    """
+    Named change counters shared by all worker processes.
+    
+    Writers bump a counter in the same transaction as the change it tracks;
+    readers compare it against the version their in-process cache was built
+    from, which is a single primary key lookup.
+    """
+    __tablename__ = 'data_versions'
+    
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    
+    @classmethod
+    def current(cls, session, name):
+        """Get the current version for a counter (0 if never bumped)."""
+        version = session.query(cls.version).filter(cls.name == name).scalar()
+        return version or 0
+    
+    @classmethod
+    def current_all(cls, session):
+        """Get every counter as a {name: version} dictionary in one query."""
+        return dict(session.query(cls.name, cls.version).all())
+    
+    @classmethod
+    def bump(cls, session, name):
+        """Increment a counter and return its new version. The caller commits."""
+        stmt = sqlite_insert(cls).values(name=name, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.name],
+            set_={"version": cls.version + 1}
+        )
+        session.execute(stmt)
+        return cls.current(session, name)
+
+
+class SchemaMigration(Base):
+    """A schema migration from app/migrations.py applied to this database."""
+    __tablename__ = 'schema_migrations'
+    
+    version = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
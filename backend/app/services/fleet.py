@@ -0,0 +1,105 @@
+"""
+Fleet-wide FlightAware refresh for AirLogger.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.models import Aircraft
+from app.services.flightaware import FlightAwareError, current_time
+from app.services.ingest import store_flights
+from app.services.quota import flush_api_usage
+from app.services.refresh import RefreshResult, begin_refresh, update_sync_state
+
+logger = logging.getLogger(__name__)
+
+
+def fleet_max_workers() -> int:
+    """Aircraft fetched from FlightAware at once during a fleet refresh."""
+    return int(os.getenv("FLEET_REFRESH_MAX_WORKERS", 8))
+
+
+def active_tail_numbers(session) -> List[str]:
+    """Tail numbers of all active registered aircraft, sorted."""
+    rows = session.query(Aircraft.tail_number).filter(Aircraft.active.is_(True)).order_by(Aircraft.tail_number)
+    return [tail_number for tail_number, in rows]
+
+
+@dataclass
+class FleetRefreshResult:
+    """Outcome of refreshing every registered aircraft."""
+    results: List[RefreshResult] = field(default_factory=list)
+    # Error message per tail number whose fetch failed
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def inserted(self) -> int:
+        return sum(r.inserted for r in self.results)
+
+    @property
+    def skipped(self) -> int:
+        return sum(r.skipped for r in self.results)
+
+
+def run_fleet_refresh(session, client, tail_numbers: List[str], full: bool = False,
+                      now: Optional[datetime] = None, max_workers: Optional[int] = None) -> FleetRefreshResult:
+    """
+    Refresh many aircraft with concurrent fetches and a single commit.
+
+    Windows are planned and fetch slots claimed for every tail first. The
+    FlightAware fetch and process_flight_data for each tail then run on a
+    bounded thread pool (the client's process-wide request slots cap the
+    total requests in flight), so the fetch phase takes about as long as the
+    slowest tail. All flights and sync marks are then written in one
+    transaction. A tail whose fetch fails is reported in errors and keeps
+    its sync mark; the other tails are still stored.
+
+    Args:
+        session: Database session
+        client: FlightAwareClient, shared by all fetches
+        tail_numbers: Aircraft registrations to refresh
+        full: Ignore sync high-water marks and fetch the full window
+        now: Current time (UTC), for tests (default current_time())
+        max_workers: Concurrent tails (default FLEET_REFRESH_MAX_WORKERS or 8)
+
+    Returns:
+        FleetRefreshResult with one RefreshResult per tail number
+    """
+    now = now or current_time()
+    fleet = FleetRefreshResult(results=[begin_refresh(session, tail, now, full=full) for tail in tail_numbers])
+    to_fetch = [r for r in fleet.results if not r.throttled]
+
+    def fetch(result: RefreshResult):
+        raw_flights = client.fetch_aircraft_history(
+            result.tail_number, result.start_date, result.end_date, raise_errors=True, now=now
+        )
+        result.fetched = len(raw_flights)
+        return client.process_flight_data(raw_flights) if raw_flights else []
+
+    processed: Dict[str, list] = {}
+    if to_fetch:
+        logger.info(f"Refreshing {len(to_fetch)} of {len(tail_numbers)} aircraft")
+        workers = min(max_workers or fleet_max_workers(), len(to_fetch))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fleet-refresh") as pool:
+            futures = [(r, pool.submit(fetch, r)) for r in to_fetch]
+            for result, future in futures:
+                try:
+                    processed[result.tail_number] = future.result()
+                except FlightAwareError as e:
+                    logger.error(f"Fleet refresh failed for {result.tail_number}: {e}")
+                    fleet.errors[result.tail_number] = str(e)
+                except Exception as e:
+                    logger.error(f"Fleet refresh failed for {result.tail_number}: {e}", exc_info=True)
+                    fleet.errors[result.tail_number] = str(e)
+
+    for result in to_fetch:
+        if result.tail_number in processed:
+            result.ingest = store_flights(session, processed[result.tail_number])
+            update_sync_state(session, result.tail_number, processed[result.tail_number], now)
+    flush_api_usage(session)
+    session.commit()
+
+    logger.info(f"Fleet refresh stored {fleet.inserted} new flights, {len(fleet.errors)} aircraft failed")
+    return fleet
@@ -0,0 +1,268 @@
+"""
+Read-through cache of each aircraft's recent flights in columnar form.
+"""
+import logging
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+from app.models import DataVersion, FlightRecord
+from app.services.flights import FLIGHT_COLUMNS
+from app.services.ingest import FLIGHTS_VERSION
+from app.services.versioning import KnownVersion
+
+logger = logging.getLogger(__name__)
+
+# Departure and arrival times are held as integer microseconds since the
+# epoch and turned back into the naive UTC datetimes SQLite returns
+EPOCH = datetime(1970, 1, 1)
+
+
+class CachedFlight(NamedTuple):
+    """A flight rebuilt from the columns; same attributes as a FLIGHT_COLUMNS row."""
+    id: str
+    tail_number: str
+    departure_airport: str
+    arrival_airport: str
+    departure_time_utc: datetime
+    arrival_time_utc: datetime
+    flight_duration_minutes: int
+
+
+def _micros(value: datetime) -> int:
+    """Microseconds since the epoch; naive values are UTC, the way SQLite returns them."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+class TailFlights:
+    """
+    Flights of one aircraft departing on or after window_start.
+
+    Stored as parallel columns ordered by (departure_time_utc, id), the
+    order the flights query returns. Times and durations live in typed
+    arrays; airport codes are interned, so each distinct code is held once
+    however many flights use it.
+    """
+
+    __slots__ = ("tail_number", "window_start", "ids", "departures", "arrivals",
+                 "minutes", "origins", "destinations")
+
+    def __init__(self, tail_number: str, window_start: datetime):
+        self.tail_number = tail_number
+        self.window_start = window_start
+        self.ids: List[str] = []
+        self.departures = array("q")
+        self.arrivals = array("q")
+        self.minutes = array("l")
+        self.origins: List[str] = []
+        self.destinations: List[str] = []
+
+    def append(self, row) -> None:
+        """Add a FLIGHT_COLUMNS row ordered after every flight already held."""
+        self.ids.append(row.id)
+        self.departures.append(_micros(row.departure_time_utc))
+        self.arrivals.append(_micros(row.arrival_time_utc))
+        self.minutes.append(row.flight_duration_minutes)
+        self.origins.append(sys.intern(row.departure_airport))
+        self.destinations.append(sys.intern(row.arrival_airport))
+
+    def covers(self, start_date: datetime) -> bool:
+        return start_date >= self.window_start
+
+    def select(self, start_date: datetime, end_date: datetime,
+               after: Optional[Tuple[datetime, str]] = None, limit: Optional[int] = None) -> List[CachedFlight]:
+        """Flights in [start_date, end_date] after an optional keyset position, like select_flights."""
+        lo = bisect_left(self.departures, _micros(start_date))
+        hi = bisect_right(self.departures, _micros(end_date), lo)
+        if after is not None:
+            after_departure, after_id = _micros(after[0]), after[1]
+            lo = max(lo, bisect_left(self.departures, after_departure, lo, hi))
+            while lo < hi and self.departures[lo] == after_departure and self.ids[lo] <= after_id:
+                lo += 1
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [self._flight(i) for i in range(lo, hi)]
+
+    def _flight(self, i: int) -> CachedFlight:
+        return CachedFlight(
+            self.ids[i],
+            self.tail_number,
+            self.origins[i],
+            self.destinations[i],
+            EPOCH + timedelta(microseconds=self.departures[i]),
+            EPOCH + timedelta(microseconds=self.arrivals[i]),
+            self.minutes[i]
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def nbytes(self) -> int:
+        """Approximate memory held, excluding the shared interned airport codes."""
+        size = sum(a.itemsize * len(a) for a in (self.departures, self.arrivals, self.minutes))
+        size += sum(sys.getsizeof(column) for column in (self.ids, self.origins, self.destinations))
+        return size + sum(sys.getsizeof(flight_id) for flight_id in self.ids)
+
+
+class RecentFlightsCache:
+    """
+    LRU cache of the last `days` days of flights per aircraft.
+
+    A tail is loaded on the first range request that starts inside its
+    window, with one query over the composite flights index, and later
+    requests inside the window are answered from memory. Everything held
+    is valid at one flights DataVersion: inserts by this process drop just
+    the tails that gained a flight inside their window (invalidate_flights,
+    like ResponseCache), and any other change to the counter drops every
+    tail.
+    """
+
+    def __init__(self, days: int = 30, max_tails: int = 64):
+        self.days = days
+        self.max_tails = max_tails
+        self._tails: "OrderedDict[str, TailFlights]" = OrderedDict()
+        self._version = KnownVersion()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def window_start(self, now: Optional[datetime] = None) -> datetime:
+        """Midnight UTC `days` days ago."""
+        now = now or datetime.now(timezone.utc)
+        return datetime.combine(now.date() - timedelta(days=self.days), time(), tzinfo=timezone.utc)
+
+    def select(self, session, flights_version: int, tail_number: str, start_date: datetime, end_date: datetime,
+               after: Optional[Tuple[datetime, str]] = None,
+               limit: Optional[int] = None) -> Optional[List[CachedFlight]]:
+        """
+        Flights for a range that starts inside the cached window.
+
+        Args:
+            session: Database session, used only to load a missing tail
+            flights_version: Flights DataVersion the request read
+            tail_number: Aircraft registration
+            start_date: Inclusive range start (UTC)
+            end_date: Inclusive range end (UTC)
+            after: Optional (departure_time_utc, id) keyset position to resume after
+            limit: Maximum number of flights to return
+
+        Returns:
+            Flights ordered by (departure_time_utc, id), or None if the range
+            starts before the window or the flights changed during a load
+            (the caller should query the database)
+        """
+        with self._lock:
+            self._sync(flights_version)
+            tail = self._tails.get(tail_number) if flights_version == self._version.value else None
+            if tail is not None and tail.covers(start_date):
+                self._tails.move_to_end(tail_number)
+                self.hits += 1
+                return tail.select(start_date, end_date, after, limit)
+            window_start = tail.window_start if tail is not None else self.window_start()
+            if start_date < window_start:
+                self.bypasses += 1
+                return None
+            self.misses += 1
+
+        tail = self._load(session, tail_number, window_start)
+        # A write between the two version reads may or may not be in the load
+        if DataVersion.current(session, FLIGHTS_VERSION) != flights_version:
+            return None
+        with self._lock:
+            self._sync(flights_version)
+            if flights_version == self._version.value:
+                self._tails[tail_number] = tail
+                self._tails.move_to_end(tail_number)
+                while len(self._tails) > self.max_tails:
+                    self._tails.popitem(last=False)
+                    self.evictions += 1
+        return tail.select(start_date, end_date, after, limit)
+
+    def invalidate_flights(self, departures: Dict[str, Iterable[datetime]], flights_version: int) -> int:
+        """
+        Drop tails that gained a flight inside their window.
+
+        Args:
+            departures: Inserted departure times (UTC) per tail number
+            flights_version: Flights DataVersion committed with the insert
+
+        Returns:
+            Number of tails dropped
+        """
+        with self._lock:
+            step = self._version.insert(flights_version)
+            if step == KnownVersion.SEEN:
+                # Already loaded from the database after the commit
+                return 0
+            if step == KnownVersion.RESET:
+                dropped = len(self._tails)
+                self._drop_all()
+                return dropped
+            stale = [
+                tail_number for tail_number, times in departures.items()
+                if tail_number in self._tails
+                and any(_micros(t) >= _micros(self._tails[tail_number].window_start) for t in times)
+            ]
+            for tail_number in stale:
+                del self._tails[tail_number]
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop every tail."""
+        with self._lock:
+            self._drop_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters plus the tails, flights and approximate bytes held."""
+        with self._lock:
+            lookups = self.hits + self.misses + self.bypasses
+            return {
+                "days": self.days,
+                "tails": len(self._tails),
+                "max_tails": self.max_tails,
+                "flights": sum(len(tail) for tail in self._tails.values()),
+                "bytes": sum(tail.nbytes() for tail in self._tails.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypasses": self.bypasses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "flights_version": self._version.value
+            }
+
+    def _load(self, session, tail_number: str, window_start: datetime) -> TailFlights:
+        tail = TailFlights(tail_number, window_start)
+        rows = session.execute(
+            select(*FLIGHT_COLUMNS).where(
+                FlightRecord.tail_number == tail_number,
+                FlightRecord.departure_time_utc >= window_start
+            ).order_by(FlightRecord.departure_time_utc, FlightRecord.id)
+        )
+        for row in rows:
+            tail.append(row)
+        with self._lock:
+            self.loads += 1
+        logger.debug(f"Loaded {len(tail)} recent flights for {tail_number}")
+        return tail
+
+    def _sync(self, version: int) -> None:
+        """Drop everything if the counter moved without invalidate_flights. Caller holds the lock."""
+        if self._version.observe(version):
+            self._drop_all()
+
+    def _drop_all(self) -> None:
+        self.invalidations += len(self._tails)
+        self._tails.clear()
@@ -2,28 +2,292 @@
 FlightAware API integration service.
 """
 import os
+import random
+import sys
+import threading
+import time
 import requests
-from datetime import datetime, timezone
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import logging
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from requests.adapters import HTTPAdapter
 from app.models import FlightRecord
+from app.services.flightaware_cache import CacheEntryWriter, CachedUpstreamResponse, FlightAwareCache
+from app.services.json_stream import StreamingObjectParser
+from app.services.metrics import metrics
+from app.services.quota import api_usage, endpoint_template, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = "https://aeroapi.flightaware.com/aeroapi"
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# /flights/{ident} only covers roughly the last 10 days; older flights come
+# from the /history/flights/{ident} endpoint
+RECENT_FLIGHTS_DAYS = 10
+
+# Request windows start and end on whole UTC hours, so refreshes within the
+# same hour ask for the same ranges and can be served from the disk cache
+WINDOW_GRID = timedelta(hours=1)
+_GRID_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Per-call stats kept on each client
+CALL_LOG_SIZE = 100
+
+# Timestamp fields tried in order for a flight's departure and arrival
+DEPARTURE_TIME_KEYS = ("actual_off", "actual_out", "scheduled_off", "scheduled_out", "filed_departure_time")
+ARRIVAL_TIME_KEYS = ("actual_on", "actual_in", "scheduled_on", "scheduled_in", "filed_arrival_time")
+
+# Parsed timestamps kept per client between filtering and processing
+TIMESTAMP_MEMO_SIZE = 250_000
+
+# Python 3.11+ fromisoformat accepts AeroAPI's trailing "Z" natively
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+# One pooled session per process so keep-alive connections (and their TLS
+# sessions) are reused across client instances and refreshes
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+# Process-wide cap on requests in flight, shared by every client so fleet
+# refreshes and window fan-out together stay within it
+_request_slots = None
+
+
+def get_shared_session(pool_size: int) -> requests.Session:
+    """Get the process-wide pooled session, creating it on first use."""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _shared_session = session
+        return _shared_session
+
+
+def get_request_slots(limit: int) -> threading.BoundedSemaphore:
+    """Get the process-wide semaphore limiting concurrent FlightAware requests."""
+    global _request_slots
+    with _shared_session_lock:
+        if _request_slots is None:
+            _request_slots = threading.BoundedSemaphore(limit)
+        return _request_slots
+
+
+def parse_aeroapi_datetime(value: str) -> datetime:
+    """
+    Parse an AeroAPI timestamp as an aware UTC-based datetime.
+    
+    AeroAPI's YYYY-MM-DDTHH:MM:SSZ shape goes straight to the C
+    fromisoformat on Python 3.11+, which measured faster than any pure-Python
+    fixed-format parser; other ISO 8601 forms take the general path.
+    """
+    if _FROMISOFORMAT_ACCEPTS_Z:
+        dt = datetime.fromisoformat(value)
+    else:
+        dt = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+    
+    # Ensure timezone aware
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def replay_enabled() -> bool:
+    """Whether FLIGHTAWARE_REPLAY is set."""
+    return os.getenv("FLIGHTAWARE_REPLAY", "false").lower() in ("1", "true", "yes")
+
+
+def replay_clock(cache: Optional[FlightAwareCache] = None) -> Optional[datetime]:
+    """
+    Time a replay runs at, so it plans the same requests as the recording.
+    
+    FLIGHTAWARE_REPLAY_NOW if set, else the clock recorded with the cache
+    (default the one in FLIGHTAWARE_CACHE_DIR); None if there is neither.
+    """
+    pinned = os.getenv("FLIGHTAWARE_REPLAY_NOW")
+    if pinned:
+        return parse_aeroapi_datetime(pinned)
+    if cache is None and os.getenv("FLIGHTAWARE_CACHE_DIR"):
+        cache = FlightAwareCache(os.getenv("FLIGHTAWARE_CACHE_DIR"))
+    return cache.recorded_clock() if cache is not None else None
+
+
+def current_time() -> datetime:
+    """Now (UTC), or the replay clock when FLIGHTAWARE_REPLAY is set."""
+    pinned = replay_clock() if replay_enabled() else None
+    return pinned or datetime.now(timezone.utc)
+
+
+def _grid_floor(value: datetime) -> datetime:
+    """Round down to a WINDOW_GRID boundary; naive values are UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value - (value - _GRID_EPOCH) % WINDOW_GRID
+
+
+def _grid_ceil(value: datetime) -> datetime:
+    """Round up to a WINDOW_GRID boundary; naive values are UTC."""
+    return _grid_floor(value + WINDOW_GRID - timedelta(microseconds=1))
+
+
+class FlightAwareError(Exception):
+    """Raised when FlightAware cannot be reached or keeps failing after retries."""
+
+
+class _CachingStream:
+    """
+    Wraps a streamed response body, copying chunks into a cache entry as the
+    caller reads them. The entry is committed once the body has been read to
+    the end. Parsers stop at the closing brace, so close() first reads any
+    unread tail (normally nothing, or trailing whitespace); the entry is
+    discarded if the body cannot be read completely.
+    """
+    
+    def __init__(self, raw, writer: CacheEntryWriter, endpoint: str):
+        self._raw = raw
+        self._writer = writer
+        self._endpoint = endpoint
+    
+    def stream(self, amt=None, decode_content=None):
+        try:
+            for chunk in self._raw.stream(amt, decode_content=decode_content):
+                self._write(chunk)
+                yield chunk
+        except BaseException:
+            self._discard()
+            raise
+        self._commit()
+    
+    def close(self) -> None:
+        if self._writer is not None:
+            try:
+                for chunk in self._raw.stream(decode_content=True):
+                    self._write(chunk)
+            except Exception as e:
+                logger.warning(f"Could not cache FlightAware response for {self._endpoint}: {e}")
+                self._discard()
+            self._commit()
+        self._raw.close()
+    
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+    
+    def _write(self, chunk: bytes) -> None:
+        if self._writer is None:
+            return
+        try:
+            self._writer.write(chunk)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not cache FlightAware response for {self._endpoint}: {e}")
+            self._discard()
+    
+    def _commit(self) -> None:
+        writer, self._writer = self._writer, None
+        if writer is None:
+            return
+        try:
+            writer.commit()
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not cache FlightAware response for {self._endpoint}: {e}")
+    
+    def _discard(self) -> None:
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.abort()
+
+
+@dataclass
+class CallStats:
+    """Timing for one logical API call, including its retries."""
+    url: str
+    status: Optional[int]
+    latency_seconds: float
+    retries: int
+    cached: bool = False
+
 
 class FlightAwareClient:
     """Client for interacting with FlightAware AeroAPI."""
     
-    def __init__(self):
-        """Initialize FlightAware client."""
+    def __init__(self, base_url: Optional[str] = None, session: Optional[requests.Session] = None,
+                 max_retries: Optional[int] = None, backoff_factor: Optional[float] = None,
+                 timeout: float = 30, cache: Optional[FlightAwareCache] = None,
+                 replay: Optional[bool] = None):
+        """
+        Initialize FlightAware client.
+        
+        Args:
+            base_url: AeroAPI base URL override, e.g. a local stand-in server
+                (default FLIGHTAWARE_BASE_URL, then the public AeroAPI)
+            session: requests.Session to use instead of the shared pooled one
+            max_retries: Retries for 429/5xx and connection errors
+                (default FLIGHTAWARE_MAX_RETRIES or 3)
+            backoff_factor: Base delay in seconds for exponential backoff
+                (default FLIGHTAWARE_BACKOFF_FACTOR or 0.5)
+            timeout: Per-request timeout in seconds
+            cache: On-disk response cache (default: one in FLIGHTAWARE_CACHE_DIR
+                with FLIGHTAWARE_CACHE_TTL, if that is set)
+            replay: Serve every request from the cache regardless of age and
+                never call AeroAPI; no API key is needed. The client clock
+                is pinned to replay_clock() (default FLIGHTAWARE_REPLAY)
+        """
+        if replay is None:
+            replay = replay_enabled()
+        if cache is None and os.getenv("FLIGHTAWARE_CACHE_DIR"):
+            cache = FlightAwareCache(os.getenv("FLIGHTAWARE_CACHE_DIR"),
+                                     ttl_seconds=float(os.getenv("FLIGHTAWARE_CACHE_TTL", 900)))
+        if replay and cache is None:
+            raise ValueError("FLIGHTAWARE_REPLAY requires FLIGHTAWARE_CACHE_DIR")
+        self.cache = cache
+        self.replay = replay
+        
         self.api_key = os.getenv("FLIGHTAWARE_API_KEY")
-        if not self.api_key:
+        if not self.api_key and not replay:
             raise ValueError("FLIGHTAWARE_API_KEY not configured")
         
-        self.base_url = "https://aeroapi.flightaware.com/aeroapi"
-        self.headers = {"x-apikey": self.api_key}
+        self.base_url = (base_url or os.getenv("FLIGHTAWARE_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.headers = {"x-apikey": self.api_key} if self.api_key else {}
+        pool_size = int(os.getenv("FLIGHTAWARE_POOL_SIZE", 10))
+        self.session = session or get_shared_session(pool_size)
+        self.request_slots = get_request_slots(int(os.getenv("FLIGHTAWARE_MAX_CONCURRENT_REQUESTS", pool_size)))
+        self.rate_limiter = get_rate_limiter()
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("FLIGHTAWARE_MAX_RETRIES", 3))
+        self.backoff_factor = backoff_factor if backoff_factor is not None else float(os.getenv("FLIGHTAWARE_BACKOFF_FACTOR", 0.5))
+        self.max_backoff = float(os.getenv("FLIGHTAWARE_MAX_BACKOFF", 30))
+        self.timeout = timeout
+        self.history_window_days = int(os.getenv("FLIGHTAWARE_HISTORY_WINDOW_DAYS", 7))
+        self.max_workers = int(os.getenv("FLIGHTAWARE_MAX_WORKERS", 4))
+        self.max_pages = int(os.getenv("FLIGHTAWARE_MAX_PAGES", 50))
+        self.stream_json = os.getenv("FLIGHTAWARE_STREAM_JSON", "true").lower() in ("1", "true", "yes")
+        self.stream_chunk_size = int(os.getenv("FLIGHTAWARE_STREAM_CHUNK_BYTES", 64 * 1024))
+        self.call_log = deque(maxlen=CALL_LOG_SIZE)
+        self._timestamps: Dict[str, datetime] = {}
+        self._sleep = time.sleep
+        self._now = lambda: datetime.now(timezone.utc)
+        if replay:
+            pinned = replay_clock(cache)
+            if pinned is None:
+                logger.warning("No FLIGHTAWARE_REPLAY_NOW or recorded clock; replaying at the current time")
+            else:
+                self._now = lambda: pinned
+    
+    @property
+    def last_call(self) -> Optional[CallStats]:
+        """Stats for the most recent API call, if any."""
+        return self.call_log[-1] if self.call_log else None
     
-    def fetch_aircraft_history(self, registration: str, start_date: datetime, end_date: datetime) -> List[Dict[str, Any]]:
+    def fetch_aircraft_history(self, registration: str, start_date: datetime, end_date: datetime,
+                               raise_errors: bool = False,
+                               now: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """
         Fetch historical flight data for an aircraft.
         
@@ -31,55 +295,324 @@ class FlightAwareClient:
             registration: Aircraft registration (e.g., "N593EH")
             start_date: Start date for history query
             end_date: End date for history query
+            raise_errors: Raise FlightAwareError on API failure instead of
+                returning an empty list
+            now: Time the refresh runs at (default the client clock). With
+                a disk cache outside replay it is recorded as the cache's
+                clock, so a later replay plans the same requests
             
         Returns:
             List of flight dictionaries from FlightAware
         """
+        now = now or self._now()
         try:
-            # Use the flights endpoint which works for tail numbers
-            url = f"{self.base_url}/flights/{registration}"
-            logger.info(f"Fetching flights for {registration}")
+            windows = self._plan_windows(registration, start_date, end_date, now)
+            logger.info(f"Fetching flights for {registration} in {len(windows)} window(s)")
             
-            # The flights endpoint returns recent flights, we'll filter by date after
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            all_flights = data.get("flights", [])
-            
-            # Filter flights by date range
-            filtered_flights = []
-            for flight in all_flights:
-                # Get departure time
+            # Drop out-of-range flights as each page is parsed, so only the
+            # flights we return are ever held in memory
+            def departure(flight: Dict[str, Any]) -> Optional[datetime]:
                 dep_time_str = (
                     flight.get("actual_off") or 
                     flight.get("actual_out") or 
                     flight.get("scheduled_off") or
                     flight.get("filed_departure_time")
                 )
-                
-                if dep_time_str:
-                    try:
-                        dep_time = self._parse_datetime(dep_time_str)
-                        if start_date <= dep_time <= end_date:
-                            filtered_flights.append(flight)
-                    except Exception as e:
-                        logger.warning(f"Could not parse date for flight: {e}")
+                if not dep_time_str:
+                    return None
+                try:
+                    return self._parse_timestamp(dep_time_str)
+                except Exception as e:
+                    logger.warning(f"Could not parse date for flight: {e}")
+                    return None
+            
+            def in_range(flight: Dict[str, Any]) -> bool:
+                dep_time = departure(flight)
+                return dep_time is not None and start_date <= dep_time <= end_date
+            
+            # Fetch windows concurrently; map() keeps results in window order
+            if len(windows) == 1:
+                window_pages = [self._fetch_pages(*windows[0], keep=in_range)]
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.max_workers, len(windows))) as pool:
+                    window_pages = list(pool.map(lambda window: self._fetch_pages(*window, keep=in_range), windows))
+            
+            # Merge windows, dropping flights repeated at window boundaries
+            total = sum(seen for _, seen in window_pages)
+            merged = []
+            seen_ids = set()
+            for flights, _ in window_pages:
+                for flight in flights:
+                    flight_id = flight.get("fa_flight_id")
+                    if flight_id is not None:
+                        if flight_id in seen_ids:
+                            continue
+                        seen_ids.add(flight_id)
+                    merged.append(flight)
+            
+            # Oldest first, regardless of the order pages were returned in;
+            # departure times are already memoised from filtering
+            merged.sort(key=departure)
+            filtered_flights = merged
             
-            logger.info(f"Retrieved {len(all_flights)} total flights, {len(filtered_flights)} within date range")
+            logger.info(f"Retrieved {total} total flights, {len(filtered_flights)} within date range")
+            if self.cache is not None and not self.replay:
+                self._record_clock(now)
             return filtered_flights
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching data from FlightAware: {e}")
+            if raise_errors:
+                raise FlightAwareError(str(e)) from e
             return []
         except Exception as e:
             logger.error(f"Unexpected error in fetch_aircraft_history: {e}")
+            if raise_errors:
+                raise FlightAwareError(str(e)) from e
             return []
     
+    def _plan_windows(self, registration: str, start_date: datetime, end_date: datetime,
+                      now: Optional[datetime] = None) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Split a date range into AeroAPI requests.
+        
+        The part of the range within the last RECENT_FLIGHTS_DAYS days is
+        served by /flights/{ident}; anything older goes to
+        /history/flights/{ident} in windows of at most history_window_days.
+        The range and the split between the endpoints are widened to whole
+        WINDOW_GRID steps, so repeated refreshes send identical requests;
+        flights outside the requested range are filtered out afterwards.
+        
+        Returns:
+            (path, params) pairs in chronological order
+        """
+        recent_start = _grid_ceil((now or self._now()) - timedelta(days=RECENT_FLIGHTS_DAYS))
+        start_date, end_date = _grid_floor(start_date), _grid_ceil(end_date)
+        windows = []
+        
+        if start_date < recent_start:
+            history_end = min(end_date, recent_start)
+            window_start = start_date
+            while window_start < history_end:
+                window_end = min(window_start + timedelta(days=self.history_window_days), history_end)
+                windows.append((f"/history/flights/{registration}", {
+                    "start": self._format_datetime(window_start),
+                    "end": self._format_datetime(window_end)
+                }))
+                window_start = window_end
+        
+        if end_date > recent_start:
+            windows.append((f"/flights/{registration}", {
+                "start": self._format_datetime(max(start_date, recent_start)),
+                "end": self._format_datetime(end_date)
+            }))
+        
+        return windows
+    
+    def _fetch_pages(self, path: str, params: Dict[str, str],
+                     keep: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Fetch every page of an AeroAPI flights listing by following links.next.
+        
+        With stream_json, each page's flights array is decoded one flight at
+        a time straight off the socket, so a page costs one flight plus one
+        read chunk of memory on top of the flights that are kept.
+        
+        Args:
+            path: Request path relative to the AeroAPI root
+            params: Query parameters for the first page
+            keep: Predicate applied to each flight as it is parsed; flights
+                it rejects are discarded immediately
+        
+        Returns:
+            (kept flights, number of flights seen)
+        """
+        url = f"{self.base_url}{path}"
+        flights = []
+        seen = 0
+        pages = 0
+        
+        while url and pages < self.max_pages:
+            with self._get(url, params, stream=self.stream_json) as response:
+                response.raise_for_status()
+                if self.stream_json:
+                    page = StreamingObjectParser(response.iter_content(self.stream_chunk_size), "flights")
+                    page_flights, fields = page, page.fields
+                else:
+                    fields = response.json()
+                    page_flights = fields.get("flights") or []
+                for flight in page_flights:
+                    seen += 1
+                    if keep is None or keep(flight):
+                        flights.append(flight)
+            pages += 1
+            
+            # links.next already carries the cursor and original query
+            next_link = (fields.get("links") or {}).get("next")
+            url = self._resolve_link(next_link) if next_link else None
+            params = None
+        
+        if url:
+            logger.warning(f"Stopped following {path} after {pages} pages (FLIGHTAWARE_MAX_PAGES)")
+        return flights, seen
+    
+    def _resolve_link(self, link: str) -> str:
+        """Turn an AeroAPI links.next value (relative to the API root) into a URL."""
+        if link.startswith(("http://", "https://")):
+            return link
+        return f"{self.base_url}/{link.lstrip('/')}"
+    
+    def _format_datetime(self, value: datetime) -> str:
+        """Format a datetime the way AeroAPI expects query timestamps."""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+    
+    def _get(self, url: str, params: Optional[Dict[str, Any]] = None, stream: bool = False) -> requests.Response:
+        """
+        GET through the pooled session, retrying transient failures.
+        
+        429/5xx responses and connection errors are retried up to max_retries
+        times with exponential backoff and full jitter, honouring Retry-After
+        when the server sends one. Each attempt holds one of the process-wide
+        request slots, which are released while backing off, and first takes
+        a token from the process-wide rate limiter, waiting for one if the
+        bucket is empty. Every attempt and cache hit is counted in api_usage.
+        With a disk cache, fresh entries (any entry, in replay mode) are
+        returned without a request and 200 responses are written back. The
+        final response (or error) is returned (or raised) to the caller; with
+        stream its body is left unread (unless it was cached) and the caller
+        must close it. Latency and retry count are appended to call_log and
+        reported to the process metrics.
+        """
+        started = time.perf_counter()
+        endpoint = url[len(self.base_url):] if url.startswith(self.base_url) else url
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params, ignore_ttl=self.replay)
+            if cached is not None:
+                api_usage.record(endpoint, cached=True)
+                self._record_call(endpoint, CallStats(
+                    url=url,
+                    status=cached.status,
+                    latency_seconds=time.perf_counter() - started,
+                    retries=0,
+                    cached=True
+                ))
+                return self._cached_response(cached)
+            if self.replay:
+                raise FlightAwareError(f"No cached FlightAware response for {endpoint} in replay mode")
+        
+        retries = 0
+        status = None
+        try:
+            while True:
+                if self.rate_limiter is not None:
+                    waited = self.rate_limiter.acquire()
+                    if waited:
+                        logger.debug(f"Waited {waited:.2f}s for FlightAware rate limit")
+                try:
+                    with self.request_slots:
+                        response = self.session.get(url, headers=self.headers, params=params, timeout=self.timeout,
+                                                    stream=stream)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    api_usage.record(endpoint)
+                    if retries >= self.max_retries:
+                        raise
+                    delay = self._backoff_delay(retries)
+                    logger.warning(f"FlightAware request failed ({e}), retrying in {delay:.2f}s")
+                else:
+                    status = response.status_code
+                    api_usage.record(endpoint, status=status)
+                    if status == 200 and self.cache is not None:
+                        self._store(endpoint, params, response, stream)
+                    if status not in RETRY_STATUSES or retries >= self.max_retries:
+                        return response
+                    delay = self._retry_after(response)
+                    if delay is None:
+                        delay = self._backoff_delay(retries)
+                    logger.warning(f"FlightAware returned {status}, retrying in {delay:.2f}s")
+                    response.close()
+                
+                retries += 1
+                self._sleep(delay)
+        finally:
+            self._record_call(endpoint, CallStats(
+                url=url,
+                status=status,
+                latency_seconds=time.perf_counter() - started,
+                retries=retries
+            ))
+    
+    def _record_call(self, endpoint: str, stats: CallStats) -> None:
+        """Append a call to call_log and the process-wide metrics."""
+        self.call_log.append(stats)
+        metrics.record_flightaware_call(endpoint_template(endpoint), stats.status, stats.latency_seconds,
+                                        stats.retries, stats.cached)
+    
+    def _store(self, endpoint: str, params: Optional[Dict[str, Any]], response: requests.Response,
+               stream: bool = False) -> None:
+        """
+        Write a successful response to the disk cache; failures only cost a future hit.
+        
+        A streamed body is not read here: it is copied into the cache chunk
+        by chunk as the caller consumes it, so caching does not buffer pages.
+        """
+        try:
+            if stream:
+                writer = self.cache.writer(endpoint, params, response.url, response.status_code)
+                response.raw = _CachingStream(response.raw, writer, endpoint)
+            else:
+                self.cache.put(endpoint, params, response.url, response.status_code, response.content)
+        except (OSError, UnicodeDecodeError) as e:
+            logger.warning(f"Could not cache FlightAware response for {endpoint}: {e}")
+    
+    def _record_clock(self, now: datetime) -> None:
+        """Record the refresh time with the disk cache; failures only cost a replay."""
+        try:
+            self.cache.record_clock(now)
+        except OSError as e:
+            logger.warning(f"Could not record the FlightAware cache clock: {e}")
+    
+    def _cached_response(self, cached: CachedUpstreamResponse) -> requests.Response:
+        """Rebuild a requests.Response from a cache entry."""
+        response = requests.Response()
+        response.status_code = cached.status
+        response._content = cached.body
+        # Lets iter_content() serve the body like a streamed response
+        response._content_consumed = True
+        response.url = cached.url
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "application/json"
+        return response
+    
+    def _backoff_delay(self, retries: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** retries)))
+    
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header (seconds or HTTP date), capped at max_backoff."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), self.max_backoff)
+    
     def process_flight_data(self, raw_flights: List[Dict[str, Any]]) -> List[FlightRecord]:
         """
         Process raw flight data from FlightAware into FlightRecord objects.
         
+        Each timestamp string is parsed at most once per client: values
+        already parsed while fetch_aircraft_history filtered the same flights
+        (or repeated within the batch) come from a memo, which is released
+        once the batch is processed. Records are built with
+        FlightRecord.build, skipping ORM attribute events.
+        
         Args:
             raw_flights: List of raw flight dictionaries from FlightAware
             
@@ -87,6 +620,7 @@ class FlightAwareClient:
             List of FlightRecord objects
         """
         processed_flights = []
+        parse = self._parse_timestamp
         
         for flight_data in raw_flights:
             try:
@@ -94,46 +628,41 @@ class FlightAwareClient:
                 flight_id = flight_data.get("fa_flight_id")
                 tail_number = flight_data.get("ident")
                 
-                # Get airport codes
-                origin = flight_data.get("origin", {})
-                destination = flight_data.get("destination", {})
-                departure_airport = origin.get("icao") or origin.get("code")
-                arrival_airport = destination.get("icao") or destination.get("code")
-                
                 # Skip cancelled flights
                 if flight_data.get("cancelled", False):
                     logger.info(f"Skipping cancelled flight: {flight_id}")
                     continue
                 
-                # Get times - try multiple field names
-                departure_time_str = (
-                    flight_data.get("actual_off") or
-                    flight_data.get("actual_out") or 
-                    flight_data.get("scheduled_off") or
-                    flight_data.get("scheduled_out") or
-                    flight_data.get("filed_departure_time")
-                )
-                arrival_time_str = (
-                    flight_data.get("actual_on") or
-                    flight_data.get("actual_in") or 
-                    flight_data.get("scheduled_on") or
-                    flight_data.get("scheduled_in") or
-                    flight_data.get("filed_arrival_time")
-                )
+                # Get airport codes
+                origin = flight_data.get("origin") or {}
+                destination = flight_data.get("destination") or {}
+                departure_airport = origin.get("icao") or origin.get("code")
+                arrival_airport = destination.get("icao") or destination.get("code")
+                
+                # Get times - first field present wins
+                departure_time_str = None
+                for key in DEPARTURE_TIME_KEYS:
+                    departure_time_str = flight_data.get(key)
+                    if departure_time_str:
+                        break
+                arrival_time_str = None
+                for key in ARRIVAL_TIME_KEYS:
+                    arrival_time_str = flight_data.get(key)
+                    if arrival_time_str:
+                        break
                 
                 # Validate required fields
-                if not all([flight_id, tail_number, departure_airport, arrival_airport, 
-                           departure_time_str, arrival_time_str]):
+                if not (flight_id and tail_number and departure_airport and arrival_airport
+                        and departure_time_str and arrival_time_str):
                     logger.warning(f"Skipping incomplete flight record: {flight_id or 'Unknown'}")
                     continue
                 
                 # Parse times
-                departure_time = self._parse_datetime(departure_time_str)
-                arrival_time = self._parse_datetime(arrival_time_str)
+                departure_time = parse(departure_time_str)
+                arrival_time = parse(arrival_time_str)
                 
                 # Calculate duration
-                duration = arrival_time - departure_time
-                flight_duration_minutes = int(duration.total_seconds() / 60)
+                flight_duration_minutes = int((arrival_time - departure_time).total_seconds() / 60)
                 
                 # Handle negative durations
                 if flight_duration_minutes < 0:
@@ -141,7 +670,7 @@ class FlightAwareClient:
                     flight_duration_minutes = 0
                 
                 # Create FlightRecord
-                flight_record = FlightRecord(
+                processed_flights.append(FlightRecord.build(
                     id=flight_id,
                     tail_number=tail_number,
                     departure_airport=departure_airport,
@@ -149,28 +678,25 @@ class FlightAwareClient:
                     departure_time_utc=departure_time,
                     arrival_time_utc=arrival_time,
                     flight_duration_minutes=flight_duration_minutes
-                )
-                
-                processed_flights.append(flight_record)
+                ))
                 
             except Exception as e:
                 logger.error(f"Error processing flight {flight_data.get('fa_flight_id', 'Unknown')}: {e}")
                 continue
         
+        self._timestamps.clear()
         logger.info(f"Processed {len(processed_flights)} flights successfully")
         return processed_flights
     
+    def _parse_timestamp(self, value: str) -> datetime:
+        """Parse a timestamp through the per-client memo."""
+        dt = self._timestamps.get(value)
+        if dt is None:
+            if len(self._timestamps) >= TIMESTAMP_MEMO_SIZE:
+                self._timestamps.clear()
+            dt = self._timestamps[value] = parse_aeroapi_datetime(value)
+        return dt
+    
     def _parse_datetime(self, datetime_str: str) -> datetime:
         """Parse datetime string from FlightAware (ISO 8601 format)."""
-        # Handle 'Z' suffix for UTC
-        if datetime_str.endswith('Z'):
-            datetime_str = datetime_str[:-1] + '+00:00'
-        
-        # Parse ISO format
-        dt = datetime.fromisoformat(datetime_str)
-        
-        # Ensure timezone aware
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        
-        return dt
\ No newline at end of file
+        return parse_aeroapi_datetime(datetime_str)
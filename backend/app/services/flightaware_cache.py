@@ -0,0 +1,207 @@
+"""
+On-disk cache of raw FlightAware responses.
+"""
+import codecs
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Time of the latest recorded refresh, kept beside the entries for replay
+CLOCK_FILE = "clock.json"
+
+
+@dataclass
+class CachedUpstreamResponse:
+    """A stored AeroAPI response body and when it was fetched."""
+    url: str
+    status: int
+    body: bytes
+    fetched_at: float
+
+
+class CacheEntryWriter:
+    """
+    Writes one cache entry from body chunks as they arrive.
+
+    The entry is built in a temporary file and only renamed into place by
+    commit(), so an abandoned or failed write never becomes visible.
+    """
+
+    def __init__(self, cache: "FlightAwareCache", path: str, header: Dict[str, Any]):
+        self._cache = cache
+        self._path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, self._tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        self._raw = os.fdopen(fd, "wb")
+        self._gzip = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        # The body is the record's last member, streamed in as a JSON string
+        prefix = json.dumps(header, separators=(',', ':'))[:-1] + ',"body":"'
+        self._gzip.write(prefix.encode("utf-8"))
+
+    def write(self, chunk: bytes) -> None:
+        self._write_text(self._utf8.decode(chunk))
+
+    def commit(self) -> None:
+        """Finish the entry and make it visible."""
+        try:
+            self._write_text(self._utf8.decode(b"", final=True))
+            self._gzip.write(b'"}')
+            self._close()
+            os.replace(self._tmp_path, self._path)
+        except BaseException:
+            self.abort()
+            raise
+        self._cache.writes += 1
+
+    def abort(self) -> None:
+        """Discard the entry."""
+        self._close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+    def _write_text(self, text: str) -> None:
+        if text:
+            self._gzip.write(json.dumps(text)[1:-1].encode("utf-8"))
+
+    def _close(self) -> None:
+        if not self._raw.closed:
+            try:
+                self._gzip.close()
+            finally:
+                self._raw.close()
+
+
+class FlightAwareCache:
+    """
+    Content-addressed store of AeroAPI responses, one gzip file per request.
+
+    Files are named by the SHA-256 of the endpoint and its sorted query
+    parameters (never the API key) and sharded into subdirectories by the
+    first two hex digits. Writes go to a temporary file that is renamed
+    into place, so concurrent readers and writers in any process only ever
+    see complete entries.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = 900):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self._clock = time.time
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Stable hash identifying an AeroAPI request."""
+        material = json.dumps([endpoint, sorted((params or {}).items())], separators=(',', ':'))
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+            ignore_ttl: bool = False) -> Optional[CachedUpstreamResponse]:
+        """
+        Look up a stored response.
+
+        Args:
+            endpoint: Request path relative to the AeroAPI root, or a full URL
+            params: Query parameters
+            ignore_ttl: Return the entry however old it is (replay)
+
+        Returns:
+            The stored response, or None if missing, expired or unreadable
+        """
+        try:
+            with gzip.open(self.path(self.key(endpoint, params)), "rt", encoding="utf-8") as f:
+                record = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable FlightAware cache entry for {endpoint}: {e}")
+            self.misses += 1
+            return None
+
+        if not ignore_ttl and self._clock() - record["fetched_at"] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedUpstreamResponse(
+            url=record["url"],
+            status=record["status"],
+            body=record["body"].encode("utf-8"),
+            fetched_at=record["fetched_at"]
+        )
+
+    def put(self, endpoint: str, params: Optional[Dict[str, Any]], url: str, status: int, body: bytes) -> None:
+        """Store a response, replacing any previous entry for the same request."""
+        writer = self.writer(endpoint, params, url, status)
+        try:
+            writer.write(body)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+
+    def writer(self, endpoint: str, params: Optional[Dict[str, Any]], url: str, status: int) -> CacheEntryWriter:
+        """Start an entry whose body is written in chunks; nothing is stored until commit()."""
+        return CacheEntryWriter(self, self.path(self.key(endpoint, params)), {
+            "endpoint": endpoint,
+            "params": params,
+            "url": url,
+            "status": status,
+            "fetched_at": self._clock()
+        })
+
+    def record_clock(self, now: datetime) -> None:
+        """Store the time a refresh was recorded at, replacing the previous one."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"now": now.isoformat()}, f)
+            os.replace(tmp_path, os.path.join(self.directory, CLOCK_FILE))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def recorded_clock(self) -> Optional[datetime]:
+        """Time of the latest recorded refresh, or None if there is none."""
+        try:
+            with open(os.path.join(self.directory, CLOCK_FILE), encoding="utf-8") as f:
+                return datetime.fromisoformat(json.load(f)["now"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable FlightAware cache clock: {e}")
+            return None
+
+    def prune(self, max_age: Optional[float] = None) -> int:
+        """
+        Delete entries older than max_age (default the TTL).
+
+        Returns:
+            Number of files removed
+        """
+        max_age = self.ttl_seconds if max_age is None else max_age
+        cutoff = self._clock() - max_age
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                # Rewrites bump mtime, which tracks fetched_at closely enough
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    removed += 1
+        return removed
@@ -0,0 +1,71 @@
+"""
+Flight range queries and keyset pagination for AirLogger.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import and_, or_, select
+from sqlalchemy.sql import Select
+from app.models import FlightRecord
+
+# Columns needed to serialize a flight; selecting them directly avoids
+# hydrating FlightRecord instances on read paths.
+FLIGHT_COLUMNS = (
+    FlightRecord.id,
+    FlightRecord.tail_number,
+    FlightRecord.departure_airport,
+    FlightRecord.arrival_airport,
+    FlightRecord.departure_time_utc,
+    FlightRecord.arrival_time_utc,
+    FlightRecord.flight_duration_minutes,
+)
+
+
+def select_flights(tail_number: str, start_date: datetime, end_date: datetime,
+                   after: Optional[Tuple[datetime, str]] = None) -> Select:
+    """
+    Build the flight range query, ordered by (departure_time_utc, id).
+
+    Args:
+        tail_number: Aircraft registration
+        start_date: Inclusive range start (UTC)
+        end_date: Inclusive range end (UTC)
+        after: Optional (departure_time_utc, id) keyset position to resume after
+
+    Returns:
+        Select over FLIGHT_COLUMNS
+    """
+    stmt = select(*FLIGHT_COLUMNS).where(
+        FlightRecord.tail_number == tail_number,
+        FlightRecord.departure_time_utc >= start_date,
+        FlightRecord.departure_time_utc <= end_date
+    )
+    if after is not None:
+        after_departure, after_id = after
+        stmt = stmt.where(or_(
+            FlightRecord.departure_time_utc > after_departure,
+            and_(FlightRecord.departure_time_utc == after_departure, FlightRecord.id > after_id)
+        ))
+    return stmt.order_by(FlightRecord.departure_time_utc, FlightRecord.id)
+
+
+def encode_cursor(row) -> str:
+    """Encode a flight's (departure_time_utc, id) as an opaque page cursor."""
+    payload = json.dumps([row.departure_time_utc.isoformat(), row.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a page cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        departure_str, flight_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(departure_str), str(flight_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,117 @@
+"""
+Flight ingest service for AirLogger.
+"""
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models import DataVersion, FlightRecord
+from app.services.rollups import add_to_rollups
+
+logger = logging.getLogger(__name__)
+
+# Flights per INSERT statement; SQLAlchemy splits each one into batches
+# that stay within SQLite's bound parameter limit
+DEFAULT_CHUNK_SIZE = 500
+
+# DataVersion counter bumped whenever flights are inserted
+FLIGHTS_VERSION = "flights"
+
+
+@dataclass
+class IngestResult:
+    """Counts reported by a call to store_flights."""
+    inserted: int = 0
+    skipped: int = 0
+    # UTC departure times of the inserted flights, per tail number
+    inserted_departures: Dict[str, List[datetime]] = field(default_factory=dict)
+    # Their flight durations in minutes, in the same order
+    inserted_minutes: Dict[str, List[int]] = field(default_factory=dict)
+    # Flights DataVersion after the insert, or None if nothing was inserted
+    flights_version: Optional[int] = None
+
+
+def store_flights(session, flights: Iterable[FlightRecord],
+                  chunk_size: int = DEFAULT_CHUNK_SIZE) -> IngestResult:
+    """
+    Store flights that are not already in the database.
+
+    Each chunk is written with a single executemany
+    ``INSERT ... ON CONFLICT (id) DO NOTHING RETURNING id``, instead of a
+    SELECT and an ORM add per flight. Flights already stored, including by
+    a concurrent writer, are skipped by the database rather than raising
+    IntegrityError, and only the rows it reports as written are counted,
+    so storing the same flights again is a no-op. Flights repeated within
+    the input are stored once. Daily rollups for the inserted flights and
+    the flights DataVersion are updated in the same transaction. The caller
+    owns the transaction and is responsible for committing.
+
+    Args:
+        session: Database session to write through
+        flights: FlightRecord objects, typically from process_flight_data
+        chunk_size: Number of flights per INSERT statement
+
+    Returns:
+        IngestResult with inserted and skipped counts
+    """
+    result = IngestResult()
+    seen_ids = set()
+    chunk = []
+
+    for flight in flights:
+        if flight.id in seen_ids:
+            result.skipped += 1
+            continue
+        seen_ids.add(flight.id)
+        chunk.append(flight)
+
+        if len(chunk) >= chunk_size:
+            _store_chunk(session, chunk, result)
+            chunk = []
+
+    if chunk:
+        _store_chunk(session, chunk, result)
+
+    if result.inserted:
+        result.flights_version = DataVersion.bump(session, FLIGHTS_VERSION)
+
+    logger.info(f"Ingest stored {result.inserted} new flights, skipped {result.skipped} duplicates")
+    return result
+
+
+def _store_chunk(session, chunk: List[FlightRecord], result: IngestResult) -> None:
+    """Insert the flights in one chunk whose IDs are not stored yet."""
+    stmt = sqlite_insert(FlightRecord).on_conflict_do_nothing(index_elements=[FlightRecord.id])
+    rows = [_flight_row(flight) for flight in chunk]
+    inserted_ids = set(session.scalars(stmt.returning(FlightRecord.id), rows))
+
+    rows = [row for row in rows if row["id"] in inserted_ids]
+    if rows:
+        add_to_rollups(session, rows)
+        for row in rows:
+            result.inserted_departures.setdefault(row["tail_number"], []).append(row["departure_time_utc"])
+            result.inserted_minutes.setdefault(row["tail_number"], []).append(row["flight_duration_minutes"])
+
+    result.inserted += len(rows)
+    result.skipped += len(chunk) - len(rows)
+
+
+def _flight_row(flight: FlightRecord) -> Dict[str, Any]:
+    """Column values for inserting a FlightRecord."""
+    return {
+        "id": flight.id,
+        "tail_number": flight.tail_number,
+        "departure_airport": flight.departure_airport,
+        "arrival_airport": flight.arrival_airport,
+        "departure_time_utc": _as_utc(flight.departure_time_utc),
+        "arrival_time_utc": _as_utc(flight.arrival_time_utc),
+        "flight_duration_minutes": flight.flight_duration_minutes,
+    }
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Normalize an aware datetime to UTC; SQLite stores it without offset."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value
@@ -0,0 +1,173 @@
+"""
+Background FlightAware refresh jobs for AirLogger.
+"""
+import logging
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from app.models import RefreshJob
+from app.services.flightaware import FlightAwareError
+from app.services.refresh import refresh_once
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Job states, in the order a job moves through them
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+SKIPPED = "skipped"  # Throttled by REFRESH_MIN_INTERVAL_SECONDS
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobQueueFull(Exception):
+    """Raised when too many refresh jobs are already waiting or running."""
+    pass
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def recover_interrupted_jobs(session) -> int:
+    """
+    Fail jobs left queued or running by a previous process.
+
+    Their worker threads died with that process, so without this they would
+    report an active state forever.
+
+    Returns:
+        Number of jobs marked failed
+    """
+    jobs = session.query(RefreshJob).filter(RefreshJob.status.in_(ACTIVE_STATUSES)).all()
+    now = _utcnow()
+    for job in jobs:
+        job.status = FAILED
+        job.finished_at = now
+        job.error = "Interrupted by a server restart"
+    session.commit()
+    if jobs:
+        logger.warning(f"Marked {len(jobs)} interrupted refresh jobs as failed")
+    return len(jobs)
+
+
+class RefreshJobRunner:
+    """
+    Runs refreshes on a bounded thread pool and records them in refresh_jobs.
+
+    Each job uses its own database session from session_factory. At most
+    max_pending jobs may be queued or running at once; further submissions
+    raise JobQueueFull instead of growing the queue without bound. Jobs
+    share singleflight with synchronous refreshes, so concurrent refreshes
+    of the same tail run upstream only once.
+    """
+
+    def __init__(self, session_factory, response_cache=None, max_workers: int = 2, max_pending: int = 16,
+                 singleflight: Optional[SingleFlight] = None, summary_index=None, flight_cache=None):
+        self.session_factory = session_factory
+        self.response_cache = response_cache
+        self.summary_index = summary_index
+        self.flight_cache = flight_cache
+        self.singleflight = singleflight or SingleFlight()
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="refresh-job")
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+
+    def submit(self, client, tail_number: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Record a queued job and schedule it.
+
+        Args:
+            client: FlightAwareClient the job fetches with
+            tail_number: Aircraft registration
+            full: Ignore the sync high-water mark (see run_refresh)
+
+        Returns:
+            The new job as a dictionary
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already queued or running
+        """
+        with self._lock:
+            self._futures = {job_id: f for job_id, f in self._futures.items() if not f.done()}
+            if len(self._futures) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._futures)} refresh jobs already pending")
+
+            session = self.session_factory()
+            try:
+                job = RefreshJob(
+                    id=uuid.uuid4().hex,
+                    tail_number=tail_number,
+                    full=full,
+                    status=QUEUED,
+                    created_at=_utcnow()
+                )
+                session.add(job)
+                session.commit()
+                job_dict = job.to_dict()
+            finally:
+                session.close()
+
+            self._futures[job_dict["id"]] = self._executor.submit(self._run, job_dict["id"], client)
+        logger.info(f"Queued refresh job {job_dict['id']} for {tail_number}")
+        return job_dict
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> None:
+        """Block until a job submitted by this runner has finished."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs, optionally waiting for running ones."""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job_id: str, client) -> None:
+        session = self.session_factory()
+        try:
+            job = session.get(RefreshJob, job_id)
+            job.status = RUNNING
+            job.started_at = _utcnow()
+            tail_number, full = job.tail_number, job.full
+            session.commit()
+
+            try:
+                result, _ = refresh_once(self.singleflight, self.session_factory, client, tail_number,
+                                         full=full, response_cache=self.response_cache,
+                                         summary_index=self.summary_index, flight_cache=self.flight_cache)
+            except Exception as e:
+                session.rollback()
+                if isinstance(e, FlightAwareError):
+                    logger.error(f"Refresh job {job_id} failed: {e}")
+                else:
+                    logger.error(f"Refresh job {job_id} failed: {e}", exc_info=True)
+                job = session.get(RefreshJob, job_id)
+                job.status = FAILED
+                job.finished_at = _utcnow()
+                job.error = str(e)
+                session.commit()
+                return
+
+            job.status = SKIPPED if result.throttled else SUCCEEDED
+            job.finished_at = _utcnow()
+            job.window_start = result.start_date
+            job.window_end = result.end_date
+            job.full = result.full
+            job.flights_fetched = result.fetched
+            job.flights_added = result.inserted
+            job.flights_skipped = result.skipped
+            if result.throttled:
+                job.error = f"FlightAware was queried recently; next fetch allowed in {result.retry_after:.0f} s"
+            session.commit()
+            logger.info(f"Refresh job {job_id} stored {result.inserted} new flights")
+        except Exception as e:
+            # Recording the outcome itself failed; nothing left to update
+            logger.error(f"Refresh job {job_id} could not be recorded: {e}", exc_info=True)
+            session.rollback()
+        finally:
+            session.close()
@@ -0,0 +1,124 @@
+"""
+Incremental parsing of large JSON response bodies.
+"""
+import codecs
+import json
+from typing import Any, Dict, Iterable, Iterator, Union
+
+_WHITESPACE = " \t\n\r"
+
+# Drop consumed text from the buffer once this much has accumulated
+_COMPACT_AFTER = 64 * 1024
+
+
+class JSONStreamError(ValueError):
+    """Raised when a streamed document is malformed or truncated."""
+
+
+class StreamingObjectParser:
+    """
+    Parse a top-level JSON object from chunks, yielding one array's elements.
+
+    Elements of the array stored under array_key are decoded and yielded one
+    at a time as soon as enough of the body has arrived, so the whole
+    document is never held in memory. Every other top-level member is decoded
+    whole and left in fields (AeroAPI's links and num_pages, for example);
+    members after the array are available once iteration finishes.
+
+    Example:
+        parser = StreamingObjectParser(response.iter_content(65536), "flights")
+        for flight in parser:
+            ...
+        next_link = (parser.fields.get("links") or {}).get("next")
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]], array_key: str):
+        self.array_key = array_key
+        self.fields: Dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[Any]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise JSONStreamError("Object keys must be strings")
+            self._expect(":")
+            if key == self.array_key and self._peek() == "[":
+                self._pos += 1
+                yield from self._elements()
+            else:
+                self.fields[key] = self._value()
+            if self._next_delimiter(",}") == "}":
+                return
+
+    def _elements(self) -> Iterator[Any]:
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._pos > _COMPACT_AFTER:
+                self._buf = self._buf[self._pos:]
+                self._pos = 0
+            if self._next_delimiter(",]") == "]":
+                return
+
+    def _value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise JSONStreamError(f"Malformed JSON at offset {e.pos}") from e
+                self._read()
+                continue
+            # A number ending exactly at the buffer end may continue in the
+            # next chunk
+            if end == len(self._buf) and not self._eof:
+                self._read()
+                continue
+            self._pos = end
+            return value
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                raise JSONStreamError("Unexpected end of JSON document")
+            self._read()
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise JSONStreamError(f"Expected {char!r} at offset {self._pos}")
+        self._pos += 1
+
+    def _next_delimiter(self, allowed: str) -> str:
+        char = self._peek()
+        if char not in allowed:
+            raise JSONStreamError(f"Expected one of {allowed!r} at offset {self._pos}")
+        self._pos += 1
+        return char
+
+    def _read(self) -> None:
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                self._buf += text
+                return
+        self._buf += self._utf8.decode(b"", final=True)
+        self._eof = True
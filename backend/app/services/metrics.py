@@ -0,0 +1,280 @@
+"""
+Request, SQL and FlightAware instrumentation exported in Prometheus format.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from flask import request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+
+# Endpoint label for SQL run outside a request (background jobs, startup)
+NO_REQUEST = "none"
+
+# Slow request log: how many distinct statements to list, and their length
+SLOW_REQUEST_TOP_QUERIES = 3
+SLOW_REQUEST_SQL_CHARS = 200
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set."""
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # One count per bucket, then +Inf count and sum
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[Labels, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] += amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._series.get(tuple(sorted(labels.items())), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = dict(self._series)
+        for key, value in sorted(series.items()):
+            lines.append(f"{self.name}{_labels(key)} {_number(value)}")
+        return lines
+
+
+def gauge(name: str, help_text: str, value: Optional[float]) -> List[str]:
+    """Exposition lines for a single unlabelled gauge (omitted if value is None)."""
+    if value is None:
+        return []
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+
+
+def _labels(key: Labels) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.6f}"
+
+
+class RequestStats:
+    """SQL issued while handling one request."""
+
+    __slots__ = ("started", "elapsed", "queries", "query_seconds", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        # statement -> [executions, seconds]
+        self.statements: Dict[str, List[float]] = {}
+
+    def top_statements(self, limit: int = SLOW_REQUEST_TOP_QUERIES) -> List[Tuple[str, int, float]]:
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)
+        return [(sql, int(count), seconds) for sql, (count, seconds) in ranked[:limit]]
+
+
+class Metrics:
+    """
+    Process-wide instrumentation shared by every app and FlightAware client.
+
+    Request hooks time each request by its URL rule (so /refresh_jobs/<id>
+    is one series), SQLAlchemy cursor events count statements and their time
+    against the request running on the same thread, and FlightAwareClient
+    reports every logical AeroAPI call. Recording is a few perf_counter()
+    calls and dictionary updates under a lock; rendering happens only when
+    /api/metrics is scraped.
+    """
+
+    def __init__(self):
+        self.requests = Counter("airlogger_requests_total", "HTTP requests by endpoint, method and status.")
+        self.request_duration = Histogram(
+            "airlogger_request_duration_seconds", "Time to produce a response, by endpoint and method.")
+        self.db_queries = Counter("airlogger_db_queries_total", "SQL statements executed, by endpoint.")
+        self.db_query_seconds = Counter(
+            "airlogger_db_query_seconds_total", "Time spent executing SQL statements, by endpoint.")
+        self.db_queries_per_request = Histogram(
+            "airlogger_db_queries_per_request", "SQL statements per request, by endpoint.", QUERY_COUNT_BUCKETS)
+        self.flightaware_duration = Histogram(
+            "airlogger_flightaware_request_duration_seconds",
+            "AeroAPI call time including retries, by endpoint template and outcome.")
+        self.flightaware_retries = Counter(
+            "airlogger_flightaware_retries_total", "AeroAPI attempts retried, by endpoint template.")
+        self._local = threading.local()
+
+    # Requests
+
+    def start_request(self) -> None:
+        self._local.request = RequestStats()
+
+    def finish_request(self, endpoint: str, method: str, status: int) -> Optional[RequestStats]:
+        stats: Optional[RequestStats] = getattr(self._local, "request", None)
+        if stats is None:
+            return None
+        self._local.request = None
+        stats.elapsed = time.perf_counter() - stats.started
+        self.requests.inc(endpoint=endpoint, method=method, status=str(status))
+        self.request_duration.observe(stats.elapsed, endpoint=endpoint, method=method)
+        self.db_queries.inc(stats.queries, endpoint=endpoint)
+        self.db_query_seconds.inc(stats.query_seconds, endpoint=endpoint)
+        self.db_queries_per_request.observe(stats.queries, endpoint=endpoint)
+        return stats
+
+    def discard_request(self) -> None:
+        self._local.request = None
+
+    # SQL
+
+    def record_query(self, statement: str, seconds: float) -> None:
+        stats: Optional[RequestStats] = getattr(self._local, "request", None)
+        if stats is None:
+            self.db_queries.inc(endpoint=NO_REQUEST)
+            self.db_query_seconds.inc(seconds, endpoint=NO_REQUEST)
+            return
+        stats.queries += 1
+        stats.query_seconds += seconds
+        entry = stats.statements.get(statement)
+        if entry is None:
+            stats.statements[statement] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def instrument_engine(self, engine) -> None:
+        """Time every statement an engine executes."""
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            started = conn.info["query_started"].pop()
+            self.record_query(statement, time.perf_counter() - started)
+
+    # FlightAware
+
+    def record_flightaware_call(self, endpoint: str, status: Optional[int], seconds: float,
+                                retries: int, cached: bool) -> None:
+        outcome = "cached" if cached else ("error" if status is None else str(status))
+        self.flightaware_duration.observe(seconds, endpoint=endpoint, status=outcome)
+        if retries:
+            self.flightaware_retries.inc(retries, endpoint=endpoint)
+
+    # Export
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        lines: List[str] = []
+        for metric in (self.requests, self.request_duration, self.db_queries, self.db_query_seconds,
+                       self.db_queries_per_request, self.flightaware_duration, self.flightaware_retries):
+            lines.extend(metric.render())
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every app and FlightAwareClient in the process
+metrics = Metrics()
+
+
+def slow_request_seconds() -> float:
+    """Requests slower than SLOW_REQUEST_SECONDS (default 1.0, 0 disables) are logged."""
+    return float(os.getenv("SLOW_REQUEST_SECONDS", 1.0))
+
+
+def register_metrics(app, engines) -> None:
+    """
+    Instrument an app's requests and database engines.
+
+    Disabled entirely when METRICS_ENABLED is false.
+    """
+    if os.getenv("METRICS_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return
+
+    metrics.instrument_engine(engines.writer)
+    if engines.split:
+        metrics.instrument_engine(engines.reader)
+    slow_after = slow_request_seconds()
+
+    @app.before_request
+    def start_request_timer():
+        metrics.start_request()
+
+    @app.after_request
+    def record_request(response):
+        # Streamed bodies are produced after this point; their time is not included
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        stats = metrics.finish_request(endpoint, request.method, response.status_code)
+        if stats is not None and 0 < slow_after <= stats.elapsed:
+            _log_slow_request(response.status_code, stats)
+        return response
+
+    @app.teardown_request
+    def discard_request_stats(error=None):
+        # after_request does not run when a view raises
+        metrics.discard_request()
+
+
+def _log_slow_request(status: int, stats: RequestStats) -> None:
+    top = "; ".join(
+        f"{seconds * 1000:.1f} ms x{count}: {' '.join(sql.split())[:SLOW_REQUEST_SQL_CHARS]}"
+        for sql, count, seconds in stats.top_statements()
+    )
+    logger.warning(
+        f"Slow request {request.method} {request.full_path.rstrip('?')} took {stats.elapsed:.3f}s "
+        f"(status {status}, {stats.queries} queries in {stats.query_seconds:.3f}s)"
+        + (f"; top queries: {top}" if top else "")
+    )
@@ -0,0 +1,273 @@
+"""
+FlightAware AeroAPI rate limiting and usage accounting.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models import ApiUsage, RateLimitState
+
+logger = logging.getLogger(__name__)
+
+# rate_limit_state row holding the process token bucket
+RATE_LIMITER_NAME = "flightaware"
+
+# Estimated USD per AeroAPI result set; FLIGHTAWARE_ENDPOINT_COSTS (a JSON
+# object keyed by endpoint template) overrides these
+DEFAULT_ENDPOINT_COSTS = {
+    "/flights/{ident}": 0.005,
+    "/history/flights/{ident}": 0.01,
+}
+DEFAULT_COST_PER_CALL = 0.005
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Holds up to capacity tokens and refills at rate tokens per second;
+    acquire() sleeps until a token is available, so callers slow down
+    smoothly instead of being rejected.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.waited_seconds = 0.0
+        self._clock = time.monotonic
+        self._sleep = time.sleep
+        self._updated = self._clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens, waiting for the bucket to refill if necessary.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    self.waited_seconds += waited
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    def snapshot(self) -> Tuple[float, float]:
+        """Current level and the Unix time it was sampled."""
+        with self._lock:
+            self._refill()
+            return self.tokens, time.time()
+
+    def restore(self, tokens: float, saved_at: float) -> None:
+        """Resume from a snapshot, crediting the time since it was taken."""
+        with self._lock:
+            elapsed = max(time.time() - saved_at, 0.0)
+            self.tokens = min(self.capacity, tokens + elapsed * self.rate)
+            self._updated = self._clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+_rate_limiter: Optional[TokenBucket] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[TokenBucket]:
+    """
+    Get the process-wide AeroAPI token bucket shared by all clients.
+
+    Configured by FLIGHTAWARE_RATE_PER_MINUTE (default 60, 0 disables) and
+    FLIGHTAWARE_RATE_BURST (default 10).
+    """
+    global _rate_limiter
+    per_minute = float(os.getenv("FLIGHTAWARE_RATE_PER_MINUTE", 60))
+    burst = float(os.getenv("FLIGHTAWARE_RATE_BURST", 10))
+    if per_minute <= 0:
+        return None
+    with _rate_limiter_lock:
+        if _rate_limiter is None or _rate_limiter.rate != per_minute / 60 or _rate_limiter.capacity != burst:
+            _rate_limiter = TokenBucket(per_minute / 60, burst)
+        return _rate_limiter
+
+
+def endpoint_template(endpoint: str) -> str:
+    """Reduce a request path or URL to its AeroAPI endpoint template."""
+    path = urlsplit(endpoint).path
+    for prefix in ("/history/flights/", "/flights/"):
+        if prefix in path:
+            return f"{prefix}{{ident}}"
+    return path
+
+
+def endpoint_cost(template: str) -> float:
+    """Estimated USD for one billable call to an endpoint."""
+    costs = dict(DEFAULT_ENDPOINT_COSTS)
+    overrides = os.getenv("FLIGHTAWARE_ENDPOINT_COSTS")
+    if overrides:
+        try:
+            costs.update({k: float(v) for k, v in json.loads(overrides).items()})
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Ignoring invalid FLIGHTAWARE_ENDPOINT_COSTS: {e}")
+    return costs.get(template, DEFAULT_COST_PER_CALL)
+
+
+class UsageCounter:
+    """In-memory AeroAPI call counts per (UTC day, endpoint), pending a flush to api_usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[Tuple[date, str], List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def record(self, endpoint: str, status: Optional[int] = None, cached: bool = False,
+               when: Optional[datetime] = None) -> None:
+        """Count one request attempt (or one cache hit) against its endpoint."""
+        day = (when or datetime.now(timezone.utc)).date()
+        with self._lock:
+            counts = self._counts[(day, endpoint_template(endpoint))]
+            if cached:
+                counts[2] += 1
+            else:
+                counts[0] += 1
+                if status == 200:
+                    counts[1] += 1
+
+    def drain(self) -> Dict[Tuple[date, str], List[int]]:
+        """Take and reset the pending counts."""
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(lambda: [0, 0, 0])
+        return dict(counts)
+
+    def snapshot(self) -> Dict[Tuple[date, str], List[int]]:
+        """Copy the pending counts without resetting them."""
+        with self._lock:
+            return {key: list(counts) for key, counts in self._counts.items()}
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._counts)
+
+
+# Shared by every FlightAwareClient in the process
+api_usage = UsageCounter()
+
+
+def flush_api_usage(session) -> int:
+    """
+    Write pending call counts and the token bucket level to the database.
+
+    Runs in the caller's transaction; the caller commits.
+
+    Returns:
+        Number of (day, endpoint) rows updated
+    """
+    counts = api_usage.drain()
+    if counts:
+        stmt = sqlite_insert(ApiUsage)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ApiUsage.day, ApiUsage.endpoint],
+            set_={
+                "calls": ApiUsage.calls + stmt.excluded.calls,
+                "billable_calls": ApiUsage.billable_calls + stmt.excluded.billable_calls,
+                "cache_hits": ApiUsage.cache_hits + stmt.excluded.cache_hits,
+                "cost": ApiUsage.cost + stmt.excluded.cost,
+            }
+        )
+        session.execute(stmt, [
+            {
+                "day": day,
+                "endpoint": endpoint,
+                "calls": calls,
+                "billable_calls": billable,
+                "cache_hits": cache_hits,
+                "cost": billable * endpoint_cost(endpoint),
+            }
+            for (day, endpoint), (calls, billable, cache_hits) in counts.items()
+        ])
+
+    limiter = get_rate_limiter()
+    if limiter is not None:
+        tokens, saved_at = limiter.snapshot()
+        stmt = sqlite_insert(RateLimitState).values(name=RATE_LIMITER_NAME, tokens=tokens, updated_at=saved_at)
+        session.execute(stmt.on_conflict_do_update(
+            index_elements=[RateLimitState.name],
+            set_={"tokens": stmt.excluded.tokens, "updated_at": stmt.excluded.updated_at}
+        ))
+    return len(counts)
+
+
+def restore_rate_limiter(session) -> None:
+    """Resume the process token bucket from its saved level, if any."""
+    limiter = get_rate_limiter()
+    state = session.get(RateLimitState, RATE_LIMITER_NAME)
+    if limiter is not None and state is not None:
+        limiter.restore(state.tokens, state.updated_at)
+
+
+def usage_by_day(session, start_day: date, end_day: date,
+                 pending: Optional[Dict[Tuple[date, str], List[int]]] = None) -> List[Dict[str, Any]]:
+    """
+    AeroAPI usage per UTC day in [start_day, end_day], oldest first.
+
+    Args:
+        session: Database session (read-only is enough)
+        start_day: First UTC day
+        end_day: Last UTC day
+        pending: Unflushed counts to add, as from api_usage.snapshot()
+
+    Returns:
+        One dictionary per day with totals and a per-endpoint breakdown
+    """
+    rows = (
+        session.query(ApiUsage)
+        .filter(ApiUsage.day >= start_day, ApiUsage.day <= end_day)
+        .order_by(ApiUsage.day, ApiUsage.endpoint)
+    )
+    # (calls, billable_calls, cache_hits, cost) per (day, endpoint)
+    usage: Dict[Tuple[date, str], List[float]] = {
+        (row.day, row.endpoint): [row.calls, row.billable_calls, row.cache_hits, row.cost] for row in rows
+    }
+    for (day, endpoint), (calls, billable, cache_hits) in (pending or {}).items():
+        if start_day <= day <= end_day:
+            totals = usage.setdefault((day, endpoint), [0, 0, 0, 0.0])
+            totals[0] += calls
+            totals[1] += billable
+            totals[2] += cache_hits
+            totals[3] += billable * endpoint_cost(endpoint)
+
+    days: Dict[date, Dict[str, Any]] = {}
+    for (row_day, endpoint), (calls, billable, cache_hits, cost) in sorted(usage.items()):
+        day = days.setdefault(row_day, {
+            "date": row_day.isoformat(),
+            "calls": 0,
+            "billable_calls": 0,
+            "cache_hits": 0,
+            "cost": 0.0,
+            "endpoints": {}
+        })
+        day["calls"] += calls
+        day["billable_calls"] += billable
+        day["cache_hits"] += cache_hits
+        day["cost"] = round(day["cost"] + cost, 4)
+        day["endpoints"][endpoint] = {
+            "calls": calls,
+            "billable_calls": billable,
+            "cache_hits": cache_hits,
+            "cost": round(cost, 4)
+        }
+    return list(days.values())
@@ -0,0 +1,247 @@
+"""
+FlightAware refresh pipeline for AirLogger.
+"""
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models import FetchLock, FlightRecord, SyncState
+from app.services.flightaware import current_time
+from app.services.ingest import IngestResult, store_flights
+from app.services.quota import flush_api_usage
+from app.services.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Window fetched by a full refresh, and the cap for incremental ones
+FULL_REFRESH_DAYS = 90
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of one refresh of a tail number."""
+    tail_number: str
+    start_date: datetime
+    end_date: datetime
+    full: bool
+    fetched: int = 0
+    ingest: Optional[IngestResult] = None
+    throttled: bool = False
+    retry_after: Optional[float] = None  # Seconds until the next fetch is allowed, if throttled
+
+    @property
+    def inserted(self) -> int:
+        return self.ingest.inserted if self.ingest else 0
+
+    @property
+    def skipped(self) -> int:
+        return self.ingest.skipped if self.ingest else 0
+
+
+def refresh_overlap() -> timedelta:
+    """How far before the high-water mark incremental refreshes start."""
+    return timedelta(hours=float(os.getenv("REFRESH_OVERLAP_HOURS", 6)))
+
+
+def refresh_min_interval() -> timedelta:
+    """Minimum time between FlightAware fetches for one tail number."""
+    return timedelta(seconds=float(os.getenv("REFRESH_MIN_INTERVAL_SECONDS", 30)))
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite returns naive datetimes; they are stored as UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def plan_refresh_window(session, tail_number: str, now: datetime,
+                        full: bool = False) -> Tuple[datetime, datetime, bool]:
+    """
+    Choose the FlightAware window for a refresh.
+
+    Incremental refreshes start a small overlap before the latest departure
+    already ingested (or the last sync, if nothing was ingested yet), so
+    late updates near the mark are picked up again. They never reach further
+    back than a full refresh would.
+
+    Returns:
+        (start_date, end_date, full) where full reports whether the whole
+        FULL_REFRESH_DAYS window is being fetched
+    """
+    full_start = now - timedelta(days=FULL_REFRESH_DAYS)
+    state = None if full else session.get(SyncState, tail_number)
+    mark = state and (state.last_departure_time_utc or state.last_synced_at)
+    if mark is None:
+        return full_start, now, True
+
+    start = _as_utc(mark) - refresh_overlap()
+    if start <= full_start:
+        return full_start, now, True
+    return start, now, False
+
+
+def update_sync_state(session, tail_number: str, flights: List[FlightRecord], synced_at: datetime) -> SyncState:
+    """Advance a tail's high-water mark past the flights just fetched."""
+    state = session.get(SyncState, tail_number)
+    if state is None:
+        state = SyncState(tail_number=tail_number)
+        session.add(state)
+
+    latest = max(flights, key=lambda f: (_as_utc(f.departure_time_utc), f.id), default=None)
+    if latest is not None:
+        latest_departure = _as_utc(latest.departure_time_utc)
+        if state.last_departure_time_utc is None or latest_departure > _as_utc(state.last_departure_time_utc):
+            state.last_departure_time_utc = latest_departure
+            state.last_fa_flight_id = latest.id
+
+    state.last_synced_at = synced_at
+    return state
+
+
+def claim_fetch_slot(session, tail_number: str, now: datetime,
+                     min_interval: timedelta) -> Optional[timedelta]:
+    """
+    Record a fetch for a tail unless one happened within min_interval.
+
+    The claim is a conditional UPDATE of the tail's fetch_locks row, which
+    SQLite's write lock serializes across threads and worker processes, so
+    only one caller can win each slot. It is committed straight away to
+    release that lock before the fetch starts.
+
+    Returns:
+        None if the slot was claimed, otherwise the time until the next one
+    """
+    session.execute(sqlite_insert(FetchLock).values(tail_number=tail_number).on_conflict_do_nothing())
+    claimed = session.execute(
+        update(FetchLock)
+        .where(
+            FetchLock.tail_number == tail_number,
+            or_(FetchLock.last_fetch_at.is_(None), FetchLock.last_fetch_at <= now - min_interval)
+        )
+        .values(last_fetch_at=now)
+    ).rowcount
+    session.commit()
+    if claimed:
+        return None
+
+    last_fetch_at = _as_utc(session.get(FetchLock, tail_number).last_fetch_at)
+    return max(last_fetch_at + min_interval - now, timedelta(0))
+
+
+def begin_refresh(session, tail_number: str, now: datetime, full: bool = False,
+                  min_interval: Optional[timedelta] = None) -> RefreshResult:
+    """
+    Plan a tail's refresh window and claim its fetch slot.
+
+    The planning transaction is committed before returning, so the
+    session holds no connection (and, on the writer, no read snapshot)
+    while the caller fetches from FlightAware.
+
+    Returns:
+        RefreshResult with the window set, and throttled set if the tail was
+        fetched less than min_interval (default REFRESH_MIN_INTERVAL_SECONDS) ago
+    """
+    start_date, end_date, full = plan_refresh_window(session, tail_number, now, full=full)
+    result = RefreshResult(tail_number=tail_number, start_date=start_date, end_date=end_date, full=full)
+
+    min_interval = refresh_min_interval() if min_interval is None else min_interval
+    if min_interval > timedelta(0):
+        wait = claim_fetch_slot(session, tail_number, now, min_interval)
+        if wait is not None:
+            logger.info(f"Skipping refresh for {tail_number}: last fetch was under {min_interval} ago")
+            result.throttled = True
+            result.retry_after = wait.total_seconds()
+    session.commit()
+    return result
+
+
+def run_refresh(session, client, tail_number: str, full: bool = False,
+                now: Optional[datetime] = None, min_interval: Optional[timedelta] = None) -> RefreshResult:
+    """
+    Fetch, process and store new flights for one tail number, then commit.
+
+    Args:
+        session: Database session
+        client: FlightAwareClient
+        tail_number: Aircraft registration
+        full: Ignore the sync high-water mark and fetch FULL_REFRESH_DAYS
+        now: Current time (UTC), for tests (default current_time(), which
+            follows the replay clock when replaying)
+        min_interval: Minimum time since the tail's last fetch; defaults to
+            REFRESH_MIN_INTERVAL_SECONDS. Refreshes inside it are skipped
+            and come back with throttled set.
+
+    Returns:
+        RefreshResult
+
+    Raises:
+        FlightAwareError: If FlightAware could not be queried
+    """
+    now = now or current_time()
+    result = begin_refresh(session, tail_number, now, full=full, min_interval=min_interval)
+    if result.throttled:
+        return result
+
+    logger.info(f"Starting {'full' if result.full else 'incremental'} refresh for {tail_number} "
+                f"from {result.start_date.isoformat()}")
+
+    raw_flights = client.fetch_aircraft_history(tail_number, result.start_date, result.end_date,
+                                                raise_errors=True, now=now)
+    result.fetched = len(raw_flights)
+
+    processed_flights = client.process_flight_data(raw_flights) if raw_flights else []
+    result.ingest = store_flights(session, processed_flights)
+    update_sync_state(session, tail_number, processed_flights, now)
+    flush_api_usage(session)
+    session.commit()
+    return result
+
+
+def apply_ingest_result(ingest: Optional[IngestResult], response_cache=None, flight_cache=None,
+                        summary_index=None) -> None:
+    """
+    Bring this process's caches up to date with flights it just stored.
+
+    Cached responses and recent-flight windows overlapping the new flights
+    are invalidated and the flights added to the summary index. Caches that
+    are None (disabled) are skipped, as is an ingest that stored nothing.
+    """
+    if ingest is None or not ingest.inserted:
+        return
+    if response_cache is not None:
+        response_cache.invalidate_flights(ingest.inserted_departures, ingest.flights_version)
+    if flight_cache is not None:
+        flight_cache.invalidate_flights(ingest.inserted_departures, ingest.flights_version)
+    if summary_index is not None:
+        summary_index.add_flights(ingest.inserted_departures, ingest.inserted_minutes, ingest.flights_version)
+
+
+def refresh_once(flights: SingleFlight, session_factory, client, tail_number: str,
+                 full: bool = False, response_cache=None, summary_index=None,
+                 flight_cache=None) -> Tuple[RefreshResult, bool]:
+    """
+    Run a refresh, or join an identical one already in flight in this process.
+
+    The refresh runs in its own session. Cached responses and recent-flight
+    windows overlapping newly stored flights are invalidated, and the flights
+    added to the summary index, before any caller receives the result.
+
+    Returns:
+        (RefreshResult, shared) where shared is True if another caller's
+        refresh was joined
+    """
+    def refresh() -> RefreshResult:
+        session = session_factory()
+        try:
+            result = run_refresh(session, client, tail_number, full=full)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        apply_ingest_result(result.ingest, response_cache, flight_cache, summary_index)
+        return result
+
+    return flights.do((tail_number, full), refresh)
@@ -0,0 +1,182 @@
+"""
+Bounded in-memory cache of serialized range query responses.
+"""
+import logging
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, Optional
+from app.services.versioning import KnownVersion
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """A serialized 200 response and the flight range it was built from."""
+    body: bytes
+    mimetype: str
+    tail_number: str
+    start_date: datetime
+    end_date: datetime
+    flights_version: int = 0
+
+
+class ResponseCache:
+    """
+    LRU cache of response bodies for flight range queries.
+
+    Bounded by both entry count and total body bytes. Entries are dropped
+    precisely when ingest inserts a flight inside their (tail number, date
+    range), and wholesale when settings change or another process stores
+    flights, which is detected through the DataVersion counters passed to
+    sync().
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._flights_version = KnownVersion()
+        self._settings_version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def sync(self, flights_version: int, settings_version: int) -> None:
+        """
+        Drop everything if the data changed behind this process's back.
+
+        Flights stored by this process are invalidated precisely through
+        invalidate_flights, which also advances the known version; any other
+        change to the counters means another writer was involved.
+        """
+        with self._lock:
+            flights_moved = self._flights_version.observe(flights_version)
+            settings_moved = self._settings_version is not None and settings_version != self._settings_version
+            if flights_moved or settings_moved:
+                self.invalidations += len(self._entries)
+                self._clear()
+            self._settings_version = settings_version
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Look up a response and mark it most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, entry: CachedResponse) -> bool:
+        """
+        Store a response, evicting least recently used entries to fit.
+
+        Returns:
+            False if the entry was not cached (too large or built from
+            flights older than an invalidation this cache already applied)
+        """
+        size = len(entry.body)
+        with self._lock:
+            if size > self.max_bytes:
+                return False
+            known = self._flights_version.value
+            if known is not None and entry.flights_version < known:
+                return False
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+            return True
+
+    def invalidate_flights(self, departures: Dict[str, Iterable[datetime]], flights_version: int) -> int:
+        """
+        Drop entries whose range contains a newly inserted flight.
+
+        Only an insert that moves the flights version by exactly one from
+        the version this cache knows can be applied precisely; a larger
+        step means another writer committed in between, so every entry is
+        dropped.
+
+        Args:
+            departures: Inserted departure times (UTC) per tail number
+            flights_version: Flights DataVersion committed with the insert
+
+        Returns:
+            Number of entries removed
+        """
+        sorted_departures = {tail: sorted(_naive(d) for d in times) for tail, times in departures.items()}
+        with self._lock:
+            step = self._flights_version.insert(flights_version)
+            if step == KnownVersion.SEEN:
+                # Already synced to a version that includes the insert
+                return 0
+            if step == KnownVersion.RESET:
+                removed = len(self._entries)
+                self.invalidations += removed
+                self._clear()
+                return removed
+            stale = [
+                key for key, entry in self._entries.items()
+                if _overlaps(sorted_departures.get(entry.tail_number), entry.start_date, entry.end_date)
+            ]
+            for key in stale:
+                self._bytes -= len(self._entries.pop(key).body)
+            self.invalidations += len(stale)
+        if stale:
+            logger.debug(f"Invalidated {len(stale)} cached responses after ingest")
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit, miss and eviction counters plus current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "flights_version": self._flights_version.value,
+                "settings_version": self._settings_version
+            }
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+
+def _naive(value: datetime) -> datetime:
+    """Compare all times as naive UTC, the way SQLite returns them."""
+    return value.replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def _overlaps(departures, start_date: datetime, end_date: datetime) -> bool:
+    """True if any sorted departure time falls within [start_date, end_date]."""
+    if not departures:
+        return False
+    i = bisect_left(departures, _naive(start_date))
+    return i < len(departures) and departures[i] <= _naive(end_date)
@@ -0,0 +1,194 @@
+"""
+Daily flight rollup maintenance for AirLogger.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable
+from sqlalchemy import Date, delete, exists, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.models import DailyFlightRollup, FlightRecord
+from app.services.summary import (
+    HOBBS_MINUTES_PER_FLIGHT, FlightTotals, billable_tenths, billable_tenths_expr
+)
+
+logger = logging.getLogger(__name__)
+
+
+def utc_day(value: datetime) -> date:
+    """UTC calendar day of a departure time."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def add_to_rollups(session, rows: Iterable[Dict[str, Any]]) -> int:
+    """
+    Add newly inserted flights to their daily rollups.
+
+    Must run in the same transaction as the flight insert so rollups never
+    drift from the flights table.
+
+    Args:
+        session: Database session
+        rows: Column values of the inserted flights
+
+    Returns:
+        Number of (tail number, day) rollups touched
+    """
+    buckets = defaultdict(lambda: [0, 0, 0])
+    for row in rows:
+        minutes = row["flight_duration_minutes"]
+        bucket = buckets[(row["tail_number"], utc_day(row["departure_time_utc"]))]
+        bucket[0] += 1
+        bucket[1] += minutes
+        bucket[2] += billable_tenths(minutes)
+
+    if not buckets:
+        return 0
+
+    stmt = sqlite_insert(DailyFlightRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyFlightRollup.tail_number, DailyFlightRollup.day],
+        set_={
+            "flight_count": DailyFlightRollup.flight_count + stmt.excluded.flight_count,
+            "flight_minutes": DailyFlightRollup.flight_minutes + stmt.excluded.flight_minutes,
+            "hobbs_minutes": DailyFlightRollup.hobbs_minutes + stmt.excluded.hobbs_minutes,
+            "billable_tenths": DailyFlightRollup.billable_tenths + stmt.excluded.billable_tenths,
+        }
+    )
+    session.execute(stmt, [
+        {
+            "tail_number": tail_number,
+            "day": day,
+            "flight_count": count,
+            "flight_minutes": minutes,
+            "hobbs_minutes": minutes + HOBBS_MINUTES_PER_FLIGHT * count,
+            "billable_tenths": tenths,
+        }
+        for (tail_number, day), (count, minutes, tenths) in buckets.items()
+    ])
+    return len(buckets)
+
+
+def aggregate_rollups(session, tail_number: str, start_date: datetime, end_date: datetime) -> FlightTotals:
+    """
+    Total flight time for a tail number from daily rollups.
+
+    The range is widened to whole UTC days, which is exact for the
+    day-granular ranges the API accepts.
+
+    Args:
+        session: Database session
+        tail_number: Aircraft registration
+        start_date: Range start (UTC)
+        end_date: Inclusive range end (UTC)
+
+    Returns:
+        FlightTotals for the days in range
+    """
+    row = session.execute(
+        select(
+            func.coalesce(func.sum(DailyFlightRollup.flight_count), 0),
+            func.coalesce(func.sum(DailyFlightRollup.flight_minutes), 0),
+            func.coalesce(func.sum(DailyFlightRollup.billable_tenths), 0),
+        ).where(
+            DailyFlightRollup.tail_number == tail_number,
+            DailyFlightRollup.day >= utc_day(start_date),
+            DailyFlightRollup.day <= utc_day(end_date)
+        )
+    ).one()
+    return FlightTotals(flight_count=row[0], flight_minutes=row[1], billable_tenths=row[2])
+
+
+def rollup_series(session, tail_number: str, start_date: datetime, end_date: datetime,
+                  bucket: str) -> Dict[date, FlightTotals]:
+    """
+    Total flight time per day, ISO week or month from daily rollups in one query.
+
+    Rollup days are grouped in SQLite by the first day of their bucket, the
+    SQL twin of summary.bucket_start. Buckets without flights are omitted.
+
+    Args:
+        session: Database session
+        tail_number: Aircraft registration
+        start_date: Range start (UTC)
+        end_date: Inclusive range end (UTC)
+        bucket: "day", "week" or "month"
+
+    Returns:
+        FlightTotals keyed by the first day of each bucket
+    """
+    day = DailyFlightRollup.day
+    if bucket == "week":
+        # Forward to Sunday (a Sunday stays put), then back to its Monday
+        key = func.date(day, "weekday 0", "-6 days", type_=Date)
+    elif bucket == "month":
+        key = func.date(day, "start of month", type_=Date)
+    else:
+        key = day
+    rows = session.execute(
+        select(
+            key,
+            func.sum(DailyFlightRollup.flight_count),
+            func.sum(DailyFlightRollup.flight_minutes),
+            func.sum(DailyFlightRollup.billable_tenths),
+        ).where(
+            DailyFlightRollup.tail_number == tail_number,
+            day >= utc_day(start_date),
+            day <= utc_day(end_date)
+        ).group_by(key)
+    )
+    return {
+        row[0]: FlightTotals(flight_count=row[1], flight_minutes=row[2], billable_tenths=row[3])
+        for row in rows
+    }
+
+
+def rebuild_rollups(session) -> int:
+    """
+    Recompute all daily rollups from the flights table.
+
+    The caller is responsible for committing.
+
+    Returns:
+        Number of rollup rows written
+    """
+    session.execute(delete(DailyFlightRollup))
+    flight_minutes = func.sum(FlightRecord.flight_duration_minutes)
+    flight_count = func.count(FlightRecord.id)
+    day = func.date(FlightRecord.departure_time_utc)
+    session.execute(
+        insert(DailyFlightRollup).from_select(
+            ["tail_number", "day", "flight_count", "flight_minutes", "hobbs_minutes", "billable_tenths"],
+            select(
+                FlightRecord.tail_number,
+                day,
+                flight_count,
+                flight_minutes,
+                flight_minutes + HOBBS_MINUTES_PER_FLIGHT * flight_count,
+                func.sum(billable_tenths_expr),
+            ).group_by(FlightRecord.tail_number, day)
+        )
+    )
+    count = session.scalar(select(func.count()).select_from(DailyFlightRollup))
+    logger.info(f"Rebuilt {count} daily flight rollups")
+    return count
+
+
+def ensure_rollups(session) -> bool:
+    """
+    Build rollups for a database that has flights but no rollups yet.
+
+    Returns:
+        True if the rollups were rebuilt
+    """
+    has_flights = session.scalar(select(exists().where(FlightRecord.id.isnot(None))))
+    has_rollups = session.scalar(select(exists().where(DailyFlightRollup.tail_number.isnot(None))))
+    if not has_flights or has_rollups:
+        return False
+
+    logger.info("Daily flight rollups missing, rebuilding from flights table")
+    rebuild_rollups(session)
+    session.commit()
+    return True
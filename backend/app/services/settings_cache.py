@@ -0,0 +1,97 @@
+"""
+Process-local cache of financial settings.
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from app.models import DataVersion, FinancialSettings
+
+logger = logging.getLogger(__name__)
+
+# DataVersion counter bumped whenever financial settings change
+SETTINGS_VERSION = "financial_settings"
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    """Immutable copy of FinancialSettings that is safe to share across requests."""
+    id: Optional[int]
+    revenue_per_hour: float
+    monthly_fixed_costs: float
+    variable_cost_per_hour: float
+    updated_at: Optional[str]
+
+    @classmethod
+    def from_model(cls, settings: FinancialSettings) -> "SettingsSnapshot":
+        data = settings.to_dict()
+        return cls(
+            id=data["id"],
+            revenue_per_hour=data["revenue_per_hour"],
+            monthly_fixed_costs=data["monthly_fixed_costs"],
+            variable_cost_per_hour=data["variable_cost_per_hour"],
+            updated_at=data["updated_at"]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Same shape as FinancialSettings.to_dict."""
+        return {
+            "id": self.id,
+            "revenue_per_hour": self.revenue_per_hour,
+            "monthly_fixed_costs": self.monthly_fixed_costs,
+            "variable_cost_per_hour": self.variable_cost_per_hour,
+            "updated_at": self.updated_at
+        }
+
+
+class SettingsCache:
+    """
+    Caches the settings row and revalidates it against its DataVersion.
+
+    Each read costs one primary key lookup on data_versions; the settings row
+    is only re-read when another writer (in this or another process) has
+    bumped the version. Reads never write: if no settings have been saved
+    yet, the defaults are served without creating a row.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[SettingsSnapshot] = None
+        self._version: Optional[int] = None
+
+    @property
+    def version(self) -> Optional[int]:
+        """Version of the cached snapshot, or None if nothing is cached."""
+        return self._version
+
+    def get(self, session) -> SettingsSnapshot:
+        """Return current settings, reloading them only if their version changed."""
+        # Read the version before the row so a concurrent write can only make
+        # the cached snapshot look stale, never fresh
+        version = DataVersion.current(session, SETTINGS_VERSION)
+        with self._lock:
+            if self._snapshot is not None and self._version == version:
+                return self._snapshot
+
+        settings = session.query(FinancialSettings).first()
+        snapshot = SettingsSnapshot.from_model(settings or FinancialSettings(**FinancialSettings.DEFAULTS))
+        logger.debug(f"Loaded financial settings version {version}")
+
+        with self._lock:
+            self._snapshot = snapshot
+            self._version = version
+        return snapshot
+
+    def store(self, settings: FinancialSettings, version: int) -> SettingsSnapshot:
+        """Cache settings that were just committed at the given version."""
+        snapshot = SettingsSnapshot.from_model(settings)
+        with self._lock:
+            self._snapshot = snapshot
+            self._version = version
+        return snapshot
+
+    def clear(self) -> None:
+        """Drop the cached snapshot."""
+        with self._lock:
+            self._snapshot = None
+            self._version = None
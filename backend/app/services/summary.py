@@ -0,0 +1,181 @@
+"""
+Summary aggregation and financial calculations for AirLogger.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+from app.models import FlightRecord
+
+# Ground engine time added to each flight for Hobbs time
+HOBBS_MINUTES_PER_FLIGHT = 15
+
+# Average days per month, used to prorate monthly fixed costs
+AVG_DAYS_IN_MONTH = 30.44
+
+# Bucket sizes accepted by /api/summary/series
+SERIES_BUCKETS = ("day", "week", "month")
+
+# Billable time per flight in tenths of an hour: Hobbs minutes rounded up to
+# the next 6 minutes, i.e. ceil((minutes + 15) / 6). Integer floor division
+# keeps this exact and matches FlightRecord.to_dict's rounding.
+billable_tenths_expr = (FlightRecord.flight_duration_minutes + HOBBS_MINUTES_PER_FLIGHT + 5) // 6
+
+
+def billable_tenths(flight_minutes: int) -> int:
+    """Billable tenths of an hour for one flight; Python twin of billable_tenths_expr."""
+    return (flight_minutes + HOBBS_MINUTES_PER_FLIGHT + 5) // 6
+
+
+@dataclass
+class FlightTotals:
+    """Aggregated flight time for a set of flights."""
+    flight_count: int = 0
+    flight_minutes: int = 0
+    billable_tenths: int = 0
+
+    @property
+    def hobbs_minutes(self) -> int:
+        return self.flight_minutes + HOBBS_MINUTES_PER_FLIGHT * self.flight_count
+
+    @property
+    def billable_hours(self) -> float:
+        return self.billable_tenths / 10
+
+
+def build_summary(settings, start_date: datetime, end_date: datetime, totals: FlightTotals) -> Dict[str, Any]:
+    """
+    Build the /api/summary payload from flight totals and financial settings.
+
+    Args:
+        settings: Object with revenue_per_hour, variable_cost_per_hour and monthly_fixed_costs
+        start_date: Start of the summarized period
+        end_date: End of the summarized period (inclusive)
+        totals: Aggregated flight time for the period
+
+    Returns:
+        Summary dictionary for JSON response
+    """
+    total_billable_hours = totals.billable_hours
+
+    # Financial calculations based on billable hours
+    total_revenue = round(total_billable_hours * settings.revenue_per_hour, 2)
+    total_variable_costs = round(total_billable_hours * settings.variable_cost_per_hour, 2)
+
+    # Fixed costs proportional to period
+    days_in_period = (end_date - start_date).days + 1
+    total_fixed_costs = round((settings.monthly_fixed_costs / AVG_DAYS_IN_MONTH) * days_in_period, 2)
+
+    net_profit = round(total_revenue - total_variable_costs - total_fixed_costs, 2)
+
+    # Breakeven calculations
+    # Breakeven revenue = Fixed costs + (Variable cost per hour * Hours needed)
+    # Since revenue per hour > variable cost per hour, we can calculate hours needed
+    profit_margin_per_hour = settings.revenue_per_hour - settings.variable_cost_per_hour
+
+    if profit_margin_per_hour > 0:
+        # Hours needed to cover fixed costs
+        breakeven_hours = total_fixed_costs / profit_margin_per_hour
+        # Round up to nearest 0.1 hour for billing purposes
+        breakeven_billable_hours = round(breakeven_hours * 10 + 0.49) / 10
+        breakeven_revenue = round(breakeven_billable_hours * settings.revenue_per_hour, 2)
+
+        # Additional hours needed from current position
+        additional_hours_needed = max(0, breakeven_billable_hours - total_billable_hours)
+        additional_revenue_needed = round(max(0, breakeven_revenue - total_revenue), 2)
+    else:
+        # Cannot break even if variable costs >= revenue
+        breakeven_billable_hours = None
+        breakeven_revenue = None
+        additional_hours_needed = None
+        additional_revenue_needed = None
+
+    return {
+        "period": "Custom",
+        "startDate": start_date.isoformat(),
+        "endDate": end_date.isoformat(),
+        "totalFlightMinutes": totals.flight_minutes,
+        "totalHobbsMinutes": totals.hobbs_minutes,
+        "totalBillableHours": round(total_billable_hours, 2),
+        "totalRevenue": total_revenue,
+        "totalFixedCosts": total_fixed_costs,
+        "totalVariableCosts": total_variable_costs,
+        "netProfit": net_profit,
+        "breakeven": {
+            "revenueNeeded": breakeven_revenue,
+            "hoursNeeded": breakeven_billable_hours,
+            "additionalRevenueNeeded": additional_revenue_needed,
+            "additionalHoursNeeded": round(additional_hours_needed, 2) if additional_hours_needed is not None else None,
+            "profitMarginPerHour": round(profit_margin_per_hour, 2)
+        }
+    }
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the day, ISO week (Monday) or calendar month containing day."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket_start(start: date, bucket: str) -> date:
+    """First day of the bucket after the one starting on start."""
+    if bucket == "week":
+        return start + timedelta(days=7)
+    if bucket == "month":
+        if start.year == date.max.year and start.month == 12:
+            raise OverflowError("date value out of range")
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def bucket_label(start: date, bucket: str) -> str:
+    """Display label for a bucket: 2024-01-15, 2024-W03 or 2024-01."""
+    if bucket == "week":
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if bucket == "month":
+        return start.strftime("%Y-%m")
+    return start.isoformat()
+
+
+def bucket_count(start_date: datetime, end_date: datetime, bucket: str) -> int:
+    """Number of buckets bucket_periods would return, without building them."""
+    first, last = bucket_start(start_date.date(), bucket), bucket_start(end_date.date(), bucket)
+    if last < first:
+        return 0
+    if bucket == "week":
+        return (last - first).days // 7 + 1
+    if bucket == "month":
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days + 1
+
+
+def bucket_periods(start_date: datetime, end_date: datetime, bucket: str) -> List[Tuple[date, datetime, datetime]]:
+    """
+    Split a range into day, week or month buckets.
+
+    The first and last periods are clipped to the range, so each period's
+    fixed costs are prorated exactly as a /api/summary call for it would be.
+
+    Args:
+        start_date: Range start (UTC, start of a day)
+        end_date: Inclusive range end (UTC, end of a day)
+        bucket: One of SERIES_BUCKETS
+
+    Returns:
+        (bucket start day, period start, period end) for every bucket in range
+
+    Raises:
+        OverflowError: If the range ends in the last bucket before year 10000
+    """
+    periods = []
+    key = bucket_start(start_date.date(), bucket)
+    while key <= end_date.date():
+        following = next_bucket_start(key, bucket)
+        period_start = max(start_date, datetime.combine(key, time(), tzinfo=timezone.utc))
+        period_end = min(end_date, datetime.combine(following, time(), tzinfo=timezone.utc) - timedelta(seconds=1))
+        periods.append((key, period_start, period_end))
+        key = following
+    return periods
@@ -0,0 +1,217 @@
+"""
+In-memory prefix-sum index of flight time per aircraft.
+"""
+import logging
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Integer, cast, func, select
+from app.models import DailyFlightRollup, DataVersion
+from app.services.ingest import FLIGHTS_VERSION
+from app.services.rollups import utc_day
+from app.services.summary import FlightTotals, billable_tenths
+from app.services.versioning import KnownVersion
+
+logger = logging.getLogger(__name__)
+
+# julianday() of the day before 0001-01-01, so julianday(day) minus this is
+# date.toordinal()
+JULIAN_DAY_OF_ORDINAL_ZERO = 1721424.5
+
+
+class TailIndex:
+    """
+    Days with flights for one aircraft, sorted, with running totals.
+
+    count[i], minutes[i] and tenths[i] hold the flight count, flight
+    minutes and billable tenths of the first i days, so the totals for days
+    i..j-1 are subtractions. Hobbs minutes follow from the count, as in
+    FlightTotals.
+    """
+
+    __slots__ = ("days", "count", "minutes", "tenths")
+
+    def __init__(self):
+        self.days = array("q")
+        self.count = array("q", [0])
+        self.minutes = array("q", [0])
+        self.tenths = array("q", [0])
+
+    def add(self, ordinal: int, flight_count: int, flight_minutes: int, tenths: int) -> bool:
+        """
+        Add flights on a day (date.toordinal()) no earlier than every indexed day.
+
+        Returns:
+            False, leaving the index unchanged, if the day is earlier
+        """
+        if self.days and ordinal < self.days[-1]:
+            return False
+        if self.days and ordinal == self.days[-1]:
+            self.count[-1] += flight_count
+            self.minutes[-1] += flight_minutes
+            self.tenths[-1] += tenths
+            return True
+        self.days.append(ordinal)
+        self.count.append(self.count[-1] + flight_count)
+        self.minutes.append(self.minutes[-1] + flight_minutes)
+        self.tenths.append(self.tenths[-1] + tenths)
+        return True
+
+    def totals(self, start_date: datetime, end_date: datetime) -> FlightTotals:
+        """Totals for the UTC days from start_date to end_date, like aggregate_rollups."""
+        i = bisect_left(self.days, utc_day(start_date).toordinal())
+        j = bisect_right(self.days, utc_day(end_date).toordinal(), i)
+        return FlightTotals(
+            flight_count=self.count[j] - self.count[i],
+            flight_minutes=self.minutes[j] - self.minutes[i],
+            billable_tenths=self.tenths[j] - self.tenths[i]
+        )
+
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.days, self.count, self.minutes, self.tenths))
+
+
+class SummaryIndex:
+    """
+    Per-tail prefix sums that answer summary ranges with two bisects.
+
+    Summaries are day-granular, so a tail is indexed by UTC day and loaded
+    on first use from its daily rollups (one primary key range scan, at most
+    one row per day) rather than from every flight. Everything held is valid
+    at one flights DataVersion:
+    inserts this process makes are appended through add_flights (or drop the
+    tail, if they land before its last indexed flight), and any other change
+    to the counter (another writer, or a delete or rebuild that bumped it)
+    drops the whole index so tails are reloaded lazily.
+    """
+
+    def __init__(self):
+        self._tails: Dict[str, TailIndex] = {}
+        self._version = KnownVersion()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.appends = 0
+        self.invalidations = 0
+
+    def totals(self, session, tail_number: str, start_date: datetime,
+               end_date: datetime) -> Optional[FlightTotals]:
+        """
+        Flight totals for a tail and day range, loading the tail if needed.
+
+        Returns:
+            FlightTotals, or None if the flights changed while the tail was
+            being loaded (the caller should fall back to the rollups)
+        """
+        version = DataVersion.current(session, FLIGHTS_VERSION)
+        with self._lock:
+            self._sync(version)
+            tail = self._tails.get(tail_number) if version == self._version.value else None
+            if tail is not None:
+                self.hits += 1
+                return tail.totals(start_date, end_date)
+            self.misses += 1
+
+        tail = self._load(session, tail_number)
+        # A write between the two reads may or may not be in the scan
+        if DataVersion.current(session, FLIGHTS_VERSION) != version:
+            return None
+        with self._lock:
+            self._sync(version)
+            if version == self._version.value:
+                self._tails[tail_number] = tail
+        return tail.totals(start_date, end_date)
+
+    def add_flights(self, departures: Dict[str, List[datetime]], minutes: Dict[str, List[int]],
+                    flights_version: int) -> None:
+        """
+        Apply flights this process just inserted and committed.
+
+        Args:
+            departures: Inserted departure times per tail number
+            minutes: Their flight durations, in the same order
+            flights_version: Flights DataVersion committed with the insert
+        """
+        with self._lock:
+            step = self._version.insert(flights_version)
+            if step == KnownVersion.SEEN:
+                # Already loaded from the database after the commit
+                return
+            if step == KnownVersion.RESET:
+                self._drop_all()
+                return
+            for tail_number, times in departures.items():
+                tail = self._tails.get(tail_number)
+                if tail is None:
+                    continue
+                by_day = defaultdict(lambda: [0, 0, 0])
+                for departure, flight_minutes in zip(times, minutes[tail_number]):
+                    bucket = by_day[utc_day(departure)]
+                    bucket[0] += 1
+                    bucket[1] += flight_minutes
+                    bucket[2] += billable_tenths(flight_minutes)
+                days = sorted(by_day)
+                if tail.days and days[0].toordinal() < tail.days[-1]:
+                    # Backfilled history; reload this tail on its next use
+                    del self._tails[tail_number]
+                    self.invalidations += 1
+                    continue
+                for day in days:
+                    tail.add(day.toordinal(), *by_day[day])
+                self.appends += len(times)
+
+    def clear(self) -> None:
+        """Drop every tail."""
+        with self._lock:
+            self._drop_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters plus the tails, flights and bytes held."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tails": len(self._tails),
+                "days": sum(len(tail.days) for tail in self._tails.values()),
+                "bytes": sum(tail.nbytes() for tail in self._tails.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "loads": self.loads,
+                "appends": self.appends,
+                "invalidations": self.invalidations,
+                "flights_version": self._version.value
+            }
+
+    def _load(self, session, tail_number: str) -> TailIndex:
+        """Build a tail from its daily rollups."""
+        tail = TailIndex()
+        # Day ordinals computed by SQLite skip parsing a date per row
+        rows = session.execute(
+            select(
+                cast(func.julianday(DailyFlightRollup.day) - JULIAN_DAY_OF_ORDINAL_ZERO, Integer),
+                DailyFlightRollup.flight_count,
+                DailyFlightRollup.flight_minutes,
+                DailyFlightRollup.billable_tenths,
+            )
+            .where(DailyFlightRollup.tail_number == tail_number)
+            .order_by(DailyFlightRollup.day)
+        )
+        for row in rows:
+            tail.add(*row)
+        with self._lock:
+            self.loads += 1
+        logger.debug(f"Loaded summary index for {tail_number}: {len(tail.days)} days")
+        return tail
+
+    def _sync(self, version: int) -> None:
+        """Drop everything if the counter moved without add_flights. Caller holds the lock."""
+        if self._version.observe(version):
+            self._drop_all()
+
+    def _drop_all(self) -> None:
+        self.invalidations += len(self._tails)
+        self._tails.clear()
@@ -0,0 +1,54 @@
+"""
+Flights DataVersion bookkeeping shared by the in-memory caches.
+"""
+from typing import Optional
+
+
+class KnownVersion:
+    """
+    The flights DataVersion an in-memory cache's contents are valid at.
+
+    Inserts made by this process reach a cache with the version committed
+    alongside them (insert) and are applied precisely when they are the
+    very next version. Any other movement of the counter, seen when a
+    request reads it (observe), means another writer, a delete or a rebuild
+    was involved and everything held must be dropped. Not thread-safe:
+    callers hold their cache's lock.
+    """
+
+    # Outcomes of insert()
+    SEEN = "seen"
+    PRECISE = "precise"
+    RESET = "reset"
+
+    def __init__(self):
+        self.value: Optional[int] = None
+
+    def observe(self, version: int) -> bool:
+        """
+        Adopt a version read from the database.
+
+        Returns:
+            True if the counter moved past the known version, in which case
+            everything held must be dropped
+        """
+        if self.value is not None and version <= self.value:
+            return False
+        moved = self.value is not None
+        self.value = version
+        return moved
+
+    def insert(self, version: int) -> str:
+        """
+        Adopt the version committed with an insert made by this process.
+
+        Returns:
+            SEEN if the known version already includes the insert (nothing
+            to do), PRECISE if it is exactly one step on (apply the insert),
+            or RESET if another write came in between (drop everything)
+        """
+        if self.value is not None and version <= self.value:
+            return self.SEEN
+        precise = self.value is not None and version == self.value + 1
+        self.value = version
+        return self.PRECISE if precise else self.RESET
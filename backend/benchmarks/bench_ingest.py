@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark refresh_data ingest: per-flight SELECT loop vs. batched store_flights.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ingest [--sizes 1000 10000 100000]
+
+Each run starts from a fresh on-disk SQLite database pre-seeded with half of
+the flights, so both duplicate skipping and inserts are exercised.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add app to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import Base, FlightRecord
+from app.services.ingest import store_flights
+
+
+def make_flights(count):
+    """Generate synthetic FlightRecord objects."""
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    flights = []
+    for i in range(count):
+        departure = start + timedelta(hours=3 * i)
+        flights.append(FlightRecord(
+            id=f"BENCH-{i:08d}",
+            tail_number="N593EH",
+            departure_airport="KSFO",
+            arrival_airport="KLAX",
+            departure_time_utc=departure,
+            arrival_time_utc=departure + timedelta(minutes=75),
+            flight_duration_minutes=75
+        ))
+    return flights
+
+
+def legacy_loop(session, flights):
+    """The original refresh_data loop: one SELECT per flight."""
+    new_count = 0
+    for flight in flights:
+        existing = session.query(FlightRecord).filter_by(id=flight.id).first()
+        if not existing:
+            session.add(flight)
+            new_count += 1
+    return new_count
+
+
+def batched(session, flights):
+    """The batched ingest path."""
+    return store_flights(session, flights).inserted
+
+
+def run_once(strategy, count):
+    """Time one strategy against a fresh database; returns (seconds, inserted)."""
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+
+        # Seed every other flight so half of the batch are duplicates
+        seed = Session()
+        store_flights(seed, make_flights(count)[::2])
+        seed.commit()
+        seed.close()
+
+        flights = make_flights(count)
+        session = Session()
+        started = time.perf_counter()
+        inserted = strategy(session, flights)
+        session.commit()
+        elapsed = time.perf_counter() - started
+        session.close()
+        return elapsed, inserted
+    finally:
+        engine.dispose()
+        os.close(db_fd)
+        os.unlink(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'records':>10} {'legacy (s)':>12} {'batched (s)':>12} {'speedup':>8}")
+    for count in args.sizes:
+        legacy_time, legacy_inserted = run_once(legacy_loop, count)
+        batched_time, batched_inserted = run_once(batched, count)
+        assert legacy_inserted == batched_inserted
+        print(f"{count:>10} {legacy_time:>12.3f} {batched_time:>12.3f} {legacy_time / batched_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark FlightAware timestamp parsing and process_flight_data.
+
+Run from the backend directory:
+    python -m benchmarks.bench_process [--count 100000]
+
+Compares the original per-field parser and processing loop with the
+current fast-path parser and single-pass process_flight_data, on synthetic
+AeroAPI payloads. The "filtered" rows also parse departures first, the way
+fetch_aircraft_history does before handing flights to processing.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+
+# Add app to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("FLIGHTAWARE_API_KEY", "benchmark")
+
+from app.models import FlightRecord
+from app.services.flightaware import FlightAwareClient, parse_aeroapi_datetime
+
+
+def make_raw_flights(count):
+    """Generate synthetic AeroAPI flight payloads."""
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    flights = []
+    for i in range(count):
+        departure = start + timedelta(hours=3 * i)
+        flight = {
+            "fa_flight_id": f"N593EH-{i:08d}-adhoc-0",
+            "ident": "N593EH",
+            "origin": {"code": "KSFO", "icao": "KSFO"},
+            "destination": {"code": "KLAX", "icao": "KLAX"},
+            "scheduled_out": (departure - timedelta(minutes=5)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "scheduled_in": (departure + timedelta(minutes=70)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "cancelled": i % 50 == 0,
+        }
+        # Most flights have actual times; some only have schedule times
+        if i % 10:
+            flight["actual_off"] = departure.strftime("%Y-%m-%dT%H:%M:%SZ")
+            flight["actual_on"] = (departure + timedelta(minutes=75)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        flights.append(flight)
+    return flights
+
+
+def legacy_parse_datetime(datetime_str):
+    """The original _parse_datetime."""
+    if datetime_str.endswith('Z'):
+        datetime_str = datetime_str[:-1] + '+00:00'
+    dt = datetime.fromisoformat(datetime_str)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def legacy_process(raw_flights):
+    """The original process_flight_data loop."""
+    processed_flights = []
+    for flight_data in raw_flights:
+        try:
+            flight_id = flight_data.get("fa_flight_id")
+            tail_number = flight_data.get("ident")
+            origin = flight_data.get("origin", {})
+            destination = flight_data.get("destination", {})
+            departure_airport = origin.get("icao") or origin.get("code")
+            arrival_airport = destination.get("icao") or destination.get("code")
+            if flight_data.get("cancelled", False):
+                continue
+            departure_time_str = (
+                flight_data.get("actual_off") or flight_data.get("actual_out") or
+                flight_data.get("scheduled_off") or flight_data.get("scheduled_out") or
+                flight_data.get("filed_departure_time")
+            )
+            arrival_time_str = (
+                flight_data.get("actual_on") or flight_data.get("actual_in") or
+                flight_data.get("scheduled_on") or flight_data.get("scheduled_in") or
+                flight_data.get("filed_arrival_time")
+            )
+            if not all([flight_id, tail_number, departure_airport, arrival_airport,
+                        departure_time_str, arrival_time_str]):
+                continue
+            departure_time = legacy_parse_datetime(departure_time_str)
+            arrival_time = legacy_parse_datetime(arrival_time_str)
+            flight_duration_minutes = max(int((arrival_time - departure_time).total_seconds() / 60), 0)
+            processed_flights.append(FlightRecord(
+                id=flight_id,
+                tail_number=tail_number,
+                departure_airport=departure_airport,
+                arrival_airport=arrival_airport,
+                departure_time_utc=departure_time,
+                arrival_time_utc=arrival_time,
+                flight_duration_minutes=flight_duration_minutes
+            ))
+        except Exception:
+            continue
+    return processed_flights
+
+
+def departure_strings(raw_flights):
+    """Departure fields fetch_aircraft_history filters on."""
+    return [
+        f.get("actual_off") or f.get("actual_out") or f.get("scheduled_off") or f.get("filed_departure_time")
+        for f in raw_flights
+    ]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    raw_flights = make_raw_flights(args.count)
+    timestamps = [f.get("actual_off") or f["scheduled_out"] for f in raw_flights]
+    client = FlightAwareClient()
+
+    rows = []
+
+    legacy_s, _ = timed(lambda: [legacy_parse_datetime(t) for t in timestamps])
+    fast_s, _ = timed(lambda: [parse_aeroapi_datetime(t) for t in timestamps])
+    rows.append(("parse timestamps", legacy_s, fast_s))
+
+    legacy_s, legacy_flights = timed(lambda: legacy_process(raw_flights))
+    fast_s, fast_flights = timed(lambda: client.process_flight_data(raw_flights))
+    assert [f.departure_time_utc for f in legacy_flights] == [f.departure_time_utc for f in fast_flights]
+    rows.append(("process_flight_data", legacy_s, fast_s))
+
+    departures = departure_strings(raw_flights)
+
+    def legacy_filtered():
+        [legacy_parse_datetime(d) for d in departures if d]
+        return legacy_process(raw_flights)
+
+    def fast_filtered():
+        [client._parse_timestamp(d) for d in departures if d]
+        return client.process_flight_data(raw_flights)
+
+    legacy_s, _ = timed(legacy_filtered)
+    fast_s, _ = timed(fast_filtered)
+    rows.append(("filter + process", legacy_s, fast_s))
+
+    print(f"{args.count} synthetic flights")
+    print(f"{'stage':<22} {'legacy (s)':>11} {'current (s)':>12} {'speedup':>8} {'flights/s':>11}")
+    for stage, legacy_s, fast_s in rows:
+        print(f"{stage:<22} {legacy_s:>11.3f} {fast_s:>12.3f} {legacy_s / fast_s:>7.2f}x {args.count / fast_s:>11,.0f}")
+
+
+if __name__ == "__main__":
+    main()
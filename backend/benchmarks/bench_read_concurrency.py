@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark dashboard reads while a refresh is writing.
+
+Run from the backend directory:
+    python -m benchmarks.bench_read_concurrency [--readers 4] [--seconds 5]
+
+One thread repeatedly ingests batches of new flights through store_flights,
+each in a single transaction, while reader threads run the summary and
+flights-page queries. The "default" setup is a single engine with SQLite's
+rollback journal; "split" is create_engines(): WAL, a single writer and a
+separate read-only pool.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add app to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import Engines, create_engines
+from app.models import Base, FlightRecord
+from app.services.flights import select_flights
+from app.services.ingest import store_flights
+from app.services.rollups import aggregate_rollups
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def make_flights(first, count):
+    """Generate synthetic FlightRecord objects numbered from first."""
+    flights = []
+    for i in range(first, first + count):
+        departure = START + timedelta(hours=3 * i)
+        flights.append(FlightRecord(
+            id=f"BENCH-{i:08d}",
+            tail_number="N593EH",
+            departure_airport="KSFO",
+            arrival_airport="KLAX",
+            departure_time_utc=departure,
+            arrival_time_utc=departure + timedelta(minutes=75),
+            flight_duration_minutes=75
+        ))
+    return flights
+
+
+def read_once(session):
+    """The queries behind one dashboard load: a summary and a page of flights."""
+    end = START + timedelta(days=365)
+    aggregate_rollups(session, "N593EH", START, end)
+    session.execute(select_flights("N593EH", START, end).limit(100)).all()
+    session.rollback()
+
+
+def run(engines, seed, batch, readers, seconds):
+    """Run the writer and readers for a fixed time; returns stats."""
+    Base.metadata.create_all(engines.writer)
+    WriteSession = sessionmaker(bind=engines.writer)
+    ReadSession = sessionmaker(bind=engines.reader)
+
+    session = WriteSession()
+    store_flights(session, make_flights(0, seed))
+    session.commit()
+    session.close()
+
+    stop = threading.Event()
+    latencies = []
+    errors = []
+    writes = [0]
+    lock = threading.Lock()
+
+    def writer():
+        next_id = seed
+        while not stop.is_set():
+            session = WriteSession()
+            try:
+                store_flights(session, make_flights(next_id, batch))
+                session.commit()
+                writes[0] += 1
+            finally:
+                session.close()
+            next_id += batch
+
+    def reader():
+        session = ReadSession()
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                read_once(session)
+            except Exception:
+                session.rollback()
+                with lock:
+                    errors.append(1)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - started)
+        session.close()
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "reads_per_s": len(latencies) / seconds,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else float("nan"),
+        "max_ms": latencies[-1] * 1000 if latencies else float("nan"),
+        "errors": len(errors),
+        "write_batches": writes[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=20000, help="flights stored before timing")
+    parser.add_argument('--batch', type=int, default=5000, help="flights per write transaction")
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    setups = {
+        "default": lambda url: Engines(writer=create_engine(url), reader=None),
+        "split": create_engines,
+    }
+    print(f"{args.readers} readers, {args.batch}-flight write batches, {args.seconds:.0f}s per setup")
+    print(f"{'setup':<8} {'reads/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9} {'errors':>7} {'batches':>8}")
+    for name, factory in setups.items():
+        db_fd, db_path = tempfile.mkstemp(suffix='.db')
+        engines = factory(f"sqlite:///{db_path}")
+        if engines.reader is None:
+            engines.reader = engines.writer
+        try:
+            stats = run(engines, args.seed, args.batch, args.readers, args.seconds)
+        finally:
+            engines.dispose()
+            os.close(db_fd)
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db_path + suffix):
+                    os.unlink(db_path + suffix)
+        print(f"{name:<8} {stats['reads_per_s']:>9.0f} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+              f"{stats['max_ms']:>9.1f} {stats['errors']:>7} {stats['write_batches']:>8}")
+
+
+if __name__ == "__main__":
+    main()
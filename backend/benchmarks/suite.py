@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite over synthetic flight histories at scale.
+
+Run from the backend directory:
+    python -m benchmarks.suite [--sizes 10000 100000 1000000 10000000] [--tails 50]
+        [--output benchmarks/results.json] [--baseline benchmarks/baseline.json]
+
+For each size, a SQLite database holding that many FlightRecord rows spread
+over --tails aircraft and --years of history is generated once and reused
+from --data-dir. The app is then started on a copy of it, and each case is
+timed through the Flask test client:
+
+    flights_page      GET /api/flights, 100-flight keyset page of a 30-day window
+    flights_month     GET /api/flights, a whole 30-day window for one tail
+    summary_year      GET /api/summary over a year for one tail
+    refresh_ingest    POST /api/refresh_data storing --ingest-batch new flights
+                      (FlightAware replaced by synthetic AeroAPI payloads)
+    process_flights   FlightAwareClient.process_flight_data on --ingest-batch payloads
+
+Windows and tails are drawn from a seeded RNG and the response cache,
+summary index and recent-flights cache are disabled, so every request
+reaches the database. Results are written as
+JSON; with --baseline, each case's median is compared against the stored
+run and changes beyond --threshold are reported (exit status 1 with
+--fail-on-regression).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+# Add app to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("FLIGHTAWARE_API_KEY", "benchmark")
+os.environ["FLIGHTAWARE_RATE_PER_MINUTE"] = "0"
+os.environ["REFRESH_MIN_INTERVAL_SECONDS"] = "0"
+os.environ["RESPONSE_CACHE_MAX_BYTES"] = "0"
+os.environ["SUMMARY_INDEX_ENABLED"] = "false"
+os.environ["FLIGHT_CACHE_DAYS"] = "0"
+os.environ["SLOW_REQUEST_SECONDS"] = "0"
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, FlightRecord
+from app.services.flightaware import FlightAwareClient
+from app.services.rollups import rebuild_rollups
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_END = datetime(2025, 1, 1, tzinfo=timezone.utc)
+AIRPORTS = ("KSFO", "KLAX", "KPHX", "KSEA", "KDEN", "KLAS", "KSAN", "KPDX")
+INSERT_CHUNK = 50000
+
+
+def tail_numbers(count):
+    return [f"N{10000 + i}" for i in range(count)]
+
+
+def generate_dataset(path, size, tails, years):
+    """Write size flights spread evenly over tails and years of history."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    history_start = HISTORY_END - timedelta(days=365 * years)
+    per_tail = -(-size // tails)
+    spacing = (HISTORY_END - history_start) / per_tail
+    rng = random.Random(size)
+
+    def rows():
+        for i in range(size):
+            tail_index, n = i % tails, i // tails
+            departure = history_start + spacing * n + timedelta(minutes=tail_index)
+            duration = rng.randint(30, 240)
+            yield {
+                "id": f"{tail_index:03d}-{n:09d}-synthetic",
+                "tail_number": f"N{10000 + tail_index}",
+                "departure_airport": AIRPORTS[(n + tail_index) % len(AIRPORTS)],
+                "arrival_airport": AIRPORTS[(n + tail_index + 1) % len(AIRPORTS)],
+                "departure_time_utc": departure,
+                "arrival_time_utc": departure + timedelta(minutes=duration),
+                "flight_duration_minutes": duration,
+            }
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        chunk = []
+        for row in rows():
+            chunk.append(row)
+            if len(chunk) == INSERT_CHUNK:
+                connection.execute(insert(FlightRecord), chunk)
+                chunk = []
+        if chunk:
+            connection.execute(insert(FlightRecord), chunk)
+    session = sessionmaker(bind=engine)()
+    rebuild_rollups(session)
+    session.commit()
+    session.close()
+    engine.dispose()
+    print(f"  generated {size:,} flights in {time.perf_counter() - started:.1f}s")
+
+
+def dataset_path(data_dir, size, tails, years):
+    """Path to a cached dataset, generating it on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"flights-{size}-{tails}t-{years}y.db")
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        generate_dataset(tmp_path, size, tails, years)
+        os.replace(tmp_path, path)
+    return path
+
+
+def synthetic_payloads(count, first, now):
+    """AeroAPI-shaped flights for N593EH departing in the last 30 days."""
+    flights = []
+    for i in range(count):
+        departure = now - timedelta(days=30) + timedelta(minutes=37 * ((first + i) % 1100))
+        flights.append({
+            "fa_flight_id": f"N593EH-{first + i:09d}-ingest",
+            "ident": "N593EH",
+            "origin": {"code": "KSFO", "icao": "KSFO"},
+            "destination": {"code": "KLAX", "icao": "KLAX"},
+            "actual_off": departure.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "actual_on": (departure + timedelta(minutes=75)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "cancelled": False,
+        })
+    return flights
+
+
+class SyntheticClient(FlightAwareClient):
+    """FlightAwareClient whose fetches return pre-generated payloads."""
+    payloads = []
+
+    def fetch_aircraft_history(self, registration, start_date, end_date, raise_errors=False, now=None):
+        return self.payloads
+
+
+def timed_runs(fn, iterations, warmup=3):
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "median_s": statistics.median(samples),
+        "p95_s": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "min_s": samples[0],
+    }
+
+
+def run_size(path, size, tails, years, iterations, ingest_batch):
+    """Time every case against a copy of one dataset."""
+    from app import create_app
+
+    work_path = path + ".run"
+    shutil.copyfile(path, work_path)
+    os.environ["DATABASE_URL"] = f"sqlite:///{work_path}"
+    app = create_app()
+    client = app.test_client()
+    rng = random.Random(42)
+    names = tail_numbers(tails)
+    history_days = 365 * years
+
+    def window(days):
+        start = HISTORY_END - timedelta(days=rng.randint(days, history_days))
+        end = start + timedelta(days=days - 1)
+        return rng.choice(names), start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+    def get(url):
+        response = client.get(url)
+        assert response.status_code == 200, (url, response.status_code)
+        response.get_data()
+
+    def flights_page():
+        tail, start, end = window(30)
+        get(f"/api/flights?tail_number={tail}&start_date={start}&end_date={end}&limit=100")
+
+    def flights_month():
+        tail, start, end = window(30)
+        get(f"/api/flights?tail_number={tail}&start_date={start}&end_date={end}")
+
+    def summary_year():
+        tail, start, end = window(365)
+        get(f"/api/summary?tail_number={tail}&start_date={start}&end_date={end}")
+
+    # Payloads are built up front so only the request itself is timed
+    now = datetime.now(timezone.utc)
+    ingest_runs = max(iterations // 4, 3)
+    batches = iter([synthetic_payloads(ingest_batch, n * ingest_batch, now) for n in range(ingest_runs + 3)])
+
+    def refresh_ingest():
+        SyntheticClient.payloads = next(batches)
+        with patch("app.api.FlightAwareClient", SyntheticClient):
+            response = client.post("/api/refresh_data?full=true")
+        assert response.status_code == 200, response.get_data(as_text=True)
+        assert response.get_json()["flights_added"] == ingest_batch
+
+    processor = FlightAwareClient()
+    payloads = synthetic_payloads(ingest_batch, 10 ** 8, now)
+
+    def process_flights():
+        processor.process_flight_data(payloads)
+
+    cases = {
+        "flights_page": timed_runs(flights_page, iterations),
+        "flights_month": timed_runs(flights_month, iterations),
+        "summary_year": timed_runs(summary_year, iterations),
+        "refresh_ingest": timed_runs(refresh_ingest, ingest_runs),
+        "process_flights": timed_runs(process_flights, ingest_runs),
+    }
+    for name in ("refresh_ingest", "process_flights"):
+        cases[name]["rows_per_s"] = ingest_batch / cases[name]["median_s"]
+
+    app.extensions['refresh_jobs'].shutdown()
+    app.extensions['db_engines'].dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(work_path + suffix):
+            os.unlink(work_path + suffix)
+    return cases
+
+
+def compare(results, baseline, threshold):
+    """Print median changes against a baseline run; returns regressed case names."""
+    regressions = []
+    print(f"\n{'size':>10} {'case':<16} {'baseline (ms)':>14} {'current (ms)':>13} {'change':>8}")
+    for size, cases in results["results"].items():
+        for name, stats in cases.items():
+            base = baseline.get("results", {}).get(size, {}).get(name)
+            if base is None:
+                continue
+            change = stats["median_s"] / base["median_s"] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append(f"{size}/{name}")
+            elif change < -threshold:
+                flag = "  improved"
+            print(f"{int(size):>10,} {name:<16} {base['median_s'] * 1000:>14.2f} "
+                  f"{stats['median_s'] * 1000:>13.2f} {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000, 10000000])
+    parser.add_argument('--tails', type=int, default=50)
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--ingest-batch', type=int, default=1000)
+    parser.add_argument('--data-dir', default=os.path.join(BENCH_DIR, '.data'))
+    parser.add_argument('--output', default=os.path.join(BENCH_DIR, 'results.json'))
+    parser.add_argument('--baseline', help="earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25, help="relative median change to report")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "tails": args.tails,
+            "years": args.years,
+            "iterations": args.iterations,
+            "ingest_batch": args.ingest_batch,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"{size:,} flights")
+        path = dataset_path(args.data_dir, size, args.tails, args.years)
+        cases = run_size(path, size, args.tails, args.years, args.iterations, args.ingest_batch)
+        results["results"][str(size)] = cases
+        for name, stats in cases.items():
+            print(f"  {name:<16} median {stats['median_s'] * 1000:8.2f} ms   p95 {stats['p95_s'] * 1000:8.2f} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"Regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
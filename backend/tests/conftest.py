@@ -2,12 +2,27 @@
 Pytest configuration and fixtures for AirLogger backend tests.
 """
 import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import tempfile
 import os
 
 
+@pytest.fixture(autouse=True)
+def no_flightaware_backoff(monkeypatch):
+    """Retry FlightAware failures without sleeping or rate limiting during tests."""
+    monkeypatch.setenv("FLIGHTAWARE_BACKOFF_FACTOR", "0")
+    monkeypatch.setenv("FLIGHTAWARE_RATE_PER_MINUTE", "0")
+
+
+@pytest.fixture(autouse=True)
+def no_refresh_throttle(monkeypatch):
+    """Allow back-to-back refreshes during tests."""
+    monkeypatch.setenv("REFRESH_MIN_INTERVAL_SECONDS", "0")
+
+
 @pytest.fixture(scope="function")
 def test_db():
     """Create a temporary database for testing."""
@@ -52,6 +67,65 @@ def client(app):
     return app.test_client()
 
 
+@pytest.fixture
+def make_flight():
+    """Factory for FlightRecords; arrival is departure plus the flight duration."""
+    from app.models import FlightRecord
+
+    def factory(flight_id, departure=None, duration=60, tail_number="N593EH",
+                departure_airport="KSFO", arrival_airport="KLAX"):
+        departure = departure or datetime(2024, 1, 15, 14, 0, tzinfo=timezone.utc)
+        return FlightRecord(
+            id=flight_id,
+            tail_number=tail_number,
+            departure_airport=departure_airport,
+            arrival_airport=arrival_airport,
+            departure_time_utc=departure,
+            arrival_time_utc=departure + timedelta(minutes=duration),
+            flight_duration_minutes=duration
+        )
+
+    return factory
+
+
+@pytest.fixture
+def make_flights(make_flight):
+    """Factory for one FlightRecord per duration, departing every spacing_hours from start."""
+    def factory(durations, start, spacing_hours=7, tail_number="N593EH", prefix="FLT"):
+        return [
+            make_flight(f"{prefix}-{tail_number}-{start:%Y%m%d%H}-{i:05d}",
+                        start + timedelta(hours=spacing_hours * i), duration, tail_number)
+            for i, duration in enumerate(durations)
+        ]
+
+    return factory
+
+
+@pytest.fixture
+def store():
+    """Store flights through the ingest path and commit; returns the IngestResult."""
+    from app.services.ingest import store_flights
+
+    def factory(session, flights):
+        result = store_flights(session, flights)
+        session.commit()
+        return result
+
+    return factory
+
+
+@pytest.fixture
+def fake_flightaware_client():
+    """Factory for FlightAware client doubles returning the given processed flights."""
+    def factory(flights):
+        client = MagicMock()
+        client.fetch_aircraft_history.return_value = [{} for _ in flights]
+        client.process_flight_data.return_value = flights
+        return client
+
+    return factory
+
+
 @pytest.fixture
 def sample_flight_data():
     """Sample flight data matching FlightAware API response."""
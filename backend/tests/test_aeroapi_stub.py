@@ -0,0 +1,179 @@
+"""
+Tests for the local AeroAPI stand-in server.
+"""
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+import requests
+
+from tools.aeroapi_stub import StubConfig, flights_between, serve_in_thread
+
+# Clock the replay test records at
+RECORDED_AT = datetime(2025, 6, 1, 12, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def stub_server():
+    """Start stand-in servers on free ports; they are shut down after the test."""
+    servers = []
+
+    def start(**options):
+        server = serve_in_thread(StubConfig(**options))
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def api_key(monkeypatch):
+    monkeypatch.setenv("FLIGHTAWARE_API_KEY", "stub")
+
+
+class TestGeneratedFlights:
+    """Test cases for the generated flight payloads."""
+
+    def test_overlapping_windows_agree(self):
+        """Test that a flight has the same payload whichever window asks for it."""
+        config = StubConfig(flights_per_day=6)
+        now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+        start = now - timedelta(days=20)
+
+        wide = {f["fa_flight_id"]: f for f in flights_between("N593EH", start, now, config, now)}
+        narrow = flights_between("N593EH", start + timedelta(days=5), start + timedelta(days=8), config, now)
+
+        assert narrow
+        assert all(wide[f["fa_flight_id"]] == f for f in narrow)
+
+    def test_cancelled_incomplete_and_out_of_order(self):
+        """Test that the configured fractions of awkward records appear."""
+        config = StubConfig(flights_per_day=6, cancelled_rate=0.2, incomplete_rate=0.2, swap_rate=0.5)
+        now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+        flights = flights_between("N593EH", now - timedelta(days=60), now, config, now)
+        departures = [f["scheduled_out"] for f in flights]
+
+        assert any(f["cancelled"] for f in flights)
+        assert any(f["destination"] is None or f["actual_in"] is None for f in flights if not f["cancelled"])
+        assert departures != sorted(departures, reverse=True)
+
+    def test_future_flights_are_scheduled_only(self):
+        """Test that flights after now have no actual times."""
+        config = StubConfig(flights_per_day=6, cancelled_rate=0, incomplete_rate=0)
+        now = datetime(2025, 6, 1, 12, tzinfo=timezone.utc)
+
+        flights = flights_between("N593EH", now, now + timedelta(days=2), config, now)
+
+        assert flights
+        assert all(f["actual_out"] is None and f["status"] == "Scheduled" for f in flights)
+
+
+class TestStubServer:
+    """Test cases for serving the payloads over HTTP."""
+
+    def test_requires_api_key(self, stub_server):
+        """Test that requests without x-apikey are rejected like AeroAPI."""
+        server = stub_server()
+
+        response = requests.get(f"{server.base_url}/flights/N593EH")
+
+        assert response.status_code == 401
+        assert response.json()["status"] == 401
+
+    def test_history_requires_window(self, stub_server):
+        """Test that the history endpoint needs start and end."""
+        server = stub_server()
+
+        response = requests.get(f"{server.base_url}/history/flights/N593EH", headers={"x-apikey": "stub"})
+
+        assert response.status_code == 400
+
+    def test_client_follows_pagination(self, stub_server, api_key):
+        """Test that FlightAwareClient follows links.next and drops cancelled flights."""
+        from app.services.flightaware import FlightAwareClient
+
+        server = stub_server(page_size=5, flights_per_day=4, cancelled_rate=0.1)
+        client = FlightAwareClient(base_url=server.base_url)
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(days=30)
+
+        flights = client.fetch_aircraft_history("N593EH", start, end, raise_errors=True)
+        generated = {f["fa_flight_id"] for f in flights_between("N593EH", start - timedelta(days=1), end,
+                                                                server.config, server.now())}
+        records = client.process_flight_data(flights)
+
+        assert len(flights) > 5
+        assert {f["fa_flight_id"] for f in flights} <= generated
+        assert len(records) < len(flights)
+        # Five windows, most of them several pages long
+        assert server.snapshot()["by_status"]["200"] > 5
+
+    def test_rate_limited_requests_retried(self, stub_server, api_key):
+        """Test that injected 429s are retried and still produce the flights."""
+        from app.services.flightaware import FlightAwareClient
+
+        server = stub_server(rate_limit_rate=0.5, retry_after=0, seed=3)
+        client = FlightAwareClient(base_url=server.base_url, max_retries=10)
+        end = datetime.now(timezone.utc)
+
+        client.fetch_aircraft_history("N593EH", end - timedelta(days=5), end, raise_errors=True)
+
+        assert server.snapshot()["by_status"].get("429", 0) > 0
+        assert any(call.retries for call in client.call_log)
+
+    def test_refresh_end_to_end(self, stub_server, api_key, monkeypatch, tmp_path):
+        """Test that POST /api/refresh_data stores flights fetched from the stub."""
+        from app import create_app
+
+        server = stub_server(flights_per_day=3)
+        monkeypatch.setenv("FLIGHTAWARE_BASE_URL", server.base_url)
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'airlogger.db'}")
+        app = create_app()
+        try:
+            client = app.test_client()
+
+            response = client.post('/api/refresh_data?full=true')
+            repeat = client.post('/api/refresh_data?full=true')
+
+            assert response.status_code == 200, response.get_data(as_text=True)
+            assert response.get_json()["flights_added"] > 0
+            assert repeat.get_json()["flights_added"] == 0
+        finally:
+            app.extensions['refresh_jobs'].shutdown()
+            app.extensions['db_engines'].dispose()
+
+    def test_refresh_replays_recorded_responses(self, stub_server, api_key, monkeypatch, tmp_path):
+        """Test that a recorded refresh can be replayed through POST /api/refresh_data without AeroAPI."""
+        from app import create_app
+
+        server = stub_server(flights_per_day=3)
+        monkeypatch.setenv("FLIGHTAWARE_BASE_URL", server.base_url)
+        monkeypatch.setenv("FLIGHTAWARE_CACHE_DIR", str(tmp_path / "aeroapi"))
+
+        def refresh(database):
+            monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / database}")
+            app = create_app()
+            try:
+                return app.test_client().post('/api/refresh_data?full=true')
+            finally:
+                app.extensions['refresh_jobs'].shutdown()
+                app.extensions['db_engines'].dispose()
+
+        # Record at a pinned time long past; the replay must plan the same
+        # requests from the clock recorded with the cache, not the wall clock
+        with patch('app.services.refresh.current_time', return_value=RECORDED_AT):
+            recorded = refresh("recorded.db")
+        requests_made = server.snapshot()["requests"]
+        monkeypatch.setenv("FLIGHTAWARE_REPLAY", "true")
+        monkeypatch.delenv("FLIGHTAWARE_API_KEY")
+        replayed = refresh("replayed.db")
+
+        assert recorded.status_code == 200, recorded.get_data(as_text=True)
+        assert replayed.status_code == 200, replayed.get_data(as_text=True)
+        assert replayed.get_json()["flights_added"] == recorded.get_json()["flights_added"] > 0
+        assert server.snapshot()["requests"] == requests_made
+        assert replayed.get_json()["window"] == recorded.get_json()["window"]
+        assert replayed.get_json()["window"]["end"] == RECORDED_AT.isoformat()
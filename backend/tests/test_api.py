@@ -34,6 +34,43 @@ class TestRefreshDataEndpoint:
             # Should fetch last 90 days
             assert (datetime.now(timezone.utc) - call_args[1]).days >= 89
     
+    def test_refresh_data_reports_counts(self, client, test_db, sample_flight_data):
+        """Test that refresh reports inserted and skipped flight counts."""
+        from app.models import FlightRecord
+        from app.services.flightaware import FlightAwareClient
+        
+        # Process the sample payload with the real parser
+        with patch.dict('os.environ', {'FLIGHTAWARE_API_KEY': 'test_api_key_123'}):
+            processed = FlightAwareClient().process_flight_data(sample_flight_data["flights"])
+        
+        # One of the two flights is already stored
+        test_db.add(FlightRecord(
+            id=processed[0].id,
+            tail_number=processed[0].tail_number,
+            departure_airport=processed[0].departure_airport,
+            arrival_airport=processed[0].arrival_airport,
+            departure_time_utc=processed[0].departure_time_utc,
+            arrival_time_utc=processed[0].arrival_time_utc,
+            flight_duration_minutes=processed[0].flight_duration_minutes
+        ))
+        test_db.commit()
+        
+        with patch('app.api.FlightAwareClient') as mock_client_class, \
+             patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            mock_client = MagicMock()
+            mock_client_class.return_value = mock_client
+            mock_client.fetch_aircraft_history.return_value = sample_flight_data["flights"]
+            mock_client.process_flight_data.return_value = processed
+            
+            response = client.post('/api/refresh_data')
+            
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert data["flights_added"] == 1
+            assert data["flights_skipped"] == 1
+            assert test_db.query(FlightRecord).count() == 2
+    
     def test_refresh_data_no_new_flights(self, client):
         """Test refresh when no new flights are found."""
         with patch('app.api.FlightAwareClient') as mock_client_class:
@@ -47,6 +84,71 @@ class TestRefreshDataEndpoint:
             data = json.loads(response.data)
             assert "no new data" in data["message"].lower()
     
+    def test_refresh_data_upstream_failure(self, client):
+        """Test that a FlightAware failure is reported instead of 'no new data'."""
+        from app.services.flightaware import FlightAwareError
+        
+        with patch('app.api.FlightAwareClient') as mock_client_class:
+            mock_client = MagicMock()
+            mock_client_class.return_value = mock_client
+            mock_client.fetch_aircraft_history.side_effect = FlightAwareError("503 Server Error")
+            
+            response = client.post('/api/refresh_data')
+            
+            assert response.status_code == 502
+            data = json.loads(response.data)
+            assert "flightaware" in data["error"].lower()
+            assert "503" in data["details"]
+    
+    def test_refresh_data_full(self, client, test_db):
+        """Test that full=true re-fetches 90 days despite an existing sync mark."""
+        from app.models import SyncState
+        
+        test_db.add(SyncState(
+            tail_number="N593EH",
+            last_departure_time_utc=datetime.now(timezone.utc) - timedelta(days=1),
+            last_synced_at=datetime.now(timezone.utc)
+        ))
+        test_db.commit()
+        
+        with patch('app.api.FlightAwareClient') as mock_client_class, \
+             patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            mock_client = MagicMock()
+            mock_client_class.return_value = mock_client
+            mock_client.fetch_aircraft_history.return_value = []
+            
+            incremental = json.loads(client.post('/api/refresh_data').data)
+            full = json.loads(client.post('/api/refresh_data?full=true').data)
+            
+            assert incremental["window"]["full"] is False
+            assert full["window"]["full"] is True
+            starts = [c[0][1] for c in mock_client.fetch_aircraft_history.call_args_list]
+            assert (datetime.now(timezone.utc) - starts[0]).days < 2
+            assert (datetime.now(timezone.utc) - starts[1]).days >= 89
+    
+    def test_refresh_data_throttled(self, client, test_db, monkeypatch):
+        """Test that a refresh soon after another skips FlightAware."""
+        monkeypatch.setenv("REFRESH_MIN_INTERVAL_SECONDS", "60")
+        
+        with patch('app.api.FlightAwareClient') as mock_client_class, \
+             patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            mock_client = MagicMock()
+            mock_client_class.return_value = mock_client
+            mock_client.fetch_aircraft_history.return_value = []
+            
+            first = client.post('/api/refresh_data')
+            second = client.post('/api/refresh_data')
+            
+            assert json.loads(first.data)["throttled"] is False
+            assert second.status_code == 200
+            data = json.loads(second.data)
+            assert data["throttled"] is True
+            assert data["flights_added"] == 0
+            assert 0 < int(second.headers['Retry-After']) <= 60
+            assert mock_client.fetch_aircraft_history.call_count == 1
+    
     def test_refresh_data_api_error(self, client):
         """Test handling of API errors during refresh."""
         with patch('app.api.FlightAwareClient') as mock_client_class:
@@ -160,6 +262,108 @@ class TestFlightsEndpoint:
         assert "invalid date format" in data["error"].lower()
 
 
+class TestFlightsPagination:
+    """Test cases for keyset pagination and streaming on /api/flights."""
+    
+    @pytest.fixture
+    def paged_db(self, test_db):
+        """Five flights on one day, two of them sharing a departure time."""
+        from app.models import FlightRecord
+        
+        departures = [(8, "PAGE-001"), (10, "PAGE-002"), (10, "PAGE-003"), (13, "PAGE-004"), (16, "PAGE-005")]
+        for hour, flight_id in departures:
+            test_db.add(FlightRecord(
+                id=flight_id,
+                tail_number="N593EH",
+                departure_airport="KSFO",
+                arrival_airport="KLAX",
+                departure_time_utc=datetime(2024, 1, 15, hour, 0, tzinfo=timezone.utc),
+                arrival_time_utc=datetime(2024, 1, 15, hour, 45, tzinfo=timezone.utc),
+                flight_duration_minutes=45
+            ))
+        test_db.commit()
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            yield test_db
+    
+    def test_pages_follow_cursor(self, client, paged_db):
+        """Test walking every page with next_cursor."""
+        url = '/api/flights?start_date=2024-01-15&end_date=2024-01-15&limit=2'
+        
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+            assert response.status_code == 200
+            page = json.loads(response.data)
+            assert len(page["flights"]) <= 2
+            seen.extend(flight["id"] for flight in page["flights"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert pages == 3
+        assert seen == ["PAGE-001", "PAGE-002", "PAGE-003", "PAGE-004", "PAGE-005"]
+    
+    def test_last_full_page_has_no_cursor(self, client, paged_db):
+        """Test that an exactly filled last page does not return a cursor."""
+        response = client.get('/api/flights?start_date=2024-01-15&end_date=2024-01-15&limit=5')
+        
+        page = json.loads(response.data)
+        assert len(page["flights"]) == 5
+        assert page["next_cursor"] is None
+    
+    def test_invalid_cursor(self, client, paged_db):
+        """Test error with a malformed cursor."""
+        response = client.get('/api/flights?start_date=2024-01-15&end_date=2024-01-15&limit=2&cursor=bogus')
+        
+        assert response.status_code == 400
+        assert "cursor" in json.loads(response.data)["error"].lower()
+    
+    @pytest.mark.parametrize("limit", ["0", "abc", "100000"])
+    def test_invalid_limit(self, client, limit):
+        """Test error with an out of range or non-numeric limit."""
+        response = client.get(f'/api/flights?start_date=2024-01-15&end_date=2024-01-15&limit={limit}')
+        
+        assert response.status_code == 400
+        assert "limit" in json.loads(response.data)["error"]
+    
+    def test_stream_json_matches_list(self, client, paged_db):
+        """Test that the streamed JSON array matches the buffered response."""
+        buffered = client.get('/api/flights?start_date=2024-01-15&end_date=2024-01-15')
+        streamed = client.get('/api/flights?start_date=2024-01-15&end_date=2024-01-15&stream=json')
+        
+        assert streamed.status_code == 200
+        assert streamed.mimetype == "application/json"
+        assert json.loads(streamed.data) == json.loads(buffered.data)
+    
+    def test_stream_ndjson(self, client, paged_db):
+        """Test streaming one flight per line as NDJSON."""
+        response = client.get('/api/flights?start_date=2024-01-15&end_date=2024-01-15&stream=ndjson')
+        
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.data.decode().splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [
+            "PAGE-001", "PAGE-002", "PAGE-003", "PAGE-004", "PAGE-005"
+        ]
+    
+    def test_stream_empty_range(self, client, paged_db):
+        """Test streaming a range with no flights."""
+        response = client.get('/api/flights?start_date=2023-01-01&end_date=2023-01-31&stream=json')
+        
+        assert response.status_code == 200
+        assert json.loads(response.data) == []
+    
+    def test_invalid_stream_format(self, client):
+        """Test error with an unknown stream format."""
+        response = client.get('/api/flights?start_date=2024-01-15&end_date=2024-01-15&stream=csv')
+        
+        assert response.status_code == 400
+
+
 class TestSummaryEndpoint:
     """Test cases for /api/summary endpoint."""
     
@@ -216,6 +420,47 @@ class TestSummaryEndpoint:
             assert 16.0 <= summary["totalFixedCosts"] <= 17.0
             assert summary["netProfit"] == summary["totalRevenue"] - summary["totalVariableCosts"] - summary["totalFixedCosts"]
     
+    def test_get_summary_billable_totals(self, client, test_db):
+        """Test Hobbs and billable totals computed by the summary query."""
+        from app.models import FlightRecord, FinancialSettings
+        from app.services.ingest import store_flights
+        
+        settings = FinancialSettings(
+            revenue_per_hour=150.0,
+            monthly_fixed_costs=500.0,
+            variable_cost_per_hour=75.0
+        )
+        flights = [
+            FlightRecord(
+                id=f"BILL-00{i}",
+                tail_number="N593EH",
+                departure_airport="KSFO",
+                arrival_airport="KLAX",
+                departure_time_utc=datetime(2024, 1, 15, 8 + 2 * i, 0, tzinfo=timezone.utc),
+                arrival_time_utc=datetime(2024, 1, 15, 8 + 2 * i, 0, tzinfo=timezone.utc) + timedelta(minutes=minutes),
+                flight_duration_minutes=minutes
+            )
+            for i, minutes in enumerate([60, 61, 0])
+        ]
+        
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            test_db.add(settings)
+            store_flights(test_db, flights)
+            test_db.commit()
+            
+            response = client.get('/api/summary?start_date=2024-01-15&end_date=2024-01-15')
+            
+            assert response.status_code == 200
+            summary = json.loads(response.data)
+            
+            assert summary["totalFlightMinutes"] == 121
+            assert summary["totalHobbsMinutes"] == 166
+            # 75 min -> 1.3 h, 76 min -> 1.3 h, 15 min -> 0.3 h
+            assert summary["totalBillableHours"] == 2.9
+            assert summary["totalRevenue"] == 435.0
+            assert summary["totalVariableCosts"] == 217.5
+    
     def test_get_summary_no_flights(self, client, test_db):
         """Test summary when no flights exist."""
         from app.models import FinancialSettings
@@ -269,6 +514,201 @@ class TestSummaryEndpoint:
             assert abs(summary["totalFixedCosts"] - expected_fixed) < 1.0
 
 
+class TestSummarySeriesEndpoint:
+    """Test cases for /api/summary/series endpoint."""
+    
+    def add_flights(self, test_db):
+        from app.models import FlightRecord, FinancialSettings
+        from app.services.ingest import store_flights
+        
+        test_db.add(FinancialSettings(
+            revenue_per_hour=150.0,
+            monthly_fixed_costs=500.0,
+            variable_cost_per_hour=75.0
+        ))
+        departures = [datetime(2024, 1, d, 9, 0, tzinfo=timezone.utc) for d in (14, 15, 21, 22, 31)]
+        departures += [datetime(2024, 2, d, 23, 30, tzinfo=timezone.utc) for d in (1, 29)]
+        departures += [datetime(2024, 3, 10, 12, 0, tzinfo=timezone.utc)]
+        store_flights(test_db, [
+            FlightRecord(
+                id=f"SERIES-{i:03d}",
+                tail_number="N593EH",
+                departure_airport="KSFO",
+                arrival_airport="KLAX",
+                departure_time_utc=departure,
+                arrival_time_utc=departure + timedelta(minutes=45 + 7 * i),
+                flight_duration_minutes=45 + 7 * i
+            )
+            for i, departure in enumerate(departures)
+        ])
+        test_db.commit()
+    
+    def test_month_buckets_match_summary(self, client, test_db):
+        """Test that each month equals /api/summary over the same clipped range."""
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            self.add_flights(test_db)
+            
+            response = client.get('/api/summary/series?start_date=2024-01-15&end_date=2024-03-10&bucket=month')
+            
+            assert response.status_code == 200
+            data = json.loads(response.data)
+            assert data["bucket"] == "month"
+            assert [b["period"] for b in data["series"]] == ["2024-01", "2024-02", "2024-03"]
+            
+            ranges = [("2024-01-15", "2024-01-31"), ("2024-02-01", "2024-02-29"), ("2024-03-01", "2024-03-10")]
+            for bucket, (start, end) in zip(data["series"], ranges):
+                summary = json.loads(client.get(f'/api/summary?start_date={start}&end_date={end}').data)
+                assert bucket == dict(summary, period=bucket["period"])
+            
+            total = json.loads(client.get('/api/summary?start_date=2024-01-15&end_date=2024-03-10').data)
+            assert data["total"] == total
+            assert sum(b["totalFlightMinutes"] for b in data["series"]) == total["totalFlightMinutes"]
+    
+    def test_week_and_day_buckets(self, client, test_db):
+        """Test ISO week labels and that empty buckets are included."""
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            self.add_flights(test_db)
+            
+            weeks = json.loads(client.get('/api/summary/series?start_date=2024-01-14&end_date=2024-01-28&bucket=week').data)
+            days = json.loads(client.get('/api/summary/series?start_date=2024-01-14&end_date=2024-01-16&bucket=day').data)
+            
+            # Sunday 14th closes week 2; the 21st (Sunday) and 22nd fall in different weeks
+            assert [b["period"] for b in weeks["series"]] == ["2024-W02", "2024-W03", "2024-W04"]
+            assert [b["totalFlightMinutes"] for b in weeks["series"]] == [45, 52 + 59, 66]
+            assert weeks["series"][0]["startDate"] == "2024-01-14T00:00:00+00:00"
+            assert [b["period"] for b in days["series"]] == ["2024-01-14", "2024-01-15", "2024-01-16"]
+            assert days["series"][2]["totalFlightMinutes"] == 0
+            assert days["series"][2]["totalFixedCosts"] > 0
+    
+    def test_invalid_bucket(self, client):
+        """Test that an unknown bucket is rejected."""
+        response = client.get('/api/summary/series?start_date=2024-01-01&end_date=2024-12-31&bucket=year')
+        
+        assert response.status_code == 400
+    
+    def test_too_many_buckets(self, client):
+        """Test that very long day series are rejected before querying."""
+        response = client.get('/api/summary/series?start_date=1990-01-01&end_date=2024-12-31&bucket=day')
+        
+        assert response.status_code == 400
+    
+    def test_too_many_buckets_rejected_before_building_periods(self, client):
+        """Test that the bucket cap is checked from the dates alone."""
+        with patch('app.api.bucket_periods') as mock_bucket_periods:
+            response = client.get('/api/summary/series?start_date=0001-01-01&end_date=9999-12-31&bucket=day')
+        
+        assert response.status_code == 400
+        mock_bucket_periods.assert_not_called()
+    
+    @pytest.mark.parametrize("query", [
+        "start_date=9999-12-01&end_date=9999-12-30&bucket=month",
+        "start_date=9999-12-27&end_date=9999-12-30&bucket=week",
+        "start_date=9999-12-30&end_date=9999-12-31&bucket=day",
+    ])
+    def test_last_representable_bucket(self, client, query):
+        """Test that ranges whose last bucket ends after year 9999 are a 400, not a 500."""
+        response = client.get(f'/api/summary/series?{query}')
+        
+        assert response.status_code == 400
+
+
+class TestConditionalGet:
+    """Test cases for ETag / If-None-Match on flights and summary."""
+    
+    FLIGHTS_URL = '/api/flights?start_date=2024-01-15&end_date=2024-01-15'
+    SUMMARY_URL = '/api/summary?start_date=2024-01-15&end_date=2024-01-15'
+    
+    @pytest.fixture
+    def db(self, test_db):
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            yield test_db
+    
+    @pytest.mark.parametrize("url", [FLIGHTS_URL, SUMMARY_URL])
+    def test_not_modified(self, client, db, url):
+        """Test that a matching If-None-Match gets an empty 304."""
+        first = client.get(url)
+        etag = first.headers["ETag"]
+        assert first.status_code == 200
+        assert etag.startswith('"') and not etag.startswith('W/')
+        
+        second = client.get(url, headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert second.data == b""
+        assert second.headers["ETag"] == etag
+    
+    def test_not_modified_skips_flights_table(self, client, db):
+        """Test that a 304 only reads data versions."""
+        from sqlalchemy import event
+        
+        etag = client.get(self.FLIGHTS_URL).headers["ETag"]
+        executed = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            executed.append(statement)
+        
+        event.listen(db.get_bind(), "before_cursor_execute", record)
+        try:
+            response = client.get(self.FLIGHTS_URL, headers={"If-None-Match": etag})
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", record)
+        
+        assert response.status_code == 304
+        assert len(executed) == 1
+        assert "data_versions" in executed[0]
+    
+    def test_etag_varies_with_params(self, client, db):
+        """Test that different query parameters get different ETags."""
+        one_day = client.get(self.FLIGHTS_URL).headers["ETag"]
+        two_days = client.get('/api/flights?start_date=2024-01-15&end_date=2024-01-16').headers["ETag"]
+        
+        assert one_day != two_days
+    
+    def test_etag_changes_after_ingest(self, client, db):
+        """Test that storing new flights invalidates the ETag."""
+        from app.models import FlightRecord
+        from app.services.ingest import store_flights
+        
+        etag = client.get(self.FLIGHTS_URL).headers["ETag"]
+        store_flights(db, [FlightRecord(
+            id="ETAG-001",
+            tail_number="N593EH",
+            departure_airport="KSFO",
+            arrival_airport="KLAX",
+            departure_time_utc=datetime(2024, 1, 15, 14, 30, tzinfo=timezone.utc),
+            arrival_time_utc=datetime(2024, 1, 15, 15, 45, tzinfo=timezone.utc),
+            flight_duration_minutes=75
+        )])
+        db.commit()
+        
+        response = client.get(self.FLIGHTS_URL, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert len(json.loads(response.data)) == 1
+    
+    def test_etag_changes_after_settings_update(self, client, db):
+        """Test that updating financial settings invalidates the ETag."""
+        etag = client.get(self.SUMMARY_URL).headers["ETag"]
+        client.put(
+            '/api/financial-settings',
+            data=json.dumps({"revenue_per_hour": 200.0, "monthly_fixed_costs": 700.0, "variable_cost_per_hour": 90.0}),
+            content_type='application/json'
+        )
+        
+        response = client.get(self.SUMMARY_URL, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+    
+    def test_errors_have_no_etag(self, client):
+        """Test that error responses are not tagged."""
+        response = client.get('/api/flights')
+        
+        assert response.status_code == 400
+        assert "ETag" not in response.headers
+
+
 class TestFinancialSettingsEndpoints:
     """Test cases for financial settings endpoints."""
     
@@ -0,0 +1,103 @@
+"""
+Tests for database engine configuration.
+"""
+import pytest
+import threading
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+
+
+@pytest.fixture
+def engines(tmp_path, monkeypatch):
+    """Writer and reader engines over a fresh SQLite file."""
+    from app.database import create_engines
+    from app.models import Base
+
+    monkeypatch.setenv("DATABASE_WRITE_TIMEOUT", "0.2")
+    engines = create_engines(f"sqlite:///{tmp_path / 'airlogger.db'}")
+    Base.metadata.create_all(engines.writer)
+    yield engines
+    engines.dispose()
+
+
+class TestCreateEngines:
+    """Test cases for create_engines."""
+
+    def test_pragmas_applied(self, engines):
+        """Test that connections use WAL, NORMAL sync, mmap and a busy timeout."""
+        assert engines.split
+        for engine in (engines.writer, engines.reader):
+            with engine.connect() as connection:
+                assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+                assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+                assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+                assert connection.exec_driver_sql("PRAGMA mmap_size").scalar() == 256 * 1024 * 1024
+
+    def test_reader_cannot_write(self, engines):
+        """Test that read-only connections reject writes."""
+        with engines.reader.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("INSERT INTO aircraft (tail_number, active) VALUES ('N1', 1)"))
+
+    def test_reads_not_blocked_by_open_write(self, engines):
+        """Test that readers see the last commit while a write transaction is open."""
+        with engines.writer.begin() as connection:
+            connection.execute(text("INSERT INTO aircraft (tail_number, active) VALUES ('N1', 1)"))
+
+        with engines.writer.begin() as connection:
+            connection.execute(text("INSERT INTO aircraft (tail_number, active) VALUES ('N2', 1)"))
+            with engines.reader.connect() as reader:
+                rows = reader.execute(text("SELECT tail_number FROM aircraft")).scalars().all()
+
+        assert rows == ["N1"]
+
+    def test_single_writer_connection(self, engines):
+        """Test that a second writer waits for the first and then times out."""
+        held = engines.writer.connect()
+        errors = []
+
+        def second_writer():
+            try:
+                engines.writer.connect().close()
+            except PoolTimeoutError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=second_writer)
+        thread.start()
+        thread.join(5)
+        held.close()
+
+        assert len(errors) == 1
+        engines.writer.connect().close()
+
+    def test_memory_database_shares_engine(self):
+        """Test that an in-memory database uses one engine for both roles."""
+        from app.database import create_engines
+
+        engines = create_engines("sqlite:///:memory:")
+
+        assert not engines.split
+        assert engines.reader is engines.writer
+
+
+class TestReadSessions:
+    """Test cases for read-only sessions in the API."""
+
+    def test_get_requests_use_read_pool(self, tmp_path, monkeypatch):
+        """Test that GET endpoints answer while the writer connection is held."""
+        from app import create_app
+
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'airlogger.db'}")
+        monkeypatch.setenv("DATABASE_WRITE_TIMEOUT", "0.2")
+        app = create_app()
+        engines = app.extensions['db_engines']
+        client = app.test_client()
+        try:
+            with engines.writer.begin() as connection:
+                connection.execute(text("INSERT INTO aircraft (tail_number, active) VALUES ('N593EH', 1)"))
+                assert client.get('/api/aircraft').get_json() == []
+                assert client.get('/api/financial-settings').status_code == 200
+            assert [a["tail_number"] for a in client.get('/api/aircraft').get_json()] == ["N593EH"]
+        finally:
+            app.extensions['refresh_jobs'].shutdown()
+            engines.dispose()
@@ -0,0 +1,190 @@
+"""
+Tests for fleet-wide refresh and aircraft registration.
+"""
+import pytest
+import json
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class FleetClient:
+    """FlightAware client double returning two flights per tail after a delay."""
+
+    def __init__(self, delay=0.0, failing=()):
+        self.delay = delay
+        self.failing = set(failing)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch_aircraft_history(self, registration, start_date, end_date, raise_errors=False, now=None):
+        from app.services.flightaware import FlightAwareError
+
+        with self.lock:
+            self.calls.append(registration)
+        time.sleep(self.delay)
+        if registration in self.failing:
+            raise FlightAwareError(f"{registration}: HTTP 503")
+        return [{"tail": registration, "n": n} for n in range(2)]
+
+    def process_flight_data(self, raw_flights):
+        from app.models import FlightRecord
+
+        return [
+            FlightRecord(
+                id=f"{raw['tail']}-{raw['n']}",
+                tail_number=raw["tail"],
+                departure_airport="KSFO",
+                arrival_airport="KLAX",
+                departure_time_utc=NOW - timedelta(hours=5 - raw["n"]),
+                arrival_time_utc=NOW - timedelta(hours=4 - raw["n"]),
+                flight_duration_minutes=60
+            )
+            for raw in raw_flights
+        ]
+
+
+class TestFleetRefresh:
+    """Test cases for run_fleet_refresh."""
+
+    def test_fetches_concurrently_and_stores_all(self, test_db):
+        """Test that tails are fetched in parallel and stored together."""
+        from app.models import FlightRecord, SyncState
+        from app.services.fleet import run_fleet_refresh
+
+        tails = [f"N{n}AB" for n in range(6)]
+        client = FleetClient(delay=0.2)
+
+        started = time.perf_counter()
+        fleet = run_fleet_refresh(test_db, client, tails, now=NOW, max_workers=6)
+        elapsed = time.perf_counter() - started
+
+        # Six 0.2 s fetches in well under their 1.2 s sum
+        assert elapsed < 0.8
+        assert sorted(client.calls) == tails
+        assert fleet.inserted == 12
+        assert [r.inserted for r in fleet.results] == [2] * 6
+        assert fleet.errors == {}
+        assert test_db.query(FlightRecord).count() == 12
+        assert test_db.query(SyncState).count() == 6
+
+    def test_no_transaction_held_during_fetches(self, test_db, monkeypatch):
+        """Test that planning releases the session's connection before any tail is fetched."""
+        from app.services.fleet import run_fleet_refresh
+
+        monkeypatch.setenv("REFRESH_MIN_INTERVAL_SECONDS", "0")
+        client = FleetClient()
+        fetch, in_transaction = client.fetch_aircraft_history, []
+        client.fetch_aircraft_history = lambda *args, **kwargs: in_transaction.append(
+            test_db.in_transaction()) or fetch(*args, **kwargs)
+
+        fleet = run_fleet_refresh(test_db, client, ["N1AB", "N2AB"], now=NOW)
+
+        assert in_transaction == [False, False]
+        assert fleet.inserted == 4
+
+    def test_failed_tail_does_not_block_others(self, test_db):
+        """Test that one tail's upstream error is reported and the rest stored."""
+        from app.models import FlightRecord, SyncState
+        from app.services.fleet import run_fleet_refresh
+
+        fleet = run_fleet_refresh(test_db, FleetClient(failing={"N2AB"}), ["N1AB", "N2AB"], now=NOW)
+
+        assert fleet.errors == {"N2AB": "N2AB: HTTP 503"}
+        assert fleet.inserted == 2
+        assert test_db.query(FlightRecord).filter_by(tail_number="N2AB").count() == 0
+        assert test_db.get(SyncState, "N2AB") is None
+        assert test_db.get(SyncState, "N1AB").last_fa_flight_id == "N1AB-1"
+
+    def test_throttled_tails_are_not_fetched(self, test_db, monkeypatch):
+        """Test that tails fetched within the minimum interval are skipped."""
+        from app.services.fleet import run_fleet_refresh
+
+        monkeypatch.setenv("REFRESH_MIN_INTERVAL_SECONDS", "60")
+        run_fleet_refresh(test_db, FleetClient(), ["N1AB"], now=NOW)
+
+        client = FleetClient()
+        fleet = run_fleet_refresh(test_db, client, ["N1AB", "N2AB"], now=NOW + timedelta(seconds=10))
+
+        assert client.calls == ["N2AB"]
+        assert [r.throttled for r in fleet.results] == [True, False]
+
+    def test_active_tail_numbers(self, test_db):
+        """Test that only active aircraft are refreshed."""
+        from app.models import Aircraft
+        from app.services.fleet import active_tail_numbers
+
+        test_db.add_all([
+            Aircraft(tail_number="N2AB", active=True),
+            Aircraft(tail_number="N1AB", active=True),
+            Aircraft(tail_number="N3AB", active=False),
+        ])
+        test_db.commit()
+
+        assert active_tail_numbers(test_db) == ["N1AB", "N2AB"]
+
+
+class TestFleetEndpoints:
+    """Test cases for /api/aircraft and fleet refresh_data."""
+
+    @pytest.fixture
+    def db(self, test_db):
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            yield test_db
+
+    def test_register_list_and_remove(self, client, db):
+        """Test the aircraft registration lifecycle."""
+        response = client.post('/api/aircraft', data=json.dumps({"tail_number": " n123ab "}),
+                               content_type='application/json')
+        assert response.status_code == 201
+        assert json.loads(response.data)["tail_number"] == "N123AB"
+
+        response = client.post('/api/aircraft', data=json.dumps({"tail_number": "N123AB", "active": False}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        assert json.loads(client.get('/api/aircraft').data)[0]["active"] is False
+
+        assert client.delete('/api/aircraft/N123AB').status_code == 204
+        assert client.delete('/api/aircraft/N123AB').status_code == 404
+        assert json.loads(client.get('/api/aircraft').data) == []
+
+    def test_register_requires_tail_number(self, client, db):
+        """Test validation of the registration body."""
+        response = client.post('/api/aircraft', data=json.dumps({}), content_type='application/json')
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("body", [["N123AB"], "N123AB", None])
+    def test_register_requires_object_body(self, client, db, body):
+        """Test that a JSON body other than an object is a 400, not a 500."""
+        response = client.post('/api/aircraft', data=json.dumps(body), content_type='application/json')
+
+        assert response.status_code == 400
+
+    def test_fleet_refresh(self, client, db):
+        """Test that fleet=true refreshes every registered aircraft."""
+        from app.models import Aircraft
+
+        db.add_all([Aircraft(tail_number="N1AB"), Aircraft(tail_number="N2AB")])
+        db.commit()
+
+        fleet_client = FleetClient(failing={"N2AB"})
+        with patch('app.api.FlightAwareClient', return_value=fleet_client):
+            response = client.post('/api/refresh_data?fleet=true')
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["flights_added"] == 2
+        assert [a["tail_number"] for a in data["aircraft"]] == ["N1AB", "N2AB"]
+        assert data["aircraft"][1]["error"] == "N2AB: HTTP 503"
+
+    def test_fleet_refresh_all_failed(self, client, db):
+        """Test 502 when no aircraft could be fetched."""
+        with patch('app.api.FlightAwareClient', return_value=FleetClient(failing={"N593EH"})):
+            response = client.post('/api/refresh_data?fleet=true')
+
+        assert response.status_code == 502
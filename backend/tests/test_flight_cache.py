@@ -0,0 +1,164 @@
+"""
+Tests for the columnar recent-flights cache.
+"""
+import pytest
+import json
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+
+@pytest.fixture
+def recent_flights(make_flight):
+    """Factory for flights from days_ago until now, two of them sharing each departure time."""
+    def factory(count, days_ago=20, tail_number="N593EH", prefix="HOT"):
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=days_ago)
+        airports = ("KSFO", "KLAX", "KPAO")
+        return [
+            make_flight(f"{prefix}-{tail_number}-{i:04d}", start + timedelta(hours=9 * (i // 2)), 40 + i,
+                        tail_number, airports[i % 3], airports[(i + 1) % 3])
+            for i in range(count)
+        ]
+
+    return factory
+
+
+def day(days_ago):
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+
+
+@pytest.fixture
+def cached_client(app, test_db):
+    """Client whose requests read test_db, with the recent-flights cache enabled."""
+    with patch('app.api.get_db_session') as mock_get_session:
+        mock_get_session.return_value = test_db
+        yield app.test_client(), app.extensions['flight_cache']
+
+
+def uncached(app, url):
+    """Fetch a URL with the flight and response caches bypassed."""
+    flight_cache = app.extensions['flight_cache']
+    app.extensions['flight_cache'] = None
+    try:
+        return json.loads(app.test_client().get(url, headers={"Cache-Control": "no-cache"}).data)
+    finally:
+        app.extensions['flight_cache'] = flight_cache
+
+
+class TestRecentFlightsCache:
+    """Test cases for /api/flights through RecentFlightsCache."""
+
+    def test_range_matches_database(self, app, cached_client, test_db, recent_flights, store):
+        """Test that a cached range serializes exactly like the database query."""
+        client, flight_cache = cached_client
+        store(test_db, recent_flights(60))
+
+        url = f'/api/flights?start_date={day(15)}&end_date={day(2)}'
+        cached = json.loads(client.get(url).data)
+        app.extensions['response_cache'].clear()
+
+        assert cached
+        assert cached == uncached(app, url)
+        assert flight_cache.stats()["loads"] == 1
+
+    def test_pages_match_database(self, app, cached_client, test_db, recent_flights, store):
+        """Test keyset pages, including ties on departure time, served from memory."""
+        client, flight_cache = cached_client
+        store(test_db, recent_flights(45))
+
+        base = f'/api/flights?start_date={day(25)}&end_date={day(0)}&limit=4'
+        pages, url = [], base
+        while url:
+            page = json.loads(client.get(url).data)
+            pages.append(page["flights"])
+            url = f'{base}&cursor={page["next_cursor"]}' if page["next_cursor"] else None
+        app.extensions['response_cache'].clear()
+
+        assert [f for page in pages for f in page] == uncached(app, f'/api/flights?start_date={day(25)}&end_date={day(0)}')
+        assert len(pages) == 12
+        stats = flight_cache.stats()
+        assert (stats["loads"], stats["hits"]) == (1, 11)
+
+    def test_range_before_window_reads_database(self, cached_client, test_db, recent_flights, store):
+        """Test that ranges starting before the window bypass the cache."""
+        client, flight_cache = cached_client
+        store(test_db, recent_flights(10, days_ago=40))
+
+        flights = json.loads(client.get(f'/api/flights?start_date={day(45)}&end_date={day(0)}').data)
+
+        assert len(flights) == 10
+        assert flight_cache.stats()["bypasses"] == 1
+        assert flight_cache.stats()["tails"] == 0
+
+    def test_ingest_invalidates_tail(self, cached_client, test_db, recent_flights, store):
+        """Test that flights stored by this process replace the cached window."""
+        client, flight_cache = cached_client
+        store(test_db, recent_flights(10))
+        assert len(json.loads(client.get(f'/api/flights?start_date={day(25)}&end_date={day(0)}').data)) == 10
+
+        result = store(test_db, recent_flights(3, days_ago=5, prefix="NEW"))
+        assert flight_cache.invalidate_flights(result.inserted_departures, result.flights_version) == 1
+
+        assert len(json.loads(client.get(f'/api/flights?start_date={day(24)}&end_date={day(0)}').data)) == 13
+        assert flight_cache.stats()["loads"] == 2
+
+    def test_other_writers_invalidate(self, cached_client, test_db, recent_flights, store):
+        """Test that a flights version bump not seen through invalidate_flights drops every tail."""
+        client, flight_cache = cached_client
+        store(test_db, recent_flights(10))
+        client.get(f'/api/flights?start_date={day(25)}&end_date={day(0)}')
+
+        # Another process stores flights
+        store(test_db, recent_flights(2, days_ago=3, prefix="OTHER"))
+
+        assert len(json.loads(client.get(f'/api/flights?start_date={day(24)}&end_date={day(0)}').data)) == 12
+        assert flight_cache.stats()["invalidations"] == 1
+
+    def test_least_recently_used_tail_evicted(self, test_db, recent_flights, store):
+        """Test that max_tails bounds the number of cached aircraft."""
+        from app.models import DataVersion
+        from app.services.flight_cache import RecentFlightsCache
+        from app.services.ingest import FLIGHTS_VERSION
+
+        for tail_number in ("N1", "N2", "N3"):
+            store(test_db, recent_flights(4, tail_number=tail_number))
+        flight_cache = RecentFlightsCache(days=30, max_tails=2)
+        version = DataVersion.current(test_db, FLIGHTS_VERSION)
+        start, end = datetime.now(timezone.utc) - timedelta(days=25), datetime.now(timezone.utc)
+
+        for tail_number in ("N1", "N2", "N1", "N3"):
+            assert len(flight_cache.select(test_db, version, tail_number, start, end)) == 4
+
+        stats = flight_cache.stats()
+        assert stats["tails"] == 2
+        assert stats["evictions"] == 1
+        assert flight_cache.select(test_db, version, "N1", start, end) is not None
+        assert flight_cache.stats()["hits"] == 2
+
+    def test_columns_intern_airports_and_report_memory(self, test_db, recent_flights, store):
+        """Test that airport codes are shared and stats report bytes and hit rate."""
+        from app.models import DataVersion
+        from app.services.flight_cache import RecentFlightsCache
+        from app.services.ingest import FLIGHTS_VERSION
+
+        store(test_db, recent_flights(30))
+        flight_cache = RecentFlightsCache(days=30)
+        version = DataVersion.current(test_db, FLIGHTS_VERSION)
+        start, end = datetime.now(timezone.utc) - timedelta(days=25), datetime.now(timezone.utc)
+
+        flights = flight_cache.select(test_db, version, "N593EH", start, end)
+        flight_cache.select(test_db, version, "N593EH", start + timedelta(days=1), end)
+
+        assert flights[0].departure_airport is flights[3].departure_airport
+        stats = flight_cache.stats()
+        assert stats["flights"] == 30
+        assert stats["bytes"] > 0
+        assert stats["hit_rate"] == 0.5
+
+    def test_cache_stats_endpoint(self, cached_client):
+        """Test that /api/admin/cache-stats includes the flight cache."""
+        client, _ = cached_client
+
+        stats = json.loads(client.get('/api/admin/cache-stats').data)
+
+        assert stats["flight_cache"]["days"] == 30
+        assert stats["flight_cache"]["tails"] == 0
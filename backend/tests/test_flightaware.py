@@ -2,7 +2,11 @@
 Tests for FlightAware API integration.
 """
 import pytest
+import json
+import threading
+import time
 from datetime import datetime, timezone, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import requests_mock
 import requests
 
@@ -195,4 +199,501 @@ class TestFlightAwareClient:
         flights = client.process_flight_data(data)
         
         assert len(flights) == 1
-        assert flights[0].flight_duration_minutes == 0  # Should be set to 0, not negative
\ No newline at end of file
+        assert flights[0].flight_duration_minutes == 0  # Should be set to 0, not negative
+    
+    def test_parse_aeroapi_datetime(self):
+        """Test the fast path and general ISO 8601 timestamps."""
+        from app.services.flightaware import parse_aeroapi_datetime
+        
+        expected = datetime(2024, 1, 15, 14, 30, tzinfo=timezone.utc)
+        assert parse_aeroapi_datetime("2024-01-15T14:30:00Z") == expected
+        assert parse_aeroapi_datetime("2024-01-15T14:30:00+00:00") == expected
+        assert parse_aeroapi_datetime("2024-01-15T16:30:00+02:00") == expected
+        assert parse_aeroapi_datetime("2024-01-15T14:30:00") == expected
+        assert parse_aeroapi_datetime("2024-01-15T14:30:00.250Z").microsecond == 250000
+        with pytest.raises(ValueError):
+            parse_aeroapi_datetime("15/01/2024 14:30")
+    
+    def test_timestamps_parsed_once(self, mock_api_key, sample_flight_data):
+        """Test that filtering and processing share parsed timestamps."""
+        from unittest.mock import patch
+        from app.services import flightaware
+        
+        client = flightaware.FlightAwareClient()
+        flights = sample_flight_data["flights"] * 2
+        
+        with patch.object(flightaware, 'parse_aeroapi_datetime', wraps=flightaware.parse_aeroapi_datetime) as parse:
+            for flight in flights:
+                client._parse_timestamp(flight["actual_out"])
+            processed = client.process_flight_data(flights)
+        
+        # Two departures and two arrivals, each parsed once
+        assert parse.call_count == 4
+        assert len(processed) == 4
+        assert client._timestamps == {}
+    
+    def test_process_flight_data_schedule_fallback(self, mock_api_key):
+        """Test that the first present timestamp field is used."""
+        from app.services.flightaware import FlightAwareClient
+        
+        client = FlightAwareClient()
+        data = [{
+            "fa_flight_id": "SCHEDULED-123",
+            "ident": "N593EH",
+            "origin": {"code": "KSFO"},
+            "destination": None,
+            "actual_out": None,
+            "scheduled_out": "2024-01-15T14:30:00Z",
+            "scheduled_in": "2024-01-15T15:00:00Z"
+        }, {
+            "fa_flight_id": "SCHEDULED-456",
+            "ident": "N593EH",
+            "origin": {"code": "KSFO"},
+            "destination": {"code": "KLAX"},
+            "actual_out": "",
+            "scheduled_out": "2024-01-15T14:30:00Z",
+            "scheduled_in": "2024-01-15T15:00:00Z"
+        }]
+        
+        flights = client.process_flight_data(data)
+        
+        assert [f.id for f in flights] == ["SCHEDULED-456"]
+        assert flights[0].flight_duration_minutes == 30
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Replays scripted (status, headers, body) responses in order."""
+    protocol_version = "HTTP/1.1"
+    
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address[1], self.headers.get("x-apikey")))
+        with server.lock:
+            server.inflight += 1
+            server.max_inflight = max(server.max_inflight, server.inflight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.inflight -= 1
+        status, headers, body = server.script.pop(0) if server.script else (200, {}, {"flights": []})
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFlightAwareTransport:
+    """Test cases for pooling and retries against a local stub server."""
+    
+    @pytest.fixture
+    def stub(self):
+        """Run a stub AeroAPI server on a free local port."""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        server.script = []
+        server.requests = []
+        server.delay = 0
+        server.lock = threading.Lock()
+        server.inflight = 0
+        server.max_inflight = 0
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        server.base_url = f"http://127.0.0.1:{server.server_address[1]}/aeroapi"
+        yield server
+        server.shutdown()
+        server.server_close()
+    
+    @pytest.fixture
+    def make_client(self, monkeypatch, stub):
+        """Build clients pointed at the stub with a private pooled session."""
+        from app.services.flightaware import FlightAwareClient
+        
+        monkeypatch.setenv("FLIGHTAWARE_API_KEY", "test_api_key_123")
+        session = requests.Session()
+        sleeps = []
+        
+        def factory(**kwargs):
+            client = FlightAwareClient(base_url=stub.base_url, session=session, **kwargs)
+            client._sleep = sleeps.append
+            client._now = lambda: datetime(2024, 1, 20, tzinfo=timezone.utc)
+            client.sleeps = sleeps
+            return client
+        
+        yield factory
+        session.close()
+    
+    def window(self):
+        """A range inside the recent window, served by a single request."""
+        return datetime(2024, 1, 15, tzinfo=timezone.utc), datetime(2024, 1, 20, tzinfo=timezone.utc)
+    
+    def test_base_url_override(self, stub, make_client, sample_flight_data):
+        """Test that requests go to the configured base URL."""
+        stub.script = [(200, {}, sample_flight_data)]
+        client = make_client()
+        
+        result = client.fetch_aircraft_history("N593EH", *self.window())
+        
+        assert len(result) == 2
+        assert stub.requests[0][0].split("?")[0] == "/aeroapi/flights/N593EH"
+        assert stub.requests[0][2] == "test_api_key_123"
+    
+    def test_retries_server_errors(self, stub, make_client, sample_flight_data):
+        """Test that 5xx responses are retried with backoff and recorded."""
+        stub.script = [(503, {}, {}), (502, {}, {}), (200, {}, sample_flight_data)]
+        client = make_client(max_retries=3, backoff_factor=0.5)
+        
+        result = client.fetch_aircraft_history("N593EH", *self.window())
+        
+        assert len(result) == 2
+        assert len(stub.requests) == 3
+        assert client.last_call.retries == 2
+        assert client.last_call.status == 200
+        assert client.last_call.latency_seconds > 0
+        # Full jitter: each delay is within the exponential cap
+        assert 0 <= client.sleeps[0] <= 0.5
+        assert 0 <= client.sleeps[1] <= 1.0
+    
+    def test_honours_retry_after(self, stub, make_client, sample_flight_data):
+        """Test that a 429 Retry-After header sets the retry delay."""
+        stub.script = [(429, {"Retry-After": "2"}, {}), (200, {}, sample_flight_data)]
+        client = make_client(max_retries=1)
+        
+        client.fetch_aircraft_history("N593EH", *self.window())
+        
+        assert client.sleeps == [2.0]
+    
+    def test_raises_after_retries_exhausted(self, stub, make_client):
+        """Test that persistent 429s surface as FlightAwareError when requested."""
+        from app.services.flightaware import FlightAwareError
+        
+        stub.script = [(429, {"Retry-After": "0"}, {})] * 3
+        client = make_client(max_retries=2)
+        
+        with pytest.raises(FlightAwareError):
+            client.fetch_aircraft_history("N593EH", *self.window(), raise_errors=True)
+        assert len(stub.requests) == 3
+        assert client.last_call.retries == 2
+        assert client.last_call.status == 429
+    
+    def test_client_errors_not_retried(self, stub, make_client):
+        """Test that 4xx responses other than 429 fail immediately."""
+        stub.script = [(401, {}, {"error": "Unauthorized"})]
+        client = make_client(max_retries=3)
+        
+        assert client.fetch_aircraft_history("N593EH", *self.window()) == []
+        assert len(stub.requests) == 1
+        assert client.sleeps == []
+    
+    def test_connections_are_reused(self, stub, make_client):
+        """Test keep-alive across calls and client instances."""
+        make_client().fetch_aircraft_history("N593EH", *self.window())
+        make_client().fetch_aircraft_history("N593EH", *self.window())
+        
+        client_ports = {port for _, port, _ in stub.requests}
+        assert len(stub.requests) == 2
+        assert len(client_ports) == 1
+    
+    def test_history_windows_fetched_concurrently(self, stub, make_client):
+        """Test that history windows are requested in parallel on the pool."""
+        stub.delay = 0.1
+        client = make_client()
+        client.max_workers = 4
+        
+        started = time.perf_counter()
+        client.fetch_aircraft_history("N593EH", datetime(2023, 11, 1, tzinfo=timezone.utc), datetime(2024, 1, 20, tzinfo=timezone.utc))
+        elapsed = time.perf_counter() - started
+        
+        # 10 history windows plus the recent window
+        assert len(stub.requests) == 11
+        assert 1 < stub.max_inflight <= 4
+        assert elapsed < 11 * stub.delay
+    
+    def test_request_slots_cap_concurrency(self, stub, make_client):
+        """Test that the shared request slots bound requests in flight across clients."""
+        stub.delay = 0.05
+        clients = [make_client(), make_client()]
+        slots = threading.BoundedSemaphore(2)
+        for client in clients:
+            client.max_workers = 4
+            client.request_slots = slots
+        
+        threads = [
+            threading.Thread(target=client.fetch_aircraft_history,
+                             args=("N593EH", datetime(2023, 12, 1, tzinfo=timezone.utc), datetime(2024, 1, 20, tzinfo=timezone.utc)))
+            for client in clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        # Each client: 6 history windows plus the recent window
+        assert len(stub.requests) == 14
+        assert stub.max_inflight == 2
+    
+    def test_disk_cache_serves_repeat_requests(self, stub, make_client, sample_flight_data, tmp_path):
+        """Test that fresh cached responses are used instead of calling AeroAPI."""
+        from app.services.flightaware_cache import FlightAwareCache
+        
+        stub.script = [(503, {}, {}), (200, {}, sample_flight_data)]
+        cache = FlightAwareCache(str(tmp_path))
+        
+        first = make_client(cache=cache).fetch_aircraft_history("N593EH", *self.window())
+        client = make_client(cache=cache)
+        second = client.fetch_aircraft_history("N593EH", *self.window())
+        
+        assert first == second
+        assert len(stub.requests) == 2
+        assert cache.writes == 1
+        assert client.last_call.cached is True
+    
+    def test_streamed_pages_cached_without_buffering(self, stub, make_client, sample_flight_data, tmp_path):
+        """Test that streamed pages are copied to the disk cache as they are parsed."""
+        from unittest.mock import PropertyMock, patch
+        from app.services.flightaware_cache import FlightAwareCache
+        
+        stub.script = [(200, {}, sample_flight_data)]
+        cache = FlightAwareCache(str(tmp_path))
+        client = make_client(cache=cache)
+        client.stream_chunk_size = 16
+        
+        with patch.object(requests.Response, 'content', new_callable=PropertyMock) as content:
+            flights = client.fetch_aircraft_history("N593EH", *self.window())
+        
+        content.assert_not_called()
+        assert len(flights) == 2
+        assert cache.writes == 1
+        path, params = client._plan_windows("N593EH", *self.window())[0]
+        assert json.loads(cache.get(path, params).body) == sample_flight_data
+    
+    def test_replay_without_api_key(self, stub, make_client, sample_flight_data, tmp_path, monkeypatch):
+        """Test that replay mode runs from the cache alone."""
+        from app.services.flightaware import FlightAwareError
+        from app.services.flightaware_cache import FlightAwareCache
+        
+        stub.script = [(200, {}, sample_flight_data)]
+        cache = FlightAwareCache(str(tmp_path), ttl_seconds=0)
+        make_client(cache=cache).fetch_aircraft_history("N593EH", *self.window())
+        
+        monkeypatch.delenv("FLIGHTAWARE_API_KEY")
+        replay = make_client(cache=cache, replay=True)
+        
+        assert len(replay.fetch_aircraft_history("N593EH", *self.window())) == 2
+        with pytest.raises(FlightAwareError):
+            replay.fetch_aircraft_history("N123AB", *self.window(), raise_errors=True)
+        assert len(stub.requests) == 1
+    
+    def test_replay_runs_at_recorded_clock(self, stub, make_client, sample_flight_data, tmp_path, monkeypatch):
+        """Test that replay plans requests at the recorded time, or FLIGHTAWARE_REPLAY_NOW."""
+        from app.services.flightaware import FlightAwareClient
+        from app.services.flightaware_cache import FlightAwareCache
+        
+        stub.script = [(200, {}, sample_flight_data)]
+        cache = FlightAwareCache(str(tmp_path))
+        recorded_at = datetime(2024, 1, 20, 12, 30, tzinfo=timezone.utc)
+        make_client(cache=cache).fetch_aircraft_history("N593EH", *self.window(), now=recorded_at)
+        
+        assert cache.recorded_clock() == recorded_at
+        assert FlightAwareClient(cache=cache, replay=True)._now() == recorded_at
+        monkeypatch.setenv("FLIGHTAWARE_REPLAY_NOW", "2024-02-01T00:00:00Z")
+        assert FlightAwareClient(cache=cache, replay=True)._now() == datetime(2024, 2, 1, tzinfo=timezone.utc)
+    
+    def test_replay_requires_cache(self, mock_api_key):
+        """Test that replay mode needs a cache directory."""
+        from app.services.flightaware import FlightAwareClient
+        
+        with pytest.raises(ValueError):
+            FlightAwareClient(replay=True)
+    
+    def test_shared_session_by_default(self, mock_api_key):
+        """Test that clients share the process-wide pooled session."""
+        from app.services.flightaware import FlightAwareClient
+        
+        assert FlightAwareClient().session is FlightAwareClient().session
+    
+    @pytest.fixture
+    def mock_api_key(self, monkeypatch):
+        monkeypatch.setenv("FLIGHTAWARE_API_KEY", "test_api_key_123")
+
+
+def raw_flight(flight_id, departure):
+    """Minimal AeroAPI flight payload departing at the given time."""
+    return {
+        "fa_flight_id": flight_id,
+        "ident": "N593EH",
+        "origin": {"code": "KSFO"},
+        "destination": {"code": "KLAX"},
+        "actual_off": departure.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "actual_on": (departure + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    }
+
+
+class TestFlightAwarePagination:
+    """Test cases for pagination and windowed history fetches."""
+    
+    BASE = "https://aeroapi.flightaware.com/aeroapi"
+    NOW = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from app.services.flightaware import FlightAwareClient
+        
+        monkeypatch.setenv("FLIGHTAWARE_API_KEY", "test_api_key_123")
+        client = FlightAwareClient()
+        client._now = lambda: self.NOW
+        return client
+    
+    def test_plan_recent_only(self, client):
+        """Test that a recent range is a single /flights request."""
+        windows = client._plan_windows("N593EH", self.NOW - timedelta(days=3), self.NOW)
+        
+        assert windows == [("/flights/N593EH", {"start": "2024-02-27T00:00:00Z", "end": "2024-03-01T00:00:00Z"})]
+    
+    def test_plan_history_windows(self, client):
+        """Test that older ranges are split into bounded history windows."""
+        windows = client._plan_windows("N593EH", datetime(2024, 1, 1, tzinfo=timezone.utc), self.NOW)
+        
+        history = [w for w in windows if w[0] == "/history/flights/N593EH"]
+        # Jan 1 -> Feb 20 (10 days before now) in 7-day windows
+        assert len(history) == 8
+        assert history[0][1] == {"start": "2024-01-01T00:00:00Z", "end": "2024-01-08T00:00:00Z"}
+        assert history[-1][1]["end"] == "2024-02-20T00:00:00Z"
+        assert windows[-1] == ("/flights/N593EH", {"start": "2024-02-20T00:00:00Z", "end": "2024-03-01T00:00:00Z"})
+    
+    def test_plan_snaps_to_whole_hours(self, client):
+        """Test that refreshes a few minutes apart plan identical requests."""
+        plans = []
+        for minutes in (5, 41):
+            now = self.NOW + timedelta(minutes=minutes, seconds=7)
+            client._now = lambda: now
+            plans.append(client._plan_windows("N593EH", now - timedelta(days=90), now))
+        
+        assert plans[0] == plans[1]
+        assert plans[0][0][1]["start"] == "2023-12-02T00:00:00Z"
+        assert plans[0][-1] == ("/flights/N593EH", {"start": "2024-02-20T01:00:00Z", "end": "2024-03-01T01:00:00Z"})
+    
+    def test_follows_next_links(self, client):
+        """Test that every page is fetched via links.next."""
+        day = self.NOW - timedelta(days=2)
+        with requests_mock.Mocker() as m:
+            m.get(f"{self.BASE}/flights/N593EH", json={
+                "flights": [raw_flight("P1", day + timedelta(hours=3))],
+                "links": {"next": "/flights/N593EH?cursor=page2"}
+            })
+            m.get(f"{self.BASE}/flights/N593EH?cursor=page2", json={
+                "flights": [raw_flight("P2", day + timedelta(hours=2))],
+                "links": {"next": "/flights/N593EH?cursor=page3"}
+            })
+            m.get(f"{self.BASE}/flights/N593EH?cursor=page3", json={
+                "flights": [raw_flight("P3", day + timedelta(hours=1))],
+                "links": None
+            })
+            
+            result = client.fetch_aircraft_history("N593EH", day, self.NOW)
+            
+            assert m.call_count == 3
+        # Returned oldest first
+        assert [f["fa_flight_id"] for f in result] == ["P3", "P2", "P1"]
+    
+    @pytest.mark.parametrize("stream_json", [True, False])
+    def test_streamed_and_buffered_pages_agree(self, client, stream_json):
+        """Test that both parsing modes return the same in-range flights."""
+        client.stream_json = stream_json
+        client.stream_chunk_size = 16
+        day = self.NOW - timedelta(days=2)
+        with requests_mock.Mocker() as m:
+            m.get(f"{self.BASE}/flights/N593EH", json={
+                "flights": [
+                    raw_flight("IN-2", day + timedelta(hours=2)),
+                    raw_flight("TOO-OLD", day - timedelta(days=1)),
+                    raw_flight("IN-1", day + timedelta(hours=1)),
+                ],
+                "links": {"next": "/flights/N593EH?cursor=page2"}
+            })
+            m.get(f"{self.BASE}/flights/N593EH?cursor=page2", json={
+                "links": None,
+                "flights": [raw_flight("IN-3", day + timedelta(hours=3))]
+            })
+        
+            result = client.fetch_aircraft_history("N593EH", day, self.NOW)
+        
+            assert m.call_count == 2
+        assert [f["fa_flight_id"] for f in result] == ["IN-1", "IN-2", "IN-3"]
+    
+    def test_streamed_page_filters_as_it_parses(self, client):
+        """Test that rejected flights are dropped while the page is still being read."""
+        day = self.NOW - timedelta(days=2)
+        with requests_mock.Mocker() as m:
+            m.get(f"{self.BASE}/flights/N593EH", json={
+                "flights": [raw_flight(f"F{i}", day + timedelta(minutes=i)) for i in range(50)]
+            })
+        
+            kept, seen = client._fetch_pages("/flights/N593EH", {}, keep=lambda f: f["fa_flight_id"] == "F7")
+        
+        assert seen == 50
+        assert [f["fa_flight_id"] for f in kept] == ["F7"]
+    
+    def test_truncated_stream_fails_fetch(self, client):
+        """Test that a cut-off body is reported as a fetch failure."""
+        from app.services.flightaware import FlightAwareError
+        
+        with requests_mock.Mocker() as m:
+            m.get(f"{self.BASE}/flights/N593EH", text='{"flights": [{"fa_flight_id": "X"')
+        
+            with pytest.raises(FlightAwareError):
+                client.fetch_aircraft_history("N593EH", self.NOW - timedelta(days=2), self.NOW, raise_errors=True)
+    
+    def test_max_pages_limit(self, client):
+        """Test that pagination stops at max_pages."""
+        client.max_pages = 2
+        day = self.NOW - timedelta(days=2)
+        with requests_mock.Mocker() as m:
+            m.get(f"{self.BASE}/flights/N593EH", json={
+                "flights": [raw_flight("LOOP", day)],
+                "links": {"next": "/flights/N593EH?cursor=again"}
+            })
+            
+            client.fetch_aircraft_history("N593EH", day, self.NOW)
+            
+            assert m.call_count == 2
+    
+    def test_merges_windows_in_order(self, client):
+        """Test that concurrently fetched windows merge in order without duplicates."""
+        def history(request, context):
+            start = datetime.strptime(request.qs["start"][0].upper(), "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+            # Each window also returns the previous window's last flight
+            return {"flights": [
+                raw_flight(f"H-{start:%m%d}", start + timedelta(hours=12)),
+                raw_flight(f"H-{start - timedelta(days=7):%m%d}", start - timedelta(days=7) + timedelta(hours=12)),
+            ]}
+        
+        with requests_mock.Mocker() as m:
+            m.get(f"{self.BASE}/history/flights/N593EH", json=history)
+            m.get(f"{self.BASE}/flights/N593EH", json={"flights": [raw_flight("RECENT", self.NOW - timedelta(days=1))]})
+            
+            result = client.fetch_aircraft_history("N593EH", datetime(2024, 1, 1, tzinfo=timezone.utc), self.NOW)
+        
+        ids = [f["fa_flight_id"] for f in result]
+        assert len(ids) == len(set(ids))
+        assert ids[0] == "H-0101"
+        assert ids[-1] == "RECENT"
+        assert len(ids) == 9
+    
+    def test_window_failure_fails_fetch(self, client):
+        """Test that one failing window fails the whole fetch."""
+        from app.services.flightaware import FlightAwareError
+        
+        client.max_retries = 0
+        with requests_mock.Mocker() as m:
+            m.get(f"{self.BASE}/history/flights/N593EH", status_code=500)
+            m.get(f"{self.BASE}/flights/N593EH", json={"flights": []})
+            
+            with pytest.raises(FlightAwareError):
+                client.fetch_aircraft_history(
+                    "N593EH", datetime(2024, 1, 1, tzinfo=timezone.utc), self.NOW, raise_errors=True
+                )
@@ -0,0 +1,98 @@
+"""
+Tests for the on-disk FlightAware response cache.
+"""
+import pytest
+import gzip
+import os
+import time
+
+
+@pytest.fixture
+def cache(tmp_path):
+    from app.services.flightaware_cache import FlightAwareCache
+
+    cache = FlightAwareCache(str(tmp_path), ttl_seconds=60)
+    cache._clock = lambda: 1000.0
+    return cache
+
+
+class TestFlightAwareCache:
+    """Test cases for FlightAwareCache."""
+
+    def test_round_trip(self, cache):
+        """Test that a stored response is returned for the same request."""
+        cache.put("/flights/N593EH", {"start": "a", "end": "b"}, "https://x/flights/N593EH", 200, b'{"flights":[]}')
+
+        entry = cache.get("/flights/N593EH", {"end": "b", "start": "a"})
+
+        assert entry.body == b'{"flights":[]}'
+        assert entry.status == 200
+        assert entry.fetched_at == 1000.0
+        assert cache.hits == 1
+
+    def test_keyed_by_endpoint_and_params(self, cache):
+        """Test that different requests do not share entries."""
+        cache.put("/flights/N593EH", {"start": "a"}, "u", 200, b"{}")
+
+        assert cache.get("/flights/N593EH", {"start": "b"}) is None
+        assert cache.get("/flights/N123AB", {"start": "a"}) is None
+        assert cache.misses == 2
+
+    def test_content_addressed_gzip_files(self, cache, tmp_path):
+        """Test the on-disk layout."""
+        cache.put("/flights/N593EH", None, "u", 200, b"{}")
+        key = cache.key("/flights/N593EH")
+
+        path = tmp_path / key[:2] / f"{key}.json.gz"
+        with gzip.open(path, "rt") as f:
+            assert '"endpoint":"/flights/N593EH"' in f.read()
+
+    def test_writer_streams_body_in_chunks(self, cache):
+        """Test that chunked writes, split inside multi-byte characters, store the same body."""
+        body = '{"flights":[{"origin":"Zürich \\"LSZH\\""}]}'.encode("utf-8")
+        writer = cache.writer("/flights/N593EH", None, "u", 200)
+        for i in range(0, len(body), 3):
+            writer.write(body[i:i + 3])
+
+        assert cache.get("/flights/N593EH") is None
+        writer.commit()
+        assert cache.get("/flights/N593EH").body == body
+        assert cache.writes == 1
+
+    def test_aborted_writer_stores_nothing(self, cache, tmp_path):
+        """Test that an abandoned entry leaves no files behind."""
+        writer = cache.writer("/flights/N593EH", None, "u", 200)
+        writer.write(b'{"flights":[')
+        writer.abort()
+
+        assert cache.get("/flights/N593EH") is None
+        assert [files for _, _, files in os.walk(tmp_path) if files] == []
+
+    def test_ttl(self, cache):
+        """Test that expired entries are ignored unless replaying."""
+        cache.put("/flights/N593EH", None, "u", 200, b"{}")
+        cache._clock = lambda: 1061.0
+
+        assert cache.get("/flights/N593EH") is None
+        assert cache.get("/flights/N593EH", ignore_ttl=True) is not None
+
+    def test_corrupt_entry_is_a_miss(self, cache):
+        """Test that unreadable files are treated as missing."""
+        path = cache.path(cache.key("/flights/N593EH"))
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"not gzip")
+
+        assert cache.get("/flights/N593EH") is None
+
+    def test_prune(self, cache):
+        """Test that prune removes only old files."""
+        cache.put("/old", None, "u", 200, b"{}")
+        cache.put("/new", None, "u", 200, b"{}")
+        old_path = cache.path(cache.key("/old"))
+        os.utime(old_path, (time.time() - 120, time.time() - 120))
+        cache._clock = time.time
+
+        assert cache.prune() == 1
+        assert not os.path.exists(old_path)
+        assert os.path.exists(cache.path(cache.key("/new")))
@@ -0,0 +1,105 @@
+"""
+Tests for the flight ingest service.
+"""
+from datetime import datetime, timezone, timedelta
+
+
+class TestStoreFlights:
+    """Test cases for store_flights."""
+
+    def test_inserts_new_flights(self, test_db, make_flight):
+        """Test that new flights are inserted and counted."""
+        from app.models import FlightRecord
+        from app.services.ingest import store_flights
+
+        result = store_flights(test_db, [make_flight("ING-001"), make_flight("ING-002")])
+        test_db.commit()
+
+        assert result.inserted == 2
+        assert result.skipped == 0
+        assert test_db.query(FlightRecord).count() == 2
+        saved = test_db.query(FlightRecord).filter_by(id="ING-001").one()
+        assert saved.flight_duration_minutes == 60
+        assert saved.departure_airport == "KSFO"
+
+    def test_skips_existing_flights(self, test_db, make_flight):
+        """Test that flights already in the database are skipped."""
+        from app.models import FlightRecord
+        from app.services.ingest import store_flights
+
+        test_db.add(make_flight("ING-001", duration=45))
+        test_db.commit()
+
+        result = store_flights(test_db, [make_flight("ING-001"), make_flight("ING-002")])
+        test_db.commit()
+
+        assert result.inserted == 1
+        assert result.skipped == 1
+        assert test_db.query(FlightRecord).count() == 2
+        # Existing row is left untouched
+        assert test_db.query(FlightRecord).filter_by(id="ING-001").one().flight_duration_minutes == 45
+
+    def test_flight_stored_concurrently_is_skipped(self, test_db, make_flight):
+        """Test that a flight another writer commits just before the insert is skipped, not an error."""
+        from sqlalchemy import event
+        from sqlalchemy.orm import Session
+        from app.models import DailyFlightRollup, FlightRecord
+        from app.services.ingest import store_flights
+
+        engine = test_db.get_bind()
+        raced = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def other_writer(conn, cursor, statement, *args):
+            if statement.startswith("INSERT INTO flights") and not raced:
+                raced.append(statement)
+                with Session(engine) as other:
+                    other.add(make_flight("ING-001", duration=45))
+                    other.commit()
+
+        result = store_flights(test_db, [make_flight("ING-001"), make_flight("ING-002")])
+        test_db.commit()
+
+        assert raced
+        assert (result.inserted, result.skipped) == (1, 1)
+        assert result.inserted_departures == {"N593EH": [make_flight("ING-002").departure_time_utc]}
+        assert test_db.query(FlightRecord).filter_by(id="ING-001").one().flight_duration_minutes == 45
+        assert sum(r.flight_count for r in test_db.query(DailyFlightRollup)) == 1
+
+    def test_skips_duplicates_within_batch(self, test_db, make_flight):
+        """Test that a flight repeated in the input is stored once."""
+        from app.models import FlightRecord
+        from app.services.ingest import store_flights
+
+        result = store_flights(test_db, [make_flight("ING-001"), make_flight("ING-001")])
+        test_db.commit()
+
+        assert result.inserted == 1
+        assert result.skipped == 1
+        assert test_db.query(FlightRecord).count() == 1
+
+    def test_chunked_ingest(self, test_db, make_flight):
+        """Test that inputs larger than one chunk are fully stored."""
+        from app.models import FlightRecord
+        from app.services.ingest import store_flights
+
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        test_db.add(make_flight("ING-0003", departure=start + timedelta(hours=3)))
+        test_db.commit()
+
+        flights = [make_flight(f"ING-{i:04d}", departure=start + timedelta(hours=i)) for i in range(25)]
+        result = store_flights(test_db, flights, chunk_size=7)
+        test_db.commit()
+
+        assert result.inserted == 24
+        assert result.skipped == 1
+        assert test_db.query(FlightRecord).count() == 25
+
+    def test_empty_input(self, test_db):
+        """Test that an empty input is a no-op."""
+        from app.services.ingest import store_flights
+
+        result = store_flights(test_db, [])
+
+        assert result.inserted == 0
+        assert result.skipped == 0
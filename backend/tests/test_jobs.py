@@ -0,0 +1,168 @@
+"""
+Tests for background refresh jobs.
+"""
+import pytest
+import json
+import threading
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch, MagicMock
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture
+def session_factory(test_db):
+    """Sessions on the test database for worker threads."""
+    return sessionmaker(bind=test_db.get_bind())
+
+
+@pytest.fixture
+def runner(session_factory):
+    from app.services.jobs import RefreshJobRunner
+
+    runner = RefreshJobRunner(session_factory, max_workers=1, max_pending=2)
+    yield runner
+    runner.shutdown()
+
+
+class TestRefreshJobRunner:
+    """Test cases for RefreshJobRunner."""
+
+    def test_successful_job(self, runner, test_db, make_flight, fake_flightaware_client):
+        """Test that a job stores flights and records its counts and timings."""
+        from app.models import FlightRecord, RefreshJob
+
+        departure = datetime.now(timezone.utc) - timedelta(hours=2)
+        job = runner.submit(fake_flightaware_client([make_flight("JOB-001", departure)]), "N593EH")
+        assert job["status"] == "queued"
+
+        runner.wait(job["id"], timeout=5)
+
+        record = test_db.get(RefreshJob, job["id"]).to_dict()
+        assert record["status"] == "succeeded"
+        assert record["flights_fetched"] == 1
+        assert record["flights_added"] == 1
+        assert record["flights_skipped"] == 0
+        assert record["full"] is True
+        assert record["run_seconds"] >= 0
+        assert record["window"]["start"] is not None
+        assert test_db.query(FlightRecord).count() == 1
+
+    def test_failed_job(self, runner, test_db):
+        """Test that an upstream error is recorded on the job."""
+        from app.models import RefreshJob
+        from app.services.flightaware import FlightAwareError
+
+        client = MagicMock()
+        client.fetch_aircraft_history.side_effect = FlightAwareError("HTTP 503")
+
+        job = runner.submit(client, "N593EH")
+        runner.wait(job["id"], timeout=5)
+
+        record = test_db.get(RefreshJob, job["id"])
+        assert record.status == "failed"
+        assert record.error == "HTTP 503"
+        assert record.finished_at is not None
+
+    def test_invalidates_response_cache(self, session_factory, make_flight, fake_flightaware_client):
+        """Test that a job drops cached responses covering its new flights."""
+        from app.services.jobs import RefreshJobRunner
+
+        cache = MagicMock()
+        runner = RefreshJobRunner(session_factory, response_cache=cache, max_workers=1)
+        departure = datetime.now(timezone.utc) - timedelta(hours=2)
+        job = runner.submit(fake_flightaware_client([make_flight("JOB-001", departure)]), "N593EH")
+        runner.wait(job["id"], timeout=5)
+        runner.shutdown()
+
+        departures, version = cache.invalidate_flights.call_args[0]
+        assert list(departures) == ["N593EH"]
+        assert version == 1
+
+    def test_rejects_when_queue_full(self, runner, fake_flightaware_client):
+        """Test that submissions beyond max_pending are refused."""
+        from app.services.jobs import JobQueueFull
+
+        release = threading.Event()
+        client = fake_flightaware_client([])
+        client.fetch_aircraft_history.side_effect = lambda *args, **kwargs: release.wait(5) and []
+
+        first = runner.submit(client, "N593EH")
+        second = runner.submit(client, "N593EH")
+        with pytest.raises(JobQueueFull):
+            runner.submit(client, "N593EH")
+
+        release.set()
+        runner.wait(first["id"], timeout=5)
+        runner.wait(second["id"], timeout=5)
+        # Finished jobs free their slots
+        runner.wait(runner.submit(client, "N593EH")["id"], timeout=5)
+
+    def test_recover_interrupted_jobs(self, test_db):
+        """Test that jobs left active by a previous process are failed."""
+        from app.models import RefreshJob
+        from app.services.jobs import recover_interrupted_jobs
+
+        now = datetime.now(timezone.utc)
+        test_db.add_all([
+            RefreshJob(id="a", tail_number="N593EH", full=False, status="queued", created_at=now),
+            RefreshJob(id="b", tail_number="N593EH", full=False, status="running", created_at=now),
+            RefreshJob(id="c", tail_number="N593EH", full=False, status="succeeded", created_at=now),
+        ])
+        test_db.commit()
+
+        assert recover_interrupted_jobs(test_db) == 2
+        assert [j.status for j in test_db.query(RefreshJob).order_by(RefreshJob.id)] == ["failed", "failed", "succeeded"]
+
+
+class TestRefreshJobEndpoints:
+    """Test cases for async refresh_data and /api/refresh_jobs."""
+
+    @pytest.fixture
+    def jobs(self, app, test_db, session_factory):
+        app.extensions['refresh_jobs'].session_factory = session_factory
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            yield app.extensions['refresh_jobs']
+
+    def test_async_refresh_returns_job(self, client, jobs, make_flight, fake_flightaware_client):
+        """Test that async refresh answers 202 and the job can be polled."""
+        departure = datetime.now(timezone.utc) - timedelta(hours=2)
+        with patch('app.api.FlightAwareClient') as mock_client_class:
+            mock_client_class.return_value = fake_flightaware_client([make_flight("JOB-001", departure)])
+            response = client.post('/api/refresh_data?async=true')
+
+        assert response.status_code == 202
+        job = json.loads(response.data)["job"]
+        assert response.headers['Location'].endswith(f"/api/refresh_jobs/{job['id']}")
+
+        jobs.wait(job["id"], timeout=5)
+        status = json.loads(client.get(f"/api/refresh_jobs/{job['id']}").data)
+        assert status["status"] == "succeeded"
+        assert status["flights_added"] == 1
+
+    def test_prefer_header(self, client, jobs, fake_flightaware_client):
+        """Test that Prefer: respond-async also queues a job."""
+        with patch('app.api.FlightAwareClient') as mock_client_class:
+            mock_client_class.return_value = fake_flightaware_client([])
+            response = client.post('/api/refresh_data', headers={'Prefer': 'respond-async'})
+
+        assert response.status_code == 202
+        assert response.headers['Preference-Applied'] == 'respond-async'
+        jobs.wait(json.loads(response.data)["job"]["id"], timeout=5)
+
+    def test_queue_full(self, client, jobs):
+        """Test that a full job queue answers 503."""
+        from app.services.jobs import JobQueueFull
+
+        with patch('app.api.FlightAwareClient'), \
+             patch.object(jobs, 'submit', side_effect=JobQueueFull("16 refresh jobs already pending")):
+            response = client.post('/api/refresh_data?async=true')
+
+        assert response.status_code == 503
+        assert 'Retry-After' in response.headers
+
+    def test_unknown_job(self, client, jobs):
+        """Test 404 for an unknown job ID."""
+        response = client.get('/api/refresh_jobs/missing')
+
+        assert response.status_code == 404
@@ -0,0 +1,85 @@
+"""
+Tests for incremental JSON parsing.
+"""
+import pytest
+import json
+
+
+def chunked(text, size):
+    """Split a document into byte chunks of at most size bytes."""
+    data = text.encode("utf-8")
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestStreamingObjectParser:
+    """Test cases for StreamingObjectParser."""
+
+    DOCUMENT = {
+        "num_pages": 1,
+        "flights": [
+            {"fa_flight_id": "A", "ident": "N1", "altitude": 12345, "route": "Zürich – Genève"},
+            {"fa_flight_id": "B", "ident": "N2", "progress_percent": 100, "cancelled": False},
+            {"fa_flight_id": "C", "ident": "N3", "waypoints": [1.5, -2.25, 3e-2]},
+        ],
+        "links": {"next": "/flights/N1?cursor=abc"},
+    }
+
+    @pytest.mark.parametrize("size", [1, 2, 7, 64, 1 << 16])
+    def test_matches_json_loads(self, size):
+        """Test that any chunking yields the same flights and fields as json.loads."""
+        from app.services.json_stream import StreamingObjectParser
+
+        text = json.dumps(self.DOCUMENT, ensure_ascii=False, indent=1)
+        parser = StreamingObjectParser(chunked(text, size), "flights")
+
+        assert list(parser) == self.DOCUMENT["flights"]
+        assert parser.fields == {"num_pages": 1, "links": self.DOCUMENT["links"]}
+
+    def test_yields_before_body_is_complete(self):
+        """Test that elements are produced as soon as they arrive."""
+        from app.services.json_stream import StreamingObjectParser
+
+        read = []
+
+        def chunks():
+            for chunk in ('{"flights": [{"id": 1},', ' {"id": 2}', ']}'):
+                read.append(chunk)
+                yield chunk
+
+        flights = iter(StreamingObjectParser(chunks(), "flights"))
+
+        assert next(flights) == {"id": 1}
+        assert len(read) == 1
+        assert next(flights) == {"id": 2}
+
+    def test_number_split_across_chunks(self):
+        """Test that a number cut by a chunk boundary is not decoded early."""
+        from app.services.json_stream import StreamingObjectParser
+
+        parser = StreamingObjectParser([b'{"flights": [12', b'34, 5], "num_pages": 1', b'0}'], "flights")
+
+        assert list(parser) == [1234, 5]
+        assert parser.fields == {"num_pages": 10}
+
+    def test_empty_and_missing_array(self):
+        """Test documents with an empty or absent array."""
+        from app.services.json_stream import StreamingObjectParser
+
+        assert list(StreamingObjectParser([b'{"flights": []}'], "flights")) == []
+        parser = StreamingObjectParser([b'{"links": null}'], "flights")
+        assert list(parser) == []
+        assert parser.fields == {"links": None}
+        assert list(StreamingObjectParser([b" { } "], "flights")) == []
+
+    @pytest.mark.parametrize("body", [
+        b'{"flights": [{"id": 1}, {"id": 2',
+        b'{"flights": [{"id": 1} {"id": 2}]}',
+        b'["flights"]',
+        b'',
+    ])
+    def test_malformed_documents_raise(self, body):
+        """Test that truncated or invalid documents raise JSONStreamError."""
+        from app.services.json_stream import JSONStreamError, StreamingObjectParser
+
+        with pytest.raises(JSONStreamError):
+            list(StreamingObjectParser([body], "flights"))
@@ -0,0 +1,131 @@
+"""
+Tests for request, SQL and FlightAware metrics.
+"""
+import logging
+from datetime import datetime, timezone, timedelta
+import requests_mock
+
+
+class TestMetricTypes:
+    """Test cases for Histogram and Counter exposition."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that bucket counts accumulate and +Inf equals the count."""
+        from app.services.metrics import Histogram
+
+        histogram = Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5.0):
+            histogram.observe(value, endpoint="/api/x")
+
+        lines = histogram.render()
+
+        assert 'test_seconds_bucket{endpoint="/api/x",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{endpoint="/api/x",le="1.0"} 3' in lines
+        assert 'test_seconds_bucket{endpoint="/api/x",le="+Inf"} 4' in lines
+        assert 'test_seconds_count{endpoint="/api/x"} 4' in lines
+        assert 'test_seconds_sum{endpoint="/api/x"} 6.250000' in lines
+
+    def test_counter_escapes_label_values(self):
+        """Test that quotes and backslashes in labels are escaped."""
+        from app.services.metrics import Counter
+
+        counter = Counter("test_total", "Test.")
+        counter.inc(endpoint='a"b\\c')
+        counter.inc(2, endpoint='a"b\\c')
+
+        assert counter.render()[-1] == 'test_total{endpoint="a\\"b\\\\c"} 3'
+
+
+class TestRequestMetrics:
+    """Test cases for the request hooks and /api/metrics."""
+
+    def test_requests_and_queries_recorded(self, client):
+        """Test that a request is counted with its SQL statements."""
+        from app.services.metrics import metrics
+
+        before = metrics.requests.value(endpoint="/api/aircraft", method="GET", status="200")
+        queries_before = metrics.db_queries.value(endpoint="/api/aircraft")
+
+        assert client.get('/api/aircraft').status_code == 200
+
+        assert metrics.requests.value(endpoint="/api/aircraft", method="GET", status="200") == before + 1
+        assert metrics.db_queries.value(endpoint="/api/aircraft") >= queries_before + 1
+
+    def test_url_rule_used_as_endpoint(self, client):
+        """Test that path parameters do not create separate series."""
+        from app.services.metrics import metrics
+
+        before = metrics.requests.value(endpoint="/api/refresh_jobs/<job_id>", method="GET", status="404")
+
+        client.get('/api/refresh_jobs/abc')
+        client.get('/api/refresh_jobs/def')
+
+        assert metrics.requests.value(endpoint="/api/refresh_jobs/<job_id>", method="GET", status="404") == before + 2
+
+    def test_metrics_endpoint_exposition(self, client):
+        """Test that /api/metrics serves Prometheus text with every metric family."""
+        client.get('/api/aircraft')
+
+        response = client.get('/api/metrics')
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        body = response.get_data(as_text=True)
+        for family in ("airlogger_requests_total", "airlogger_request_duration_seconds",
+                       "airlogger_db_queries_total", "airlogger_db_queries_per_request",
+                       "airlogger_response_cache_entries", "airlogger_refreshes_in_flight"):
+            assert f"# TYPE {family} " in body
+        assert 'airlogger_request_duration_seconds_count{endpoint="/api/aircraft",method="GET"}' in body
+
+    def test_slow_request_logged_with_top_queries(self, monkeypatch, caplog):
+        """Test that requests over SLOW_REQUEST_SECONDS log their queries."""
+        from app import create_app
+
+        monkeypatch.setenv("SLOW_REQUEST_SECONDS", "0.000001")
+        client = create_app(testing=True).test_client()
+
+        with caplog.at_level(logging.WARNING, logger="app.services.metrics"):
+            client.get('/api/aircraft')
+
+        messages = [r.getMessage() for r in caplog.records if "Slow request" in r.getMessage()]
+        assert len(messages) == 1
+        assert "GET /api/aircraft" in messages[0]
+        assert "top queries:" in messages[0]
+        assert "FROM aircraft" in messages[0]
+
+    def test_metrics_can_be_disabled(self, monkeypatch):
+        """Test that METRICS_ENABLED=false installs no hooks."""
+        from app import create_app
+        from app.services.metrics import metrics
+
+        monkeypatch.setenv("METRICS_ENABLED", "false")
+        client = create_app(testing=True).test_client()
+        before = metrics.requests.value(endpoint="/api/aircraft", method="GET", status="200")
+
+        client.get('/api/aircraft')
+
+        assert metrics.requests.value(endpoint="/api/aircraft", method="GET", status="200") == before
+
+
+class TestFlightAwareMetrics:
+    """Test cases for AeroAPI call metrics."""
+
+    def test_calls_recorded_by_endpoint_template(self, monkeypatch):
+        """Test that each AeroAPI call is observed under its endpoint template."""
+        from app.services.flightaware import FlightAwareClient
+        from app.services.metrics import metrics
+
+        monkeypatch.setenv("FLIGHTAWARE_API_KEY", "test_api_key_123")
+        client = FlightAwareClient(max_retries=1)
+        now = datetime.now(timezone.utc)
+        retries_before = metrics.flightaware_retries.value(endpoint="/flights/{ident}")
+
+        with requests_mock.Mocker() as m:
+            m.get("https://aeroapi.flightaware.com/aeroapi/flights/N593EH",
+                  [{"status_code": 503}, {"json": {"flights": []}}])
+            client.fetch_aircraft_history("N593EH", now - timedelta(days=1), now)
+
+        assert metrics.flightaware_retries.value(endpoint="/flights/{ident}") == retries_before + 1
+        assert any(line.startswith('airlogger_flightaware_request_duration_seconds_count'
+                                   '{endpoint="/flights/{ident}",status="200"}')
+                   for line in metrics.flightaware_duration.render())
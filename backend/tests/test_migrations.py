@@ -0,0 +1,214 @@
+"""
+Tests for schema migrations and the flight query index.
+"""
+import pytest
+from datetime import datetime, timezone, timedelta
+from sqlalchemy import create_engine, event, inspect, text
+
+# flights and its indexes as created before migration 1
+LEGACY_FLIGHTS_DDL = (
+    "CREATE TABLE flights (id VARCHAR NOT NULL PRIMARY KEY, tail_number VARCHAR NOT NULL, "
+    "departure_airport VARCHAR NOT NULL, arrival_airport VARCHAR NOT NULL, "
+    "departure_time_utc DATETIME NOT NULL, arrival_time_utc DATETIME NOT NULL, "
+    "flight_duration_minutes INTEGER NOT NULL, created_at DATETIME DEFAULT (CURRENT_TIMESTAMP))",
+    "CREATE INDEX ix_flights_tail_number ON flights (tail_number)",
+    "CREATE INDEX ix_flights_departure_time_utc ON flights (departure_time_utc)",
+)
+
+
+def flight_indexes(engine):
+    return {index["name"]: index["column_names"] for index in inspect(engine).get_indexes("flights")}
+
+
+class TestRunMigrations:
+    """Test cases for run_migrations."""
+
+    def test_fresh_database(self, tmp_path):
+        """Test that a new database records every migration and has the composite index."""
+        from app.migrations import MIGRATIONS, applied_versions, run_migrations
+        from app.models import Base
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'airlogger.db'}")
+        Base.metadata.create_all(engine)
+
+        assert run_migrations(engine) == [m.version for m in MIGRATIONS]
+        assert run_migrations(engine) == []
+        with engine.connect() as connection:
+            assert applied_versions(connection) == [m.version for m in MIGRATIONS]
+        indexes = flight_indexes(engine)
+        assert indexes["ix_flights_tail_departure"] == [
+            "tail_number", "departure_time_utc", "id", "flight_duration_minutes"
+        ]
+        assert "ix_flights_tail_number" not in indexes
+        engine.dispose()
+
+    def test_upgrades_existing_database(self, tmp_path):
+        """Test that a database created before the index gains it without losing rows."""
+        from app.migrations import run_migrations
+        from app.models import Base
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'airlogger.db'}")
+        with engine.begin() as connection:
+            for statement in LEGACY_FLIGHTS_DDL:
+                connection.exec_driver_sql(statement)
+            connection.exec_driver_sql(
+                "INSERT INTO flights VALUES ('OLD-1', 'N593EH', 'KSFO', 'KLAX', "
+                "'2024-01-15 14:30:00', '2024-01-15 15:45:00', 75, '2024-01-15 16:00:00')"
+            )
+        Base.metadata.create_all(engine)
+        assert "ix_flights_tail_departure" not in flight_indexes(engine)
+
+        assert run_migrations(engine) == [1]
+
+        indexes = flight_indexes(engine)
+        assert "ix_flights_tail_departure" in indexes
+        assert "ix_flights_tail_number" not in indexes
+        assert "ix_flights_departure_time_utc" in indexes
+        with engine.connect() as connection:
+            assert connection.execute(text("SELECT id FROM flights")).scalars().all() == ["OLD-1"]
+        engine.dispose()
+
+    def test_failed_migration_is_not_recorded(self, tmp_path):
+        """Test that a failing migration rolls back and is retried next time."""
+        from app.migrations import Migration, run_migrations
+        from app.models import Base
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'airlogger.db'}")
+        Base.metadata.create_all(engine)
+        broken = Migration(99, "broken", ("CREATE TABLE scratch (x INTEGER)", "NOT SQL"))
+
+        with pytest.raises(Exception):
+            run_migrations(engine, [broken])
+
+        assert "scratch" not in inspect(engine).get_table_names()
+        fixed = Migration(99, "fixed", ("CREATE TABLE IF NOT EXISTS scratch (x INTEGER)",))
+        assert run_migrations(engine, [fixed]) == [99]
+        engine.dispose()
+
+
+class TestQueryPlans:
+    """Test that endpoint queries search indexes instead of scanning tables."""
+
+    @pytest.fixture
+    def app_with_flights(self, tmp_path, monkeypatch):
+        """App on a file database with flights, capturing every SELECT it runs."""
+        from app import create_app
+        from app.models import FlightRecord
+        from app.services.ingest import store_flights
+        import app as airlogger
+
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'airlogger.db'}")
+        app = create_app()
+        engines = app.extensions['db_engines']
+
+        session = airlogger.Session()
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        store_flights(session, [
+            FlightRecord(
+                id=f"{tail}-{i}",
+                tail_number=tail,
+                departure_airport="KSFO",
+                arrival_airport="KLAX",
+                departure_time_utc=start + timedelta(hours=5 * i),
+                arrival_time_utc=start + timedelta(hours=5 * i, minutes=75),
+                flight_duration_minutes=75
+            )
+            for tail in ("N593EH", "N12345") for i in range(50)
+        ])
+        session.commit()
+        session.close()
+
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(engines.reader, "before_cursor_execute", capture)
+        yield app, engines, statements
+        event.remove(engines.reader, "before_cursor_execute", capture)
+        app.extensions['refresh_jobs'].shutdown()
+        engines.dispose()
+
+    def plans(self, engine, statements, table):
+        """EXPLAIN QUERY PLAN details for each captured statement reading table."""
+        plans = []
+        with engine.connect() as connection:
+            for statement, parameters in statements:
+                if f"FROM {table}" not in statement:
+                    continue
+                rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+                plans.append([row[-1] for row in rows])
+        return plans
+
+    @pytest.mark.parametrize("query", [
+        "",
+        "&limit=10",
+        "&stream=ndjson",
+    ])
+    def test_flights_endpoint_uses_composite_index(self, app_with_flights, query):
+        """Test that /api/flights searches ix_flights_tail_departure without sorting."""
+        app, engines, statements = app_with_flights
+        client = app.test_client()
+
+        response = client.get(f'/api/flights?start_date=2024-01-02&end_date=2024-01-05{query}')
+        assert response.status_code == 200
+        if query == "&limit=10":
+            cursor = response.get_json()["next_cursor"]
+            assert client.get(f'/api/flights?start_date=2024-01-02&end_date=2024-01-05'
+                              f'&limit=10&cursor={cursor}').status_code == 200
+
+        plans = self.plans(engines.reader, statements, "flights")
+        assert plans
+        for plan in plans:
+            assert any("USING INDEX ix_flights_tail_departure" in step for step in plan), plan
+            assert not any("TEMP B-TREE" in step for step in plan), plan
+
+    def test_summary_endpoint_searches_rollups(self, app_with_flights):
+        """Test that /api/summary without the summary index searches rollups by primary key."""
+        app, engines, statements = app_with_flights
+        app.extensions['summary_index'] = None
+
+        response = app.test_client().get('/api/summary?start_date=2024-01-02&end_date=2024-01-05')
+        assert response.status_code == 200
+        assert response.get_json()["totalFlightMinutes"] > 0
+
+        plans = self.plans(engines.reader, statements, "daily_flight_rollups")
+        assert plans
+        for plan in plans:
+            assert all(step.startswith("SEARCH daily_flight_rollups") for step in plan), plan
+
+    def test_summary_index_load_searches_rollups_in_order(self, app_with_flights):
+        """Test that loading a tail into the summary index reads rollups by primary key without sorting."""
+        app, engines, statements = app_with_flights
+
+        response = app.test_client().get('/api/summary?start_date=2024-01-02&end_date=2024-01-05')
+        assert response.status_code == 200
+        assert response.get_json()["totalFlightMinutes"] > 0
+
+        plans = self.plans(engines.reader, statements, "daily_flight_rollups")
+        assert plans == [[
+            "SEARCH daily_flight_rollups USING INDEX sqlite_autoindex_daily_flight_rollups_1 (tail_number=?)"
+        ]]
+
+    def test_rollup_rebuild_reads_only_the_index(self, app_with_flights):
+        """Test that rebuilding rollups scans the composite index instead of the table."""
+        from app.services.rollups import rebuild_rollups
+        import app as airlogger
+
+        app, engines, statements = app_with_flights
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(engines.writer, "before_cursor_execute", capture)
+        session = airlogger.Session()
+        assert rebuild_rollups(session) > 0
+        session.commit()
+        session.close()
+        event.remove(engines.writer, "before_cursor_execute", capture)
+
+        plans = self.plans(engines.reader, statements, "flights")
+        assert plans
+        for plan in plans:
+            assert "SCAN flights USING COVERING INDEX ix_flights_tail_departure" in plan, plan
@@ -34,6 +34,29 @@ class TestFlightRecord:
         assert saved_flight.arrival_airport == "KLAX"
         assert saved_flight.flight_duration_minutes == 75
     
+    def test_build_flight_record(self, test_db):
+        """Test that FlightRecord.build creates an insertable record."""
+        from app.models import FlightRecord
+        
+        flight = FlightRecord.build(
+            id="BUILD-123",
+            tail_number="N593EH",
+            departure_airport="KSFO",
+            arrival_airport="KLAX",
+            departure_time_utc=datetime(2024, 1, 15, 14, 30, tzinfo=timezone.utc),
+            arrival_time_utc=datetime(2024, 1, 15, 15, 45, tzinfo=timezone.utc),
+            flight_duration_minutes=75
+        )
+        assert flight.tail_number == "N593EH"
+        
+        test_db.add(flight)
+        test_db.commit()
+        test_db.expunge_all()
+        
+        saved_flight = test_db.get(FlightRecord, "BUILD-123")
+        assert saved_flight.arrival_airport == "KLAX"
+        assert saved_flight.flight_duration_minutes == 75
+    
     def test_flight_record_to_dict(self, test_db):
         """Test converting FlightRecord to dictionary."""
         from app.models import FlightRecord
@@ -146,4 +169,25 @@ class TestFinancialSettings:
         # Second call should return the same settings
         settings2 = FinancialSettings.get_or_create_default(test_db)
         assert settings2.id == settings1.id
-        assert test_db.query(FinancialSettings).count() == 1
\ No newline at end of file
+        assert test_db.query(FinancialSettings).count() == 1
+
+
+class TestDataVersion:
+    """Test cases for DataVersion model."""
+    
+    def test_current_defaults_to_zero(self, test_db):
+        """Test that an unknown counter reads as version 0."""
+        from app.models import DataVersion
+        
+        assert DataVersion.current(test_db, "flights") == 0
+    
+    def test_bump_increments(self, test_db):
+        """Test that bump creates and then increments a counter."""
+        from app.models import DataVersion
+        
+        assert DataVersion.bump(test_db, "flights") == 1
+        assert DataVersion.bump(test_db, "flights") == 2
+        test_db.commit()
+        
+        assert DataVersion.current(test_db, "flights") == 2
+        assert DataVersion.current(test_db, "financial_settings") == 0
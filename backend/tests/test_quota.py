@@ -0,0 +1,209 @@
+"""
+Tests for AeroAPI rate limiting and usage accounting.
+"""
+import pytest
+import json
+import time
+from datetime import date, datetime, timezone
+from unittest.mock import patch
+import requests_mock
+
+
+@pytest.fixture(autouse=True)
+def fresh_usage():
+    """Discard calls counted by other tests."""
+    from app.services.quota import api_usage
+
+    api_usage.drain()
+    yield
+    api_usage.drain()
+
+
+class FakeTime:
+    """Monotonic clock that only advances when slept on."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket:
+    """Test cases for TokenBucket."""
+
+    def test_burst_then_paced(self):
+        """Test that calls beyond the burst wait for refills."""
+        from app.services.quota import TokenBucket
+
+        fake = FakeTime()
+        bucket = TokenBucket(rate=2.0, capacity=3)
+        bucket._clock, bucket._sleep, bucket._updated = fake.clock, fake.sleep, 0.0
+
+        waits = [bucket.acquire() for _ in range(5)]
+
+        assert waits[:3] == [0, 0, 0]
+        assert waits[3:] == [pytest.approx(0.5), pytest.approx(0.5)]
+        assert fake.now == pytest.approx(1.0)
+        assert bucket.waited_seconds == pytest.approx(1.0)
+
+    def test_restore_credits_elapsed_time(self):
+        """Test that a restored level refills for the time the process was down."""
+        from app.services.quota import TokenBucket
+
+        bucket = TokenBucket(rate=1.0, capacity=10)
+        bucket.restore(tokens=0.0, saved_at=time.time() - 4)
+        assert 4 <= bucket.snapshot()[0] < 5
+
+        bucket.restore(tokens=0.0, saved_at=time.time() - 3600)
+        assert bucket.snapshot()[0] == 10
+
+    def test_shared_limiter_configuration(self, monkeypatch):
+        """Test that clients share one bucket and 0 disables limiting."""
+        from app.services.quota import get_rate_limiter
+
+        assert get_rate_limiter() is None
+
+        monkeypatch.setenv("FLIGHTAWARE_RATE_PER_MINUTE", "30")
+        monkeypatch.setenv("FLIGHTAWARE_RATE_BURST", "5")
+        limiter = get_rate_limiter()
+        assert limiter is get_rate_limiter()
+        assert limiter.rate == 0.5
+        assert limiter.capacity == 5
+
+
+class TestUsageAccounting:
+    """Test cases for AeroAPI usage counters."""
+
+    def test_endpoint_template(self):
+        """Test that tail numbers and query strings are stripped."""
+        from app.services.quota import endpoint_template
+
+        assert endpoint_template("/flights/N593EH") == "/flights/{ident}"
+        assert endpoint_template("/history/flights/N593EH?cursor=abc") == "/history/flights/{ident}"
+        assert endpoint_template("https://aeroapi.flightaware.com/aeroapi/flights/N1") == "/flights/{ident}"
+
+    def test_flush_accumulates_per_day_and_endpoint(self, test_db):
+        """Test that flushed counts are added to existing rows with cost estimates."""
+        from app.models import ApiUsage
+        from app.services.quota import api_usage, flush_api_usage
+
+        when = datetime(2024, 1, 15, 12, tzinfo=timezone.utc)
+        api_usage.record("/flights/N593EH", status=503, when=when)
+        api_usage.record("/flights/N593EH", status=200, when=when)
+        api_usage.record("/history/flights/N593EH", status=200, when=when)
+        api_usage.record("/flights/N593EH", cached=True, when=when)
+        assert flush_api_usage(test_db) == 2
+
+        api_usage.record("/flights/N593EH", status=200, when=when)
+        flush_api_usage(test_db)
+        test_db.commit()
+
+        recent = test_db.get(ApiUsage, (date(2024, 1, 15), "/flights/{ident}"))
+        assert (recent.calls, recent.billable_calls, recent.cache_hits) == (3, 2, 1)
+        assert recent.cost == pytest.approx(0.01)
+        history = test_db.get(ApiUsage, (date(2024, 1, 15), "/history/flights/{ident}"))
+        assert history.cost == pytest.approx(0.01)
+        assert api_usage.pending() == 0
+
+    def test_cost_override(self, test_db, monkeypatch):
+        """Test FLIGHTAWARE_ENDPOINT_COSTS."""
+        from app.models import ApiUsage
+        from app.services.quota import api_usage, flush_api_usage
+
+        monkeypatch.setenv("FLIGHTAWARE_ENDPOINT_COSTS", json.dumps({"/flights/{ident}": 0.1}))
+        api_usage.record("/flights/N593EH", status=200, when=datetime(2024, 1, 15, tzinfo=timezone.utc))
+        flush_api_usage(test_db)
+
+        assert test_db.get(ApiUsage, (date(2024, 1, 15), "/flights/{ident}")).cost == pytest.approx(0.1)
+
+    def test_client_counts_attempts(self, monkeypatch):
+        """Test that retries are counted as calls but only successes as billable."""
+        from app.services.flightaware import FlightAwareClient
+        from app.services.quota import api_usage
+
+        monkeypatch.setenv("FLIGHTAWARE_API_KEY", "test_api_key_123")
+        client = FlightAwareClient()
+        with requests_mock.Mocker() as m:
+            m.get("https://aeroapi.flightaware.com/aeroapi/flights/N593EH",
+                  [{"status_code": 503, "json": {}}, {"status_code": 200, "json": {"flights": []}}])
+            client._get("https://aeroapi.flightaware.com/aeroapi/flights/N593EH")
+
+        counts = list(api_usage.drain().values())
+        assert counts == [[2, 1, 0]]
+
+    def test_client_waits_for_rate_limit(self, monkeypatch):
+        """Test that the client takes a token before every request."""
+        from app.services.flightaware import FlightAwareClient
+
+        monkeypatch.setenv("FLIGHTAWARE_API_KEY", "test_api_key_123")
+        monkeypatch.setenv("FLIGHTAWARE_RATE_PER_MINUTE", "60")
+        monkeypatch.setenv("FLIGHTAWARE_RATE_BURST", "1")
+        client = FlightAwareClient()
+        fake = FakeTime()
+        client.rate_limiter._clock, client.rate_limiter._sleep = fake.clock, fake.sleep
+        client.rate_limiter._updated = 0.0
+
+        with requests_mock.Mocker() as m:
+            m.get("https://aeroapi.flightaware.com/aeroapi/flights/N593EH", json={"flights": []})
+            for _ in range(3):
+                client._get("https://aeroapi.flightaware.com/aeroapi/flights/N593EH")
+
+        assert fake.sleeps == [pytest.approx(1.0), pytest.approx(1.0)]
+
+
+class TestUsageEndpoint:
+    """Test cases for /api/usage and rate limiter persistence."""
+
+    def test_usage_report(self, client, test_db):
+        """Test the per-day usage report, adding unflushed calls without writing them."""
+        from app.models import ApiUsage
+        from app.services.quota import api_usage, flush_api_usage
+
+        api_usage.record("/flights/N593EH", status=200, when=datetime(2024, 1, 14, tzinfo=timezone.utc))
+        api_usage.record("/history/flights/N593EH", status=200, when=datetime(2024, 1, 15, tzinfo=timezone.utc))
+        flush_api_usage(test_db)
+        test_db.commit()
+        api_usage.record("/history/flights/N593EH", status=429, when=datetime(2024, 1, 15, tzinfo=timezone.utc))
+        api_usage.record("/flights/N593EH", status=200, when=datetime(2024, 2, 1, tzinfo=timezone.utc))
+
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            response = client.get('/api/usage?start_date=2024-01-01&end_date=2024-01-31')
+
+        mock_get_session.assert_called_once_with(readonly=True)
+        assert api_usage.pending() == 2
+        assert test_db.get(ApiUsage, (date(2024, 1, 15), "/history/flights/{ident}")).calls == 1
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [d["date"] for d in data["days"]] == ["2024-01-14", "2024-01-15"]
+        assert data["days"][1]["calls"] == 2
+        assert data["days"][1]["endpoints"]["/history/flights/{ident}"]["billable_calls"] == 1
+        assert data["total_calls"] == 3
+        assert data["total_cost"] == pytest.approx(0.015)
+        assert data["rate_limit"] is None
+
+    def test_invalid_dates(self, client):
+        """Test 400 for malformed dates."""
+        assert client.get('/api/usage?start_date=yesterday').status_code == 400
+
+    def test_limiter_level_survives_restart(self, test_db, monkeypatch):
+        """Test that the saved bucket level is restored on startup."""
+        from app.services.quota import flush_api_usage, get_rate_limiter, restore_rate_limiter
+
+        monkeypatch.setenv("FLIGHTAWARE_RATE_PER_MINUTE", "1")
+        monkeypatch.setenv("FLIGHTAWARE_RATE_BURST", "10")
+        limiter = get_rate_limiter()
+        limiter.tokens = 0.0
+        flush_api_usage(test_db)
+        test_db.commit()
+
+        limiter.tokens = limiter.capacity
+        restore_rate_limiter(test_db)
+
+        assert limiter.snapshot()[0] < 1
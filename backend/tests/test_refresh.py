@@ -0,0 +1,262 @@
+"""
+Tests for the FlightAware refresh pipeline.
+"""
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from unittest.mock import MagicMock
+from sqlalchemy.orm import sessionmaker
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class TestPlanRefreshWindow:
+    """Test cases for plan_refresh_window."""
+
+    def test_first_refresh_is_full(self, test_db):
+        """Test that a tail with no sync state gets the full window."""
+        from app.services.refresh import plan_refresh_window
+
+        start, end, full = plan_refresh_window(test_db, "N593EH", NOW)
+
+        assert full is True
+        assert start == NOW - timedelta(days=90)
+        assert end == NOW
+
+    def test_incremental_from_high_water_mark(self, test_db, monkeypatch):
+        """Test that later refreshes start an overlap before the mark."""
+        from app.models import SyncState
+        from app.services.refresh import plan_refresh_window
+
+        monkeypatch.setenv("REFRESH_OVERLAP_HOURS", "2")
+        test_db.add(SyncState(
+            tail_number="N593EH",
+            last_departure_time_utc=NOW - timedelta(days=1),
+            last_fa_flight_id="LAST",
+            last_synced_at=NOW - timedelta(minutes=5)
+        ))
+        test_db.commit()
+
+        start, end, full = plan_refresh_window(test_db, "N593EH", NOW)
+
+        assert full is False
+        assert start == NOW - timedelta(days=1, hours=2)
+        assert end == NOW
+
+    def test_uses_last_sync_without_flights(self, test_db):
+        """Test that a sync which found no flights still moves the window."""
+        from app.models import SyncState
+        from app.services.refresh import plan_refresh_window
+
+        test_db.add(SyncState(tail_number="N593EH", last_synced_at=NOW - timedelta(hours=1)))
+        test_db.commit()
+
+        start, _, full = plan_refresh_window(test_db, "N593EH", NOW)
+
+        assert full is False
+        assert start == NOW - timedelta(hours=7)
+
+    def test_old_mark_is_capped(self, test_db):
+        """Test that an old mark never widens the window past a full refresh."""
+        from app.models import SyncState
+        from app.services.refresh import plan_refresh_window
+
+        test_db.add(SyncState(tail_number="N593EH", last_departure_time_utc=NOW - timedelta(days=400)))
+        test_db.commit()
+
+        start, _, full = plan_refresh_window(test_db, "N593EH", NOW)
+
+        assert full is True
+        assert start == NOW - timedelta(days=90)
+
+    def test_full_flag_ignores_mark(self, test_db):
+        """Test that full=True forces the full window."""
+        from app.models import SyncState
+        from app.services.refresh import plan_refresh_window
+
+        test_db.add(SyncState(tail_number="N593EH", last_departure_time_utc=NOW - timedelta(days=1)))
+        test_db.commit()
+
+        start, _, full = plan_refresh_window(test_db, "N593EH", NOW, full=True)
+
+        assert full is True
+        assert start == NOW - timedelta(days=90)
+
+
+class TestRunRefresh:
+    """Test cases for run_refresh."""
+
+    def test_records_high_water_mark(self, test_db, make_flight, fake_flightaware_client):
+        """Test that a refresh stores flights and advances the sync state."""
+        from app.models import FlightRecord, SyncState
+        from app.services.refresh import run_refresh
+
+        flights = [
+            make_flight("OLD", NOW - timedelta(days=3)),
+            make_flight("NEW", NOW - timedelta(hours=4)),
+        ]
+        result = run_refresh(test_db, fake_flightaware_client(flights), "N593EH", now=NOW)
+
+        assert result.full is True
+        assert result.fetched == 2
+        assert result.inserted == 2
+        assert test_db.query(FlightRecord).count() == 2
+
+        state = test_db.get(SyncState, "N593EH")
+        assert state.last_fa_flight_id == "NEW"
+        assert state.last_departure_time_utc.replace(tzinfo=timezone.utc) == NOW - timedelta(hours=4)
+        assert state.last_synced_at.replace(tzinfo=timezone.utc) == NOW
+
+    def test_second_refresh_is_incremental(self, test_db, make_flight, fake_flightaware_client):
+        """Test that the next refresh only asks for the window since the mark."""
+        from app.models import SyncState
+        from app.services.refresh import run_refresh
+
+        run_refresh(test_db, fake_flightaware_client([make_flight("NEW", NOW - timedelta(hours=4))]), "N593EH", now=NOW)
+
+        later = NOW + timedelta(minutes=5)
+        client = fake_flightaware_client([make_flight("NEW", NOW - timedelta(hours=4))])
+        result = run_refresh(test_db, client, "N593EH", now=later)
+
+        assert result.full is False
+        assert result.inserted == 0
+        assert result.skipped == 1
+        _, start, end = client.fetch_aircraft_history.call_args[0]
+        assert start == NOW - timedelta(hours=10)
+        assert end == later
+        # Mark unchanged, sync time advanced
+        state = test_db.get(SyncState, "N593EH")
+        assert state.last_fa_flight_id == "NEW"
+        assert state.last_synced_at.replace(tzinfo=timezone.utc) == later
+
+    def test_mark_never_moves_backwards(self, test_db, make_flight, fake_flightaware_client):
+        """Test that re-fetching older flights keeps the later mark."""
+        from app.models import SyncState
+        from app.services.refresh import run_refresh
+
+        run_refresh(test_db, fake_flightaware_client([make_flight("NEW", NOW - timedelta(hours=1))]), "N593EH", now=NOW)
+        run_refresh(test_db, fake_flightaware_client([make_flight("OLD", NOW - timedelta(hours=3))]), "N593EH", full=True, now=NOW)
+
+        assert test_db.get(SyncState, "N593EH").last_fa_flight_id == "NEW"
+
+    @pytest.mark.parametrize("interval", [0, 60])
+    def test_no_transaction_held_during_fetch(self, test_db, make_flight, fake_flightaware_client, interval):
+        """Test that planning releases the session's connection before FlightAware is called."""
+        from app.services.refresh import run_refresh
+
+        client = fake_flightaware_client([make_flight("NEW", NOW - timedelta(hours=1))])
+        in_transaction = []
+        client.fetch_aircraft_history.side_effect = lambda *args, **kwargs: in_transaction.append(
+            test_db.in_transaction()) or [{}]
+
+        run_refresh(test_db, client, "N593EH", now=NOW, min_interval=timedelta(seconds=interval))
+
+        assert in_transaction == [False]
+
+    def test_upstream_error_leaves_state(self, test_db):
+        """Test that a failed fetch does not record a sync."""
+        from app.models import SyncState
+        from app.services.flightaware import FlightAwareError
+        from app.services.refresh import run_refresh
+
+        client = MagicMock()
+        client.fetch_aircraft_history.side_effect = FlightAwareError("timeout")
+
+        with pytest.raises(FlightAwareError):
+            run_refresh(test_db, client, "N593EH", now=NOW)
+        assert test_db.get(SyncState, "N593EH") is None
+
+
+class TestRefreshThrottle:
+    """Test cases for the minimum interval between upstream fetches."""
+
+    def test_second_fetch_within_interval_is_skipped(self, test_db, fake_flightaware_client):
+        """Test that a refresh inside the interval does not call FlightAware."""
+        from app.services.refresh import run_refresh
+
+        client = fake_flightaware_client([])
+        interval = timedelta(seconds=60)
+
+        first = run_refresh(test_db, client, "N593EH", now=NOW, min_interval=interval)
+        second = run_refresh(test_db, client, "N593EH", now=NOW + timedelta(seconds=20), min_interval=interval)
+
+        assert first.throttled is False
+        assert second.throttled is True
+        assert second.retry_after == 40
+        assert client.fetch_aircraft_history.call_count == 1
+
+        third = run_refresh(test_db, client, "N593EH", now=NOW + timedelta(seconds=60), min_interval=interval)
+        assert third.throttled is False
+        assert client.fetch_aircraft_history.call_count == 2
+
+    def test_claim_is_shared_between_sessions(self, test_db):
+        """Test that the lock row spaces out fetches across independent sessions."""
+        from app.services.refresh import claim_fetch_slot
+
+        other = sessionmaker(bind=test_db.get_bind())()
+        interval = timedelta(seconds=30)
+        try:
+            assert claim_fetch_slot(test_db, "N593EH", NOW, interval) is None
+            assert claim_fetch_slot(other, "N593EH", NOW + timedelta(seconds=5), interval) == timedelta(seconds=25)
+            # Other tails are unaffected
+            assert claim_fetch_slot(other, "N123AB", NOW, interval) is None
+        finally:
+            other.close()
+
+
+class TestRefreshOnce:
+    """Test cases for coalesced refreshes."""
+
+    def test_concurrent_refreshes_share_one_fetch(self, test_db, make_flight, fake_flightaware_client):
+        """Test that overlapping refreshes of a tail fetch and store once."""
+        from app.models import FlightRecord
+        from app.services.refresh import refresh_once
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        session_factory = sessionmaker(bind=test_db.get_bind())
+        started = threading.Event()
+        release = threading.Event()
+
+        def fetch(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return [{}]
+
+        client = fake_flightaware_client([make_flight("SHARED", datetime.now(timezone.utc) - timedelta(hours=1))])
+        client.fetch_aircraft_history.side_effect = fetch
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            leader = pool.submit(refresh_once, flights, session_factory, client, "N593EH")
+            started.wait(5)
+            followers = [pool.submit(refresh_once, flights, session_factory, client, "N593EH") for _ in range(2)]
+            while flights._calls[("N593EH", False)].waiters < 2:
+                pass
+            release.set()
+
+            result, shared = leader.result()
+            assert shared is False
+            assert result.inserted == 1
+            for follower in followers:
+                assert follower.result() == (result, True)
+
+        assert client.fetch_aircraft_history.call_count == 1
+        assert test_db.query(FlightRecord).count() == 1
+
+    def test_ingest_result_applied_to_caches(self, test_db, make_flight, store):
+        """Test that stored flights reach every enabled cache, and empty ingests none."""
+        from app.services.refresh import apply_ingest_result
+
+        caches = [MagicMock(), MagicMock(), MagicMock()]
+        ingest = store(test_db, [make_flight("NEW", NOW - timedelta(hours=1))])
+        apply_ingest_result(ingest, *caches)
+        apply_ingest_result(store(test_db, [make_flight("NEW", NOW - timedelta(hours=1))]), *caches)
+        apply_ingest_result(None, *caches)
+        apply_ingest_result(ingest, None, None, None)
+
+        response_cache, flight_cache, summary_index = caches
+        response_cache.invalidate_flights.assert_called_once_with(ingest.inserted_departures, ingest.flights_version)
+        flight_cache.invalidate_flights.assert_called_once_with(ingest.inserted_departures, ingest.flights_version)
+        summary_index.add_flights.assert_called_once_with(ingest.inserted_departures, ingest.inserted_minutes,
+                                                          ingest.flights_version)
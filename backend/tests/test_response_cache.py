@@ -0,0 +1,241 @@
+"""
+Tests for the versioned LRU response cache.
+"""
+import pytest
+import json
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+
+def entry(body=b"{}", tail_number="N593EH", start=(2024, 1, 1), end=(2024, 1, 31), flights_version=0):
+    """Build a CachedResponse for a whole-day range."""
+    from app.services.response_cache import CachedResponse
+
+    return CachedResponse(
+        body=body,
+        mimetype="application/json",
+        tail_number=tail_number,
+        start_date=datetime(*start, tzinfo=timezone.utc),
+        end_date=datetime(*end, 23, 59, 59, tzinfo=timezone.utc),
+        flights_version=flights_version
+    )
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    def test_hit_and_miss(self):
+        """Test lookups count hits and misses."""
+        from app.services.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        assert cache.get("a") is None
+        cache.put("a", entry(b"[1]"))
+        assert cache.get("a").body == b"[1]"
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_evicts_least_recently_used_by_count(self):
+        """Test that the least recently used entry is evicted at max_entries."""
+        from app.services.response_cache import ResponseCache
+
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", entry())
+        cache.put("b", entry())
+        cache.get("a")
+        cache.put("c", entry())
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_evicts_by_bytes(self):
+        """Test that total body size stays within max_bytes."""
+        from app.services.response_cache import ResponseCache
+
+        cache = ResponseCache(max_bytes=10)
+        cache.put("a", entry(b"12345"))
+        cache.put("b", entry(b"12345"))
+        cache.put("c", entry(b"123"))
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 8
+        # Larger than the whole cache: not stored
+        assert cache.put("d", entry(b"x" * 11)) is False
+
+    def test_invalidates_only_overlapping_ranges(self):
+        """Test precise invalidation by tail number and departure time."""
+        from app.services.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        cache.sync(flights_version=0, settings_version=0)
+        cache.put("jan", entry(start=(2024, 1, 1), end=(2024, 1, 31)))
+        cache.put("feb", entry(start=(2024, 2, 1), end=(2024, 2, 29)))
+        cache.put("jan-other", entry(tail_number="N123AB", start=(2024, 1, 1), end=(2024, 1, 31)))
+
+        removed = cache.invalidate_flights(
+            {"N593EH": [datetime(2024, 1, 31, 22, 0, tzinfo=timezone.utc)]},
+            flights_version=1
+        )
+
+        assert removed == 1
+        assert cache.get("jan") is None
+        assert cache.get("feb") is not None
+        assert cache.get("jan-other") is not None
+
+    def test_sync_clears_on_external_change(self):
+        """Test that version changes from other writers clear the cache."""
+        from app.services.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        cache.sync(flights_version=3, settings_version=1)
+        cache.put("a", entry(flights_version=3))
+
+        cache.sync(flights_version=3, settings_version=1)
+        assert cache.get("a") is not None
+
+        cache.sync(flights_version=4, settings_version=1)
+        assert cache.get("a") is None
+
+        cache.put("b", entry(flights_version=4))
+        cache.sync(flights_version=4, settings_version=2)
+        assert cache.get("b") is None
+
+    def test_sync_keeps_entries_after_local_invalidation(self):
+        """Test that this process's own ingest does not clear unrelated entries."""
+        from app.services.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        cache.sync(flights_version=1, settings_version=0)
+        cache.put("feb", entry(start=(2024, 2, 1), end=(2024, 2, 29), flights_version=1))
+
+        cache.invalidate_flights({"N593EH": [datetime(2024, 1, 5, tzinfo=timezone.utc)]}, flights_version=2)
+        cache.sync(flights_version=2, settings_version=0)
+
+        assert cache.get("feb") is not None
+
+    def test_invalidation_after_another_writer_clears(self):
+        """Test that an insert whose version skips one drops entries outside its range too."""
+        from app.services.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        cache.sync(flights_version=0, settings_version=0)
+        cache.put("jan", entry(start=(2024, 1, 1), end=(2024, 1, 31)))
+
+        # Another process committed version 1; this one commits a March flight as version 2
+        removed = cache.invalidate_flights({"N593EH": [datetime(2024, 3, 5, tzinfo=timezone.utc)]}, flights_version=2)
+        cache.sync(flights_version=2, settings_version=0)
+
+        assert removed == 1
+        assert cache.get("jan") is None
+        assert cache.stats()["flights_version"] == 2
+
+    def test_rejects_entries_older_than_invalidation(self):
+        """Test that a response built before an invalidation is not stored."""
+        from app.services.response_cache import ResponseCache
+
+        cache = ResponseCache()
+        cache.invalidate_flights({}, flights_version=5)
+
+        assert cache.put("a", entry(flights_version=4)) is False
+        assert cache.put("a", entry(flights_version=5)) is True
+
+
+class TestResponseCacheEndpoints:
+    """Test cases for cached /api/flights and /api/summary responses."""
+
+    URL = '/api/flights?start_date=2024-01-15&end_date=2024-01-15'
+
+    @pytest.fixture
+    def db(self, test_db):
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            yield test_db
+
+    @pytest.fixture
+    def refresh_with(self, client, fake_flightaware_client):
+        """POST /api/refresh_data with a FlightAware client double returning the given flights."""
+        def refresh(flights):
+            with patch('app.api.FlightAwareClient') as mock_client_class:
+                mock_client_class.return_value = fake_flightaware_client(flights)
+                return client.post('/api/refresh_data')
+
+        return refresh
+
+    def test_repeat_request_is_served_from_cache(self, app, client, db):
+        """Test that the second identical request is a cache hit."""
+        first = client.get(self.URL)
+        second = client.get(self.URL)
+
+        assert first.data == second.data
+        stats = app.extensions['response_cache'].stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["entries"] == 1
+
+    def test_refresh_invalidates_overlapping_range(self, app, client, db, refresh_with, make_flight):
+        """Test that ingest drops cached ranges containing the new flights only."""
+        other_url = '/api/flights?start_date=2024-02-01&end_date=2024-02-29'
+        assert json.loads(client.get(self.URL).data) == []
+        client.get(other_url)
+
+        response = refresh_with([make_flight("CACHE-001", datetime(2024, 1, 15, 9, 0, tzinfo=timezone.utc))])
+        assert response.status_code == 200
+
+        assert [f["id"] for f in json.loads(client.get(self.URL).data)] == ["CACHE-001"]
+        client.get(other_url)
+        stats = app.extensions['response_cache'].stats()
+        assert stats["invalidations"] == 1
+        assert stats["hits"] == 1
+
+    def test_two_writers_do_not_leave_stale_summaries(self, client, db, refresh_with, make_flight):
+        """Test that a local insert after another process's insert does not keep stale responses."""
+        from app.services.ingest import store_flights
+
+        url = '/api/summary?start_date=2024-01-01&end_date=2024-01-31'
+        assert json.loads(client.get(url).data)["totalFlightMinutes"] == 0
+
+        # Another process stores a January flight
+        store_flights(db, [make_flight("OTHER-001", datetime(2024, 1, 15, 9, 0, tzinfo=timezone.utc))])
+        db.commit()
+        # This process then stores a March flight
+        response = refresh_with([make_flight("LOCAL-001", datetime(2024, 3, 5, 9, 0, tzinfo=timezone.utc))])
+        assert response.status_code == 200
+
+        assert json.loads(client.get(url).data)["totalFlightMinutes"] == 60
+
+    def test_settings_change_invalidates(self, client, db):
+        """Test that updated settings are reflected in cached summaries."""
+        url = '/api/summary?start_date=2024-01-15&end_date=2024-01-15'
+        before = json.loads(client.get(url).data)
+
+        client.put(
+            '/api/financial-settings',
+            data=json.dumps({"revenue_per_hour": 150.0, "monthly_fixed_costs": 1000.0, "variable_cost_per_hour": 75.0}),
+            content_type='application/json'
+        )
+
+        after = json.loads(client.get(url).data)
+        assert after["totalFixedCosts"] > before["totalFixedCosts"]
+
+    def test_streamed_responses_not_cached(self, app, client, db):
+        """Test that streamed responses bypass the cache."""
+        client.get(self.URL + '&stream=ndjson')
+
+        assert app.extensions['response_cache'].stats()["entries"] == 0
+
+    def test_cache_stats_endpoint(self, client, db):
+        """Test the admin cache statistics endpoint."""
+        client.get(self.URL)
+        client.get(self.URL)
+
+        response = client.get('/api/admin/cache-stats')
+        assert response.status_code == 200
+        stats = json.loads(response.data)
+        assert stats["response_cache"]["hits"] == 1
+        assert stats["response_cache"]["entries"] == 1
+        assert "settings_cache" in stats
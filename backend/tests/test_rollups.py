@@ -0,0 +1,127 @@
+"""
+Tests for daily flight rollups.
+"""
+import pytest
+import random
+from datetime import date, datetime, timezone, timedelta
+
+
+def flight_totals(session, tail_number, start_date, end_date):
+    """Reference totals summed in Python over every flight in range."""
+    from app.models import FlightRecord
+    from app.services.summary import FlightTotals, billable_tenths
+
+    start_date, end_date = start_date.replace(tzinfo=None), end_date.replace(tzinfo=None)
+    minutes = [
+        flight.flight_duration_minutes for flight in session.query(FlightRecord).filter_by(tail_number=tail_number)
+        if start_date <= flight.departure_time_utc <= end_date
+    ]
+    return FlightTotals(
+        flight_count=len(minutes),
+        flight_minutes=sum(minutes),
+        billable_tenths=sum(billable_tenths(m) for m in minutes)
+    )
+
+
+class TestDailyRollups:
+    """Test cases for rollup maintenance and aggregation."""
+
+    def test_ingest_updates_rollups(self, test_db, make_flights):
+        """Test that store_flights adds inserted flights to daily rollups."""
+        from app.models import DailyFlightRollup
+        from app.services.ingest import store_flights
+
+        start = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+        store_flights(test_db, make_flights([60, 90], start))
+        test_db.commit()
+
+        rollup = test_db.query(DailyFlightRollup).filter_by(tail_number="N593EH", day=date(2024, 3, 1)).one()
+        assert rollup.flight_count == 2
+        assert rollup.flight_minutes == 150
+        assert rollup.hobbs_minutes == 180
+        assert rollup.billable_tenths == 31
+
+    def test_rollups_accumulate_across_batches(self, test_db, make_flights):
+        """Test that later batches add to an existing day and skip duplicates."""
+        from app.models import DailyFlightRollup
+        from app.services.ingest import store_flights
+
+        first = make_flights([60], datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc))
+        second = make_flights([30], datetime(2024, 3, 1, 20, 0, tzinfo=timezone.utc))
+        store_flights(test_db, first)
+        test_db.commit()
+        store_flights(test_db, first + second)
+        test_db.commit()
+
+        rollup = test_db.query(DailyFlightRollup).one()
+        assert rollup.flight_count == 2
+        assert rollup.flight_minutes == 90
+
+    def test_rollups_use_utc_day(self, test_db, make_flights):
+        """Test that departures are bucketed by UTC day, not local time."""
+        from app.models import DailyFlightRollup
+        from app.services.ingest import store_flights
+
+        pacific = timezone(timedelta(hours=-8))
+        store_flights(test_db, make_flights([45], datetime(2024, 3, 1, 20, 0, tzinfo=pacific)))
+        test_db.commit()
+
+        assert test_db.query(DailyFlightRollup).one().day == date(2024, 3, 2)
+
+    def test_aggregate_rollups_matches_flights(self, test_db, make_flights):
+        """Test that rollup totals match a scan of the flights table."""
+        from app.services.ingest import store_flights
+        from app.services.rollups import aggregate_rollups
+
+        rng = random.Random(42)
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        store_flights(test_db, make_flights([rng.randint(0, 300) for _ in range(400)], start, spacing_hours=7))
+        store_flights(test_db, make_flights([rng.randint(0, 300) for _ in range(50)], start, tail_number="N123AB"))
+        test_db.commit()
+
+        range_start = datetime(2024, 1, 10, tzinfo=timezone.utc)
+        range_end = datetime(2024, 2, 20, 23, 59, 59, tzinfo=timezone.utc)
+        assert aggregate_rollups(test_db, "N593EH", range_start, range_end) == \
+            flight_totals(test_db, "N593EH", range_start, range_end)
+
+    def test_rebuild_rollups(self, test_db, make_flights):
+        """Test rebuilding rollups for flights inserted outside the ingest path."""
+        from app.services.rollups import aggregate_rollups, ensure_rollups, rebuild_rollups
+
+        start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        test_db.add_all(make_flights([50, 70, 110, 5], start, spacing_hours=11))
+        test_db.commit()
+
+        range_start = datetime(2024, 5, 1, tzinfo=timezone.utc)
+        range_end = datetime(2024, 5, 31, 23, 59, 59, tzinfo=timezone.utc)
+        assert aggregate_rollups(test_db, "N593EH", range_start, range_end).flight_count == 0
+
+        assert ensure_rollups(test_db) is True
+        assert aggregate_rollups(test_db, "N593EH", range_start, range_end) == \
+            flight_totals(test_db, "N593EH", range_start, range_end)
+
+        # Already populated, nothing to do
+        assert ensure_rollups(test_db) is False
+        assert rebuild_rollups(test_db) == 2
+
+    @pytest.mark.parametrize("bucket", ["day", "week", "month"])
+    def test_rollup_series_matches_per_bucket_aggregates(self, test_db, bucket, make_flights):
+        """Test that one grouped query gives the same totals as a query per bucket."""
+        from app.services.ingest import store_flights
+        from app.services.rollups import rollup_series
+        from app.services.summary import bucket_periods
+
+        rng = random.Random(7)
+        start = datetime(2023, 12, 20, 3, 0, tzinfo=timezone.utc)
+        store_flights(test_db, make_flights([rng.randint(0, 300) for _ in range(300)], start, spacing_hours=9))
+        test_db.commit()
+
+        range_start = datetime(2024, 1, 3, tzinfo=timezone.utc)
+        range_end = datetime(2024, 3, 17, 23, 59, 59, tzinfo=timezone.utc)
+        series = rollup_series(test_db, "N593EH", range_start, range_end, bucket)
+
+        for key, period_start, period_end in bucket_periods(range_start, range_end, bucket):
+            expected = flight_totals(test_db, "N593EH", period_start, period_end)
+            if expected.flight_count:
+                assert series.pop(key) == expected
+        assert series == {}
@@ -0,0 +1,118 @@
+"""
+Tests for the process-local financial settings cache.
+"""
+import pytest
+import json
+from unittest.mock import patch
+from sqlalchemy import event
+
+
+@pytest.fixture
+def statements(test_db):
+    """Record SQL statements executed on the test database."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    engine = test_db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def settings_queries(statements):
+    """Statements that read or write the financial_settings table."""
+    return [s for s in statements if "financial_settings" in s and "data_versions" not in s]
+
+
+class TestSettingsCache:
+    """Test cases for SettingsCache."""
+
+    def test_defaults_without_row(self, test_db):
+        """Test that defaults are served without creating a settings row."""
+        from app.models import FinancialSettings
+        from app.services.settings_cache import SettingsCache
+
+        settings = SettingsCache().get(test_db)
+
+        assert settings.revenue_per_hour == 150.0
+        assert settings.monthly_fixed_costs == 500.0
+        assert settings.variable_cost_per_hour == 75.0
+        assert settings.id is None
+        assert test_db.query(FinancialSettings).count() == 0
+
+    def test_hit_skips_settings_query(self, test_db, statements):
+        """Test that a cached snapshot is reused while the version is unchanged."""
+        from app.models import FinancialSettings
+        from app.services.settings_cache import SettingsCache
+
+        test_db.add(FinancialSettings(revenue_per_hour=175.0, monthly_fixed_costs=600.0, variable_cost_per_hour=80.0))
+        test_db.commit()
+        cache = SettingsCache()
+
+        assert cache.get(test_db).revenue_per_hour == 175.0
+        statements.clear()
+        assert cache.get(test_db).revenue_per_hour == 175.0
+
+        # Only the data_versions lookup ran
+        assert settings_queries(statements) == []
+        assert len(statements) == 1
+
+    def test_reloads_after_external_bump(self, test_db):
+        """Test that a version bump by another writer invalidates the snapshot."""
+        from app.models import DataVersion, FinancialSettings
+        from app.services.settings_cache import SETTINGS_VERSION, SettingsCache
+
+        row = FinancialSettings(revenue_per_hour=175.0, monthly_fixed_costs=600.0, variable_cost_per_hour=80.0)
+        test_db.add(row)
+        test_db.commit()
+        cache = SettingsCache()
+        assert cache.get(test_db).revenue_per_hour == 175.0
+
+        # Simulate another worker process updating the settings
+        row.revenue_per_hour = 190.0
+        DataVersion.bump(test_db, SETTINGS_VERSION)
+        test_db.commit()
+
+        assert cache.get(test_db).revenue_per_hour == 190.0
+        assert cache.version == 1
+
+
+class TestSettingsCacheEndpoints:
+    """Test cases for endpoints reading settings through the cache."""
+
+    def test_update_refreshes_cache(self, app, client, test_db):
+        """Test that PUT bumps the version and updates the cached snapshot."""
+        from app.models import DataVersion
+        from app.services.settings_cache import SETTINGS_VERSION
+
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+
+            assert json.loads(client.get('/api/financial-settings').data)["revenue_per_hour"] == 150.0
+
+            response = client.put(
+                '/api/financial-settings',
+                data=json.dumps({"revenue_per_hour": 210.0, "monthly_fixed_costs": 650.0, "variable_cost_per_hour": 85.0}),
+                content_type='application/json'
+            )
+            assert response.status_code == 200
+            assert json.loads(response.data)["id"] is not None
+
+            assert DataVersion.current(test_db, SETTINGS_VERSION) == 1
+            assert app.extensions['settings_cache'].version == 1
+            data = json.loads(client.get('/api/financial-settings').data)
+            assert data["revenue_per_hour"] == 210.0
+            assert data["variable_cost_per_hour"] == 85.0
+
+    def test_read_paths_do_not_write(self, client, test_db, statements):
+        """Test that GET endpoints never insert default settings."""
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+
+            client.get('/api/financial-settings')
+            client.get('/api/flights?start_date=2024-01-15&end_date=2024-01-15')
+            client.get('/api/summary?start_date=2024-01-15&end_date=2024-01-15')
+
+        assert not [s for s in statements if s.lstrip().upper().startswith(("INSERT", "UPDATE"))]
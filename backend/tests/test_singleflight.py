@@ -0,0 +1,73 @@
+"""
+Tests for single-flight call coalescing.
+"""
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers arriving mid-call receive the leader's result."""
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(flights.do, "key", slow)
+            started.wait(5)
+            followers = [pool.submit(flights.do, "key", slow) for _ in range(3)]
+            # Followers must be waiting before the leader finishes
+            while flights._calls["key"].waiters < 3:
+                pass
+            release.set()
+
+            assert leader.result() == ("result", False)
+            assert [f.result() for f in followers] == [("result", True)] * 3
+        assert len(calls) == 1
+        assert flights.in_flight() == 0
+
+    def test_errors_reach_every_caller(self):
+        """Test that the leader's exception is raised in waiting callers too."""
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing():
+            started.set()
+            release.wait(5)
+            raise RuntimeError("upstream down")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(flights.do, "key", failing)
+            started.wait(5)
+            follower = pool.submit(flights.do, "key", failing)
+            while flights._calls["key"].waiters < 1:
+                pass
+            release.set()
+
+            for future in (leader, follower):
+                with pytest.raises(RuntimeError, match="upstream down"):
+                    future.result()
+
+    def test_sequential_and_distinct_calls_run_separately(self):
+        """Test that only overlapping calls with the same key are shared."""
+        from app.services.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        assert flights.do("a", lambda: 1) == (1, False)
+        assert flights.do("a", lambda: 2) == (2, False)
+        assert flights.do("b", lambda: 3) == (3, False)
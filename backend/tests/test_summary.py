@@ -0,0 +1,145 @@
+"""
+Tests for summary aggregation and financial calculations.
+"""
+import pytest
+import random
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+
+def legacy_summary_totals(durations, settings):
+    """The original per-flight Python calculation from get_summary."""
+    total_hobbs_minutes = sum(d + 15 for d in durations)
+    total_billable_hours = 0.0
+    for duration in durations:
+        hobbs_hours = (duration + 15) / 60.0
+        total_billable_hours += round(hobbs_hours * 10 + 0.49) / 10
+    return {
+        "totalFlightMinutes": sum(durations),
+        "totalHobbsMinutes": total_hobbs_minutes,
+        "totalBillableHours": round(total_billable_hours, 2),
+        "totalRevenue": round(total_billable_hours * settings.revenue_per_hour, 2),
+        "totalVariableCosts": round(total_billable_hours * settings.variable_cost_per_hour, 2),
+    }
+
+
+@pytest.fixture
+def add_flights(make_flights):
+    """Store one flight per duration, six hours apart, through the ingest path."""
+    from app.services.ingest import store_flights
+
+    def add(session, durations, tail_number="N593EH", start=None):
+        start = start or datetime(2024, 1, 1, tzinfo=timezone.utc)
+        store_flights(session, make_flights(durations, start, spacing_hours=6, tail_number=tail_number))
+        session.commit()
+
+    return add
+
+
+class TestAggregateRollups:
+    """Test cases for the summary totals read from daily rollups."""
+
+    def test_empty_range(self, test_db):
+        """Test totals when no flights are in range."""
+        from app.services.rollups import aggregate_rollups
+
+        totals = aggregate_rollups(
+            test_db, "N593EH",
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 31, tzinfo=timezone.utc)
+        )
+
+        assert totals.flight_count == 0
+        assert totals.flight_minutes == 0
+        assert totals.hobbs_minutes == 0
+        assert totals.billable_tenths == 0
+
+    def test_filters_tail_and_range(self, test_db, add_flights):
+        """Test that only flights for the tail number and days in range are summed."""
+        from app.services.rollups import aggregate_rollups
+
+        add_flights(test_db, [60, 90, 45, 20, 30])
+        add_flights(test_db, [120], tail_number="N123AB")
+
+        totals = aggregate_rollups(
+            test_db, "N593EH",
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 1, 23, 59, 59, tzinfo=timezone.utc)
+        )
+
+        # Only the flights departing on Jan 1 (00:00, 06:00, 12:00, 18:00)
+        assert totals.flight_count == 4
+        assert totals.flight_minutes == 215
+        assert totals.hobbs_minutes == 275
+        # 75 min -> 1.3 h, 105 min -> 1.8 h, 60 min -> 1.0 h, 35 min -> 0.6 h
+        assert totals.billable_tenths == 47
+
+    @pytest.mark.parametrize("rates", [(150.0, 75.0), (137.25, 61.4), (99.99, 12.5)])
+    def test_matches_legacy_calculation(self, test_db, rates, add_flights):
+        """Test that rollup aggregation matches the original Python loop to the cent."""
+        from app.services.rollups import aggregate_rollups
+        from app.services.summary import build_summary
+
+        rng = random.Random(593)
+        durations = [rng.randint(0, 400) for _ in range(500)]
+        add_flights(test_db, durations)
+
+        settings = SimpleNamespace(
+            revenue_per_hour=rates[0],
+            variable_cost_per_hour=rates[1],
+            monthly_fixed_costs=500.0
+        )
+        start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        end_date = datetime(2024, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+
+        totals = aggregate_rollups(test_db, "N593EH", start_date, end_date)
+        summary = build_summary(settings, start_date, end_date, totals)
+
+        expected = legacy_summary_totals(durations, settings)
+        for key in ("totalFlightMinutes", "totalHobbsMinutes", "totalBillableHours"):
+            assert summary[key] == expected[key], key
+        # The legacy loop summed per-flight hours as floats, so on an exact
+        # half-cent tie its rounding can land one cent either way
+        for key in ("totalRevenue", "totalVariableCosts"):
+            assert summary[key] == pytest.approx(expected[key], abs=0.0100001), key
+
+
+class TestBucketPeriods:
+    """Test cases for splitting a range into series buckets."""
+
+    def test_month_periods_cross_year_and_are_clipped(self):
+        """Test month buckets over a year boundary, clipped at both ends."""
+        from app.services.summary import bucket_label, bucket_periods
+
+        start_date = datetime(2023, 11, 20, tzinfo=timezone.utc)
+        end_date = datetime(2024, 1, 5, 23, 59, 59, tzinfo=timezone.utc)
+
+        periods = bucket_periods(start_date, end_date, "month")
+
+        assert [bucket_label(key, "month") for key, _, _ in periods] == ["2023-11", "2023-12", "2024-01"]
+        assert periods[0][1] == start_date
+        assert periods[1][1:] == (datetime(2023, 12, 1, tzinfo=timezone.utc),
+                                  datetime(2023, 12, 31, 23, 59, 59, tzinfo=timezone.utc))
+        assert periods[2][2] == end_date
+
+    @pytest.mark.parametrize("bucket", ["day", "week", "month"])
+    def test_bucket_count_matches_periods(self, bucket):
+        """Test that bucket_count agrees with bucket_periods, including empty ranges."""
+        from app.services.summary import bucket_count, bucket_periods
+
+        start_date = datetime(2023, 11, 20, tzinfo=timezone.utc)
+        for end in (datetime(2023, 11, 19), datetime(2023, 11, 20), datetime(2024, 1, 1), datetime(2025, 3, 2)):
+            end_date = end.replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+            assert bucket_count(start_date, end_date, bucket) == len(bucket_periods(start_date, end_date, bucket))
+
+    def test_week_periods_start_on_monday(self):
+        """Test that week buckets are keyed by the Monday of their ISO week."""
+        from app.services.summary import bucket_label, bucket_periods
+
+        start_date = datetime(2024, 12, 28, tzinfo=timezone.utc)
+        end_date = datetime(2025, 1, 8, 23, 59, 59, tzinfo=timezone.utc)
+
+        periods = bucket_periods(start_date, end_date, "week")
+
+        assert [key.isoformat() for key, _, _ in periods] == ["2024-12-23", "2024-12-30", "2025-01-06"]
+        assert [bucket_label(key, "week") for key, _, _ in periods] == ["2024-W52", "2025-W01", "2025-W02"]
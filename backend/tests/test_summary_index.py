@@ -0,0 +1,133 @@
+"""
+Tests for the in-memory summary prefix-sum index.
+"""
+import random
+from datetime import datetime, timezone, timedelta
+
+
+def day_range(start_day, days):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(days=start_day)
+    return start, start + timedelta(days=days) - timedelta(seconds=1)
+
+
+class TestSummaryIndex:
+    """Test cases for SummaryIndex."""
+
+    def test_matches_rollups_for_random_ranges(self, test_db, make_flights, store):
+        """Test that prefix-sum totals equal the rollup totals for arbitrary day ranges."""
+        from app.services.rollups import aggregate_rollups
+        from app.services.summary_index import SummaryIndex
+
+        rng = random.Random(11)
+        store(test_db, make_flights([rng.randint(0, 300) for _ in range(600)], datetime(2024, 1, 1, 2, tzinfo=timezone.utc)))
+        store(test_db, make_flights([90] * 20, datetime(2024, 1, 1, tzinfo=timezone.utc), tail_number="N123AB"))
+        index = SummaryIndex()
+
+        for _ in range(50):
+            start, end = day_range(rng.randint(-10, 190), rng.randint(1, 120))
+            assert index.totals(test_db, "N593EH", start, end) == aggregate_rollups(test_db, "N593EH", start, end)
+
+        stats = index.stats()
+        assert stats["loads"] == 1
+        assert stats["hits"] == 49
+        assert stats["days"] == 175
+        assert stats["bytes"] == (175 * 4 + 3) * 8
+
+    def test_unknown_tail_is_empty(self, test_db):
+        """Test that a tail without flights is indexed as empty."""
+        from app.services.summary_index import SummaryIndex
+
+        totals = SummaryIndex().totals(test_db, "N000XX", *day_range(0, 365))
+
+        assert (totals.flight_count, totals.flight_minutes, totals.billable_tenths) == (0, 0, 0)
+
+    def test_new_flights_are_appended(self, test_db, make_flights, store):
+        """Test that flights inserted by this process extend a loaded tail without reloading it."""
+        from app.services.rollups import aggregate_rollups
+        from app.services.summary_index import SummaryIndex
+
+        store(test_db, make_flights([60, 70, 80], datetime(2024, 1, 1, tzinfo=timezone.utc)))
+        index = SummaryIndex()
+        index.totals(test_db, "N593EH", *day_range(0, 30))
+
+        result = store(test_db, make_flights([45, 55], datetime(2024, 1, 10, tzinfo=timezone.utc), prefix="NEW"))
+        index.add_flights(result.inserted_departures, result.inserted_minutes, result.flights_version)
+
+        period = day_range(0, 30)
+        assert index.totals(test_db, "N593EH", *period) == aggregate_rollups(test_db, "N593EH", *period)
+        assert index.totals(test_db, "N593EH", *period).flight_minutes == 310
+        assert index.stats()["loads"] == 1
+        assert index.stats()["appends"] == 2
+
+    def test_backfilled_flights_reload_the_tail(self, test_db, make_flights, store):
+        """Test that flights older than the last indexed one make the tail reload."""
+        from app.services.summary_index import SummaryIndex
+
+        store(test_db, make_flights([60, 70], datetime(2024, 2, 1, tzinfo=timezone.utc)))
+        index = SummaryIndex()
+        index.totals(test_db, "N593EH", *day_range(0, 60))
+
+        result = store(test_db, make_flights([30], datetime(2024, 1, 5, tzinfo=timezone.utc), prefix="OLD"))
+        index.add_flights(result.inserted_departures, result.inserted_minutes, result.flights_version)
+
+        assert index.totals(test_db, "N593EH", *day_range(0, 60)).flight_minutes == 160
+        assert index.stats()["loads"] == 2
+
+    def test_other_writers_invalidate(self, test_db, make_flights, store):
+        """Test that a flights version bump not seen through add_flights drops the index."""
+        from app.models import DataVersion, FlightRecord
+        from app.services.ingest import FLIGHTS_VERSION
+        from app.services.rollups import rebuild_rollups
+        from app.services.summary_index import SummaryIndex
+
+        store(test_db, make_flights([60, 70, 80], datetime(2024, 1, 1, tzinfo=timezone.utc)))
+        index = SummaryIndex()
+        assert index.totals(test_db, "N593EH", *day_range(0, 30)).flight_count == 3
+
+        # Another process deletes a flight, rebuilds rollups and bumps the counter
+        test_db.query(FlightRecord).filter(FlightRecord.flight_duration_minutes == 80).delete()
+        rebuild_rollups(test_db)
+        DataVersion.bump(test_db, FLIGHTS_VERSION)
+        test_db.commit()
+
+        assert index.totals(test_db, "N593EH", *day_range(0, 30)).flight_count == 2
+        assert index.stats()["invalidations"] == 1
+
+    def test_skipped_version_drops_index(self, test_db, make_flights, store):
+        """Test that add_flights with a gap in versions does not append onto stale data."""
+        from app.models import DataVersion
+        from app.services.ingest import FLIGHTS_VERSION
+        from app.services.summary_index import SummaryIndex
+
+        store(test_db, make_flights([60], datetime(2024, 1, 1, tzinfo=timezone.utc)))
+        index = SummaryIndex()
+        index.totals(test_db, "N593EH", *day_range(0, 30))
+
+        DataVersion.bump(test_db, FLIGHTS_VERSION)
+        test_db.commit()
+        result = store(test_db, make_flights([45], datetime(2024, 1, 10, tzinfo=timezone.utc), prefix="NEW"))
+        index.add_flights(result.inserted_departures, result.inserted_minutes, result.flights_version)
+
+        assert index.stats()["tails"] == 0
+        assert index.totals(test_db, "N593EH", *day_range(0, 30)).flight_minutes == 105
+
+
+class TestSummaryEndpointIndex:
+    """Test cases for /api/summary through the summary index."""
+
+    def test_summary_served_from_index(self, app, client, test_db, make_flights, store):
+        """Test that repeated summaries over different ranges load the tail once."""
+        from unittest.mock import patch
+
+        store(test_db, make_flights([60, 90, 120], datetime(2024, 1, 15, 8, tzinfo=timezone.utc), spacing_hours=24))
+
+        with patch('app.api.get_db_session') as mock_get_session:
+            mock_get_session.return_value = test_db
+            first = client.get('/api/summary?start_date=2024-01-15&end_date=2024-01-15').get_json()
+            second = client.get('/api/summary?start_date=2024-01-01&end_date=2024-01-31').get_json()
+            stats = client.get('/api/admin/cache-stats').get_json()["summary_index"]
+
+        assert first["totalFlightMinutes"] == 60
+        assert second["totalFlightMinutes"] == 270
+        assert stats["loads"] == 1
+        assert stats["hits"] == 1
@@ -0,0 +1,35 @@
+"""
+Tests for the flights version bookkeeping shared by the caches.
+"""
+from app.services.versioning import KnownVersion
+
+
+class TestKnownVersion:
+    """Test cases for KnownVersion."""
+
+    def test_first_observation_is_adopted(self):
+        """Test that the first version read drops nothing."""
+        known = KnownVersion()
+
+        assert known.observe(5) is False
+        assert known.value == 5
+
+    def test_counter_moving_forward_drops_everything(self):
+        """Test that only a newer version read from the database reports stale contents."""
+        known = KnownVersion()
+        known.observe(5)
+
+        assert known.observe(4) is False
+        assert known.observe(5) is False
+        assert known.observe(7) is True
+        assert known.value == 7
+
+    def test_insert_steps(self):
+        """Test that only the very next version is applied precisely."""
+        known = KnownVersion()
+
+        assert known.insert(3) == KnownVersion.RESET
+        assert known.insert(4) == KnownVersion.PRECISE
+        assert known.insert(4) == KnownVersion.SEEN
+        assert known.insert(6) == KnownVersion.RESET
+        assert known.value == 6
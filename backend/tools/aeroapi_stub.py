@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the FlightAware AeroAPI flights endpoints.
+
+Run from the backend directory:
+    python -m tools.aeroapi_stub [--port 8090] [--latency-ms 50] [--error-rate 0.02]
+        [--rate-limit-rate 0.05] [--flights-per-day 4]
+
+then point the app at it:
+    FLIGHTAWARE_BASE_URL=http://127.0.0.1:8090/aeroapi FLIGHTAWARE_API_KEY=stub python app.py
+
+Serves GET /aeroapi/flights/{ident} and /aeroapi/history/flights/{ident}
+with start/end/max_pages/cursor, paginated through links.next like AeroAPI.
+Flights are generated deterministically from the ident, day and --seed,
+so repeated and overlapping requests agree. Configurable fractions are
+cancelled or incomplete (no destination or arrival time), flights still
+in the future are scheduled-only, and pages come newest first with some
+neighbours swapped. Each request can be delayed, failed with a 5xx or
+rejected with 429 and Retry-After. GET /_stats reports request counts by
+status.
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+API_PREFIX = "/aeroapi"
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# (ICAO, IATA, name, city)
+AIRPORTS = (
+    ("KSFO", "SFO", "San Francisco Intl", "San Francisco"),
+    ("KLAX", "LAX", "Los Angeles Intl", "Los Angeles"),
+    ("KPHX", "PHX", "Phoenix Sky Harbor Intl", "Phoenix"),
+    ("KSEA", "SEA", "Seattle-Tacoma Intl", "Seattle"),
+    ("KLAS", "LAS", "Harry Reid Intl", "Las Vegas"),
+    ("KSAN", "SAN", "San Diego Intl", "San Diego"),
+    ("KPAO", None, "Palo Alto", "Palo Alto"),
+    ("KHWD", None, "Hayward Executive", "Hayward"),
+)
+
+
+@dataclass
+class StubConfig:
+    """Traffic shape and fault injection for the stand-in server."""
+    seed: int = 0
+    flights_per_day: float = 4.0
+    page_size: int = 15
+    cancelled_rate: float = 0.05
+    incomplete_rate: float = 0.03
+    swap_rate: float = 0.1
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 1
+    require_api_key: bool = True
+
+
+def _format(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(TIME_FORMAT) if value else None
+
+
+def _parse(value: str) -> datetime:
+    value = value.strip().upper()
+    if "T" not in value:
+        value += "T00:00:00Z"
+    return datetime.strptime(value.rstrip("Z"), "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+def _airport(index: int) -> Dict[str, Any]:
+    icao, iata, name, city = AIRPORTS[index % len(AIRPORTS)]
+    return {"code": icao, "code_icao": icao, "code_iata": iata, "code_lid": None,
+            "name": name, "city": city, "timezone": "America/Los_Angeles"}
+
+
+def flights_on_day(ident: str, day: datetime, config: StubConfig, now: datetime) -> List[Dict[str, Any]]:
+    """Every flight ident departs on a UTC day, oldest first; identical for every request."""
+    rng = random.Random(f"{config.seed}:{ident}:{day:%Y%m%d}")
+    count = rng.randint(0, max(int(round(config.flights_per_day * 2)), 0))
+    minutes = sorted(rng.sample(range(6 * 60, 22 * 60), count))
+    flights = []
+    for n, minute in enumerate(minutes):
+        scheduled_out = day + timedelta(minutes=minute)
+        block = rng.randint(30, 240)
+        taxi_out, taxi_in, delay = rng.randint(3, 15), rng.randint(2, 10), rng.randint(-5, 30)
+        origin = rng.randrange(len(AIRPORTS))
+        destination = (origin + rng.randint(1, len(AIRPORTS) - 1)) % len(AIRPORTS)
+        cancelled = rng.random() < config.cancelled_rate
+        incomplete = rng.random() < config.incomplete_rate
+
+        actual_out = scheduled_out + timedelta(minutes=delay)
+        actual_off = actual_out + timedelta(minutes=taxi_out)
+        actual_on = actual_off + timedelta(minutes=block)
+        actual_in = actual_on + timedelta(minutes=taxi_in)
+        scheduled_in = scheduled_out + timedelta(minutes=taxi_out + block + taxi_in)
+        departed = not cancelled and actual_out <= now
+        arrived = departed and actual_in <= now
+
+        flight = {
+            "ident": ident,
+            "ident_icao": None,
+            "ident_iata": None,
+            "fa_flight_id": f"{ident}-{int(scheduled_out.timestamp())}-adhoc-{n:04d}",
+            "operator": None,
+            "flight_number": None,
+            "registration": ident,
+            "atc_ident": None,
+            "inbound_fa_flight_id": None,
+            "codeshares": [],
+            "blocked": False,
+            "diverted": False,
+            "cancelled": cancelled,
+            "position_only": False,
+            "origin": _airport(origin),
+            "destination": _airport(destination),
+            "departure_delay": delay * 60,
+            "arrival_delay": delay * 60,
+            "filed_ete": block * 60,
+            "progress_percent": 100 if arrived else (50 if departed else 0),
+            "status": "Cancelled" if cancelled else ("Arrived / Gate Arrival" if arrived
+                                                     else ("En Route" if departed else "Scheduled")),
+            "aircraft_type": "C172",
+            "route_distance": block * 2,
+            "filed_airspeed": 110,
+            "filed_altitude": 55,
+            "route": None,
+            "scheduled_out": _format(scheduled_out),
+            "estimated_out": _format(actual_out),
+            "actual_out": _format(actual_out) if departed else None,
+            "scheduled_off": _format(scheduled_out + timedelta(minutes=taxi_out)),
+            "estimated_off": _format(actual_off),
+            "actual_off": _format(actual_off) if departed else None,
+            "scheduled_on": _format(scheduled_in - timedelta(minutes=taxi_in)),
+            "estimated_on": _format(actual_on),
+            "actual_on": _format(actual_on) if arrived else None,
+            "scheduled_in": _format(scheduled_in),
+            "estimated_in": _format(actual_in),
+            "actual_in": _format(actual_in) if arrived else None,
+            "foresight_predictions_available": False,
+        }
+        if incomplete:
+            # Either the destination or every arrival time is missing
+            if rng.random() < 0.5:
+                flight["destination"] = None
+            else:
+                for key in ("scheduled_on", "estimated_on", "actual_on", "scheduled_in", "estimated_in", "actual_in"):
+                    flight[key] = None
+        flights.append(flight)
+    return flights
+
+
+def flights_between(ident: str, start: datetime, end: datetime, config: StubConfig,
+                    now: datetime) -> List[Dict[str, Any]]:
+    """Flights scheduled to depart in [start, end), newest first with some neighbours swapped."""
+    flights = []
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        flights.extend(
+            f for f in flights_on_day(ident, day, config, now)
+            if start <= _parse(f["scheduled_out"]) < end
+        )
+        day += timedelta(days=1)
+    flights.reverse()
+
+    rng = random.Random(f"{config.seed}:{ident}:{start:%Y%m%d%H%M%S}:order")
+    for i in range(len(flights) - 1):
+        if rng.random() < config.swap_rate:
+            flights[i], flights[i + 1] = flights[i + 1], flights[i]
+    return flights
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f"offset:{offset}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    kind, _, value = base64.urlsafe_b64decode(padded.encode()).decode().partition(":")
+    if kind != "offset":
+        raise ValueError(cursor)
+    return int(value)
+
+
+class AeroAPIStubHandler(BaseHTTPRequestHandler):
+    """Request handler; configuration and counters live on the server."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server: AeroAPIStubServer = self.server
+        url = urlsplit(self.path)
+        if url.path == "/_stats":
+            return self._send(200, server.snapshot())
+
+        status, body, headers = self._handle(server, url.path, parse_qs(url.query))
+        server.record(status)
+        self._send(status, body, headers)
+
+    def _handle(self, server: "AeroAPIStubServer", path: str,
+                query: Dict[str, List[str]]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        config = server.config
+        rng = server.rng()
+        delay = config.latency_ms + rng.uniform(0, config.latency_jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        if config.require_api_key and not self.headers.get("x-apikey"):
+            return _error(401, "Unauthorized", "Missing x-apikey header")
+        if rng.random() < config.rate_limit_rate:
+            error = _error(429, "Too Many Requests", "Rate limit exceeded")
+            error[2]["Retry-After"] = str(config.retry_after)
+            return error
+        if rng.random() < config.error_rate:
+            return _error(rng.choice((500, 502, 503)), "Server Error", "Injected failure")
+
+        if path.startswith(f"{API_PREFIX}/history/flights/"):
+            ident, history = path[len(f"{API_PREFIX}/history/flights/"):], True
+        elif path.startswith(f"{API_PREFIX}/flights/"):
+            ident, history = path[len(f"{API_PREFIX}/flights/"):], False
+        else:
+            return _error(404, "Not Found", f"No endpoint at {path}")
+        if not ident or "/" in ident:
+            return _error(404, "Not Found", f"No endpoint at {path}")
+
+        now = server.now()
+        try:
+            if history:
+                if "start" not in query or "end" not in query:
+                    return _error(400, "Bad Request", "start and end are required")
+                start, end = _parse(query["start"][0]), _parse(query["end"][0])
+            else:
+                start = _parse(query["start"][0]) if "start" in query else now - timedelta(days=10)
+                end = _parse(query["end"][0]) if "end" in query else now + timedelta(days=2)
+            offset = decode_cursor(query["cursor"][0]) if "cursor" in query else 0
+            max_pages = int(query.get("max_pages", ["1"])[0])
+        except (ValueError, UnicodeDecodeError):
+            return _error(400, "Bad Request", "Invalid start, end, cursor or max_pages")
+
+        flights = flights_between(ident, start, end, config, now)
+        limit = config.page_size * max(max_pages, 1)
+        page = flights[offset:offset + limit]
+        next_link = None
+        if offset + limit < len(flights):
+            params = {k: v[0] for k, v in query.items() if k != "cursor"}
+            params["cursor"] = encode_cursor(offset + limit)
+            next_link = f"{path[len(API_PREFIX):]}?{urlencode(params)}"
+        return 200, {
+            "links": {"next": next_link} if next_link else None,
+            "num_pages": -(-len(page) // config.page_size) if page else 1,
+            "flights": page,
+        }, {}
+
+    def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def _error(status: int, title: str, detail: str) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+    return status, {"title": title, "reason": title.upper().replace(" ", "_"), "detail": detail,
+                    "status": status}, {}
+
+
+class AeroAPIStubServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the stub configuration and request counts."""
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: StubConfig, verbose: bool = False):
+        super().__init__(address, AeroAPIStubHandler)
+        self.config = config
+        self.verbose = verbose
+        self.now = lambda: datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+        self._statuses: Counter = Counter()
+        self._rng = random.Random(config.seed)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def rng(self) -> random.Random:
+        """Per-request random source for fault injection, reproducible from the seed."""
+        with self._lock:
+            return random.Random(self._rng.random())
+
+    def record(self, status: int) -> None:
+        with self._lock:
+            self._statuses[status] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": sum(self._statuses.values()),
+                    "by_status": {str(k): v for k, v in sorted(self._statuses.items())}}
+
+
+def serve_in_thread(config: Optional[StubConfig] = None, host: str = "127.0.0.1",
+                    port: int = 0) -> AeroAPIStubServer:
+    """Start a stub server on a background thread; call shutdown() and server_close() when done."""
+    server = AeroAPIStubServer((host, port), config or StubConfig())
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--flights-per-day', type=float, default=4.0)
+    parser.add_argument('--page-size', type=int, default=15)
+    parser.add_argument('--cancelled-rate', type=float, default=0.05)
+    parser.add_argument('--incomplete-rate', type=float, default=0.03)
+    parser.add_argument('--swap-rate', type=float, default=0.1, help="chance each neighbour pair is out of order")
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--latency-jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests failed with 5xx")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="fraction of requests answered 429")
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--no-auth', action='store_true', help="accept requests without x-apikey")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    config = StubConfig(
+        seed=args.seed,
+        flights_per_day=args.flights_per_day,
+        page_size=args.page_size,
+        cancelled_rate=args.cancelled_rate,
+        incomplete_rate=args.incomplete_rate,
+        swap_rate=args.swap_rate,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        require_api_key=not args.no_auth,
+    )
+    server = AeroAPIStubServer((args.host, args.port), config, verbose=args.verbose)
+    print(f"AeroAPI stand-in listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()